@@ -0,0 +1,281 @@
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+import numpy as np
+from config import Config
+from result_cache import analysis_cache
+from transaction_batch import TransactionBatch
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Fields of a transactions document the snapshot is built from
+SNAPSHOT_FIELDS = {"_id": 1, "transaction_id": 1, "account_id": 1, "date": 1, "amount": 1,
+                   "category": 1, "name": 1, "last_updated": 1}
+
+# How far behind the latest `last_updated` seen a refresh starts reading, to cover writers whose
+# clocks lag or whose writes commit after a later-stamped one
+REFRESH_OVERLAP = timedelta(seconds=60)
+
+# TransactionBatch arrays, replaced together when rows change
+_COLUMNS = ("transaction_ids", "account_codes", "amounts", "dates", "category_codes", "merchant_codes")
+
+
+def _watermark(documents, current=None):
+    """Returns the latest `last_updated` stamp among `documents` and `current`."""
+    stamps = [str(doc["last_updated"]) for doc in documents if doc.get("last_updated")]
+    if current:
+        stamps.append(current)
+    return max(stamps) if stamps else None
+
+
+def _refresh_start(watermark):
+    """Returns the `last_updated` lower bound of the next refresh: the watermark minus REFRESH_OVERLAP."""
+    try:
+        return (datetime.fromisoformat(watermark) - REFRESH_OVERLAP).isoformat(timespec="seconds")
+    except ValueError:
+        return watermark[:10]
+
+
+def _to_datetime(day):
+    """Converts a datetime64[D] value to the datetime MongoDB would return, or None for NaT."""
+    return None if np.isnat(day) else day.astype("datetime64[us]").item()
+
+
+def _day_to_datetime(day):
+    """Converts days since the epoch to a datetime; the $min/$max sentinels (no dated row) become None."""
+    if day in (np.iinfo(np.int64).max, np.iinfo(np.int64).min):
+        return None
+    return _to_datetime(np.datetime64(int(day), "D"))
+
+
+def _range_mask(batch, start_date=None, end_date=None):
+    """Rows matched by _date_query: every row without bounds, else dated rows within the inclusive range."""
+    if not start_date and not end_date:
+        return np.ones(len(batch), dtype=bool)
+    return batch.date_mask(start_date, end_date)
+
+
+def _group(codes, amounts, mask, size):
+    """
+    Groups the masked rows by code, like $group does: the missing code (-1) is its own group in slot 0.
+
+    Returns:
+        tuple: (totals, counts, numeric_counts) indexed by code + 1. Missing amounts are left out of
+        totals and numeric_counts ($sum/$avg ignore them) but are counted in counts ($sum: 1).
+    """
+    slots = codes[mask] + 1
+    values = amounts[mask]
+    numeric = ~np.isnan(values)
+    totals = np.bincount(slots[numeric], weights=values[numeric], minlength=size + 1)
+    counts = np.bincount(slots, minlength=size + 1)
+    numeric_counts = np.bincount(slots[numeric], minlength=size + 1)
+    return totals, counts, numeric_counts
+
+
+def _largest_first(slots, totals, limit=None):
+    """Orders group slots by total descending, keeping the `limit` largest (selected with argpartition)."""
+    if limit is not None and limit < len(slots):
+        slots = slots[np.argpartition(-totals[slots], limit - 1)[:limit]]
+    return slots[np.argsort(-totals[slots], kind="stable")]
+
+
+def category_result(batch, start_date=None, end_date=None):
+    """category_pipeline output computed from a batch."""
+    mask = _range_mask(batch, start_date, end_date)
+    totals, counts, _ = _group(batch.category_codes, batch.amounts, mask, len(batch.categories))
+    return [
+        {"_id": batch.categories.decode(int(slot) - 1), "total_amount": float(totals[slot]), "count": int(counts[slot])}
+        for slot in _largest_first(np.flatnonzero(counts), totals)
+    ]
+
+
+def monthly_result(batch, year=None):
+    """monthly_pipeline output computed from a batch."""
+    mask = ~np.isnat(batch.dates)
+    if year:
+        mask &= (batch.dates >= np.datetime64(f"{int(year):04d}-01-01")) & (batch.dates < np.datetime64(f"{int(year) + 1:04d}-01-01"))
+    if not mask.any():
+        return []
+
+    # Months since 1970-01, grouped through their distinct values (already sorted)
+    months, inverse = np.unique(batch.dates[mask].astype("datetime64[M]").astype(np.int64), return_inverse=True)
+    values = batch.amounts[mask]
+    numeric = ~np.isnan(values)
+    totals = np.bincount(inverse[numeric], weights=values[numeric], minlength=len(months))
+    counts = np.bincount(inverse, minlength=len(months))
+    return [
+        {"_id": int((month // 12 + 1970) * 100 + month % 12 + 1), "total_amount": float(total), "transaction_count": int(count)}
+        for month, total, count in zip(months, totals, counts)
+    ]
+
+
+def merchant_result(batch, start_date=None, end_date=None, limit=10):
+    """merchant_pipeline output (transactions source) computed from a batch."""
+    if limit <= 0:
+        raise ValueError("limit must be positive")
+    mask = _range_mask(batch, start_date, end_date)
+    size = len(batch.merchants)
+    totals, counts, numeric_counts = _group(batch.merchant_codes, batch.amounts, mask, size)
+    top = _largest_first(np.flatnonzero(counts), totals, limit)
+
+    # $min/$max of the date ignore rows without one
+    dated = mask & ~np.isnat(batch.dates)
+    slots = batch.merchant_codes[dated] + 1
+    days = batch.dates[dated].astype(np.int64)
+    first = np.full(size + 1, np.iinfo(np.int64).max)
+    last = np.full(size + 1, np.iinfo(np.int64).min)
+    np.minimum.at(first, slots, days)
+    np.maximum.at(last, slots, days)
+
+    return [
+        {
+            "_id": batch.merchants.decode(int(slot) - 1),
+            "total_amount": float(totals[slot]),
+            "transaction_count": int(counts[slot]),
+            "first_transaction": _day_to_datetime(first[slot]),
+            "last_transaction": _day_to_datetime(last[slot]),
+            "average_transaction": float(totals[slot] / numeric_counts[slot]) if numeric_counts[slot] else None,
+        }
+        for slot in top
+    ]
+
+
+def date_range_result(batch, start_date=None, end_date=None):
+    """date_range_pipeline output computed from a batch."""
+    mask = _range_mask(batch, start_date, end_date)
+    if not mask.any():
+        return []
+    days = batch.dates[mask]
+    days = days[~np.isnat(days)]
+    return [{
+        "_id": None,
+        "min_date": _to_datetime(days.min()) if len(days) else None,
+        "max_date": _to_datetime(days.max()) if len(days) else None,
+    }]
+
+
+class AnalyticsSnapshot:
+    """
+    In-process columnar copy of the `transactions` collection (a TransactionBatch), answering the
+    analysis pipelines with vectorized group-bys instead of a MongoDB round trip.
+    - Loaded once, then refreshed from documents whose `last_updated` is newer than the latest stamp
+      seen, minus REFRESH_OVERLAP. Documents re-read from the overlap (or stamped with a date only,
+      by older writers) are applied again, which is idempotent because rows are keyed by `_id`
+    - A refresh runs when a local write bumps the analysis cache generation, or after
+      ANALYTICS_SNAPSHOT_MAX_AGE seconds to pick up writes made by other processes
+    - Deletes leave no `last_updated` behind: when the row count no longer matches the collection
+      after a refresh, the snapshot is reloaded in full
+    Refreshes build new arrays and swap them in, so readers always see a consistent batch.
+    """
+
+    def __init__(self, max_age=None):
+        # None follows Config.ANALYTICS_SNAPSHOT_MAX_AGE, which load_settings() can change after import
+        self._max_age = max_age
+        self.batch = None
+        self._rows = {}
+        self._db = None
+        self._watermark = None
+        self._generation = None
+        self._refreshed_at = 0.0
+        self._lock = threading.Lock()
+        self._counters = {"loads": 0, "refreshes": 0, "refreshed_documents": 0}
+
+    @property
+    def max_age(self):
+        return Config.ANALYTICS_SNAPSHOT_MAX_AGE if self._max_age is None else self._max_age
+
+    def current(self, db):
+        """Returns the batch for `db`, loading or refreshing it first when it may be stale."""
+        if not self._is_fresh(db):
+            with self._lock:
+                if not self._is_fresh(db):
+                    self._refresh(db)
+        return self.batch
+
+    def _is_fresh(self, db):
+        return (self.batch is not None and db is self._db and self._generation == analysis_cache.generation
+                and time.monotonic() - self._refreshed_at < self.max_age)
+
+    def _refresh(self, db):
+        # Read before querying, so a write landing during the refresh triggers another one
+        generation = analysis_cache.generation
+        collection = db["transactions"]
+
+        if self.batch is None or db is not self._db or self._watermark is None:
+            self._load(collection)
+        else:
+            documents = list(collection.find({"last_updated": {"$gte": _refresh_start(self._watermark)}}, SNAPSHOT_FIELDS))
+            self._apply(documents)
+            self._counters["refreshes"] += 1
+            self._counters["refreshed_documents"] += len(documents)
+            if len(self.batch) != collection.count_documents({}):
+                logging.info("ℹ️ Transactions were deleted since the last snapshot refresh, reloading it")
+                self._load(collection)
+
+        self._db = db
+        self._generation = generation
+        self._refreshed_at = time.monotonic()
+
+    def _load(self, collection):
+        started = time.perf_counter()
+        documents = list(collection.find({}, SNAPSHOT_FIELDS))
+        self.batch = TransactionBatch.from_documents(documents)
+        self._rows = {doc["_id"]: row for row, doc in enumerate(documents)}
+        self._watermark = _watermark(documents)
+        self._counters["loads"] += 1
+        logging.info(f"✅ Loaded analytics snapshot of {len(documents)} transactions in {time.perf_counter() - started:.2f}s")
+
+    def _apply(self, documents):
+        """Overwrites the rows of changed documents and appends new ones, into new arrays."""
+        if not documents:
+            return
+        batch = self.batch
+        changed = TransactionBatch.from_documents(documents, batch.dictionaries())
+        existing = np.array([doc["_id"] in self._rows for doc in documents], dtype=bool)
+
+        merged = TransactionBatch.concat([batch, changed.select(~existing)])
+        rows = np.array([self._rows[doc["_id"]] for doc in documents if doc["_id"] in self._rows], dtype=np.int64)
+        for column in _COLUMNS:
+            getattr(merged, column)[rows] = getattr(changed, column)[existing]
+
+        for doc in documents:
+            if doc["_id"] not in self._rows:
+                self._rows[doc["_id"]] = len(self._rows)
+        self.batch = merged
+        self._watermark = _watermark(documents, self._watermark)
+
+    def category_result(self, db, start_date=None, end_date=None):
+        return category_result(self.current(db), start_date, end_date)
+
+    def monthly_result(self, db, year=None):
+        return monthly_result(self.current(db), year)
+
+    def merchant_result(self, db, start_date=None, end_date=None, limit=10):
+        return merchant_result(self.current(db), start_date, end_date, limit)
+
+    def date_range_result(self, db, start_date=None, end_date=None):
+        return date_range_result(self.current(db), start_date, end_date)
+
+    def dashboard_result(self, db, start_date=None, end_date=None, year=None, limit=10):
+        """dashboard_pipeline output: the four facets, all computed from the same batch."""
+        batch = self.current(db)
+        return [{
+            "categories": category_result(batch, start_date, end_date),
+            "monthly": monthly_result(batch, year),
+            "merchants": merchant_result(batch, start_date, end_date, limit),
+            "date_range": date_range_result(batch, start_date, end_date),
+        }]
+
+    def stats(self):
+        """Returns load/refresh counters, the row count and the refresh watermark."""
+        stats = dict(self._counters)
+        stats["rows"] = len(self.batch) if self.batch is not None else 0
+        stats["watermark"] = self._watermark
+        stats["max_age"] = self.max_age
+        return stats
+
+
+# Process-wide snapshot shared by every TransactionAnalyzer with use_snapshot enabled
+analytics_snapshot = AnalyticsSnapshot()
@@ -1,21 +1,25 @@
 import json
 
-from flask import Flask, jsonify, request
-from plaid_service import PlaidService
+from flask import Blueprint, Flask, current_app, jsonify, request
 from flask_cors import CORS
+from pymongo import ReturnDocument
+from daily_rollups import ROLLUP_SOURCE_FIELDS, rollup_write_lock
 from transaction_loader import TransactionLoader
 from transaction_analyzer import TransactionAnalyzer
-from mongodb_client import get_database
+from job_manager import JobManager
+from mongodb_client import get_database, pool_stats, using_fallback
+from result_cache import analysis_cache, bump_generation
 import logging
 import ssl
 import os
+import threading
 import traceback
 import uuid
-import plaid
 from werkzeug.utils import secure_filename
 from datetime import datetime, timedelta
 
 from transaction_model import Transaction
+from config import Config, load_settings
 
 # 🔹 Configure Logging
 logging.basicConfig(
@@ -25,65 +29,114 @@ logging.basicConfig(
 )
 
 
-# Global variables for database connection and access token
-db = None
+# Global access token, loaded from the database on first use.
+# The database is looked up per request so a reconnect after an outage is picked up.
 access_token = None
+_access_token_loaded = False
 
-app = Flask(__name__)
-service = PlaidService()
-loader = TransactionLoader()
-analyzer = TransactionAnalyzer()
+# Routes are registered on a blueprint and attached to the app in create_app()
+api = Blueprint("api", __name__)
 
 # 🔹 Set Upload Folder for Excel Files
 UPLOAD_FOLDER = os.path.join(os.getcwd(), "uploads")
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 ALLOWED_EXTENSIONS = {'xlsx', 'xls', 'csv'}
 
-# 🔹 Enhanced CORS Configuration for Plaid
-CORS(app, resources={r"/*": {
-    "origins": [
-        "https://localhost:3000",
-        "https://127.0.0.1:3000",
-        "http://localhost:3000",
-        "http://127.0.0.1:3000"
-    ],
-    "methods": ["GET", "POST", "OPTIONS"],
-    "allow_headers": ["Content-Type", "Authorization", "X-Requested-With"],
-    "supports_credentials": True,
-    "expose_headers": ["Content-Type", "Authorization"]
-}})
-
-
-# Initialize database connection and load access token at startup
-def initialize_app():
-    global db, access_token
-    logging.info("🔹 Initializing application...")
+# Services are built on first use, so importing the app does not touch MongoDB or import the Plaid SDK
+_services = {}
+_services_lock = threading.Lock()
+
+
+def _lazy_service(name, factory):
+    service = _services.get(name)
+    if service is None:
+        with _services_lock:
+            service = _services.get(name)
+            if service is None:
+                service = factory()
+                _services[name] = service
+    return service
+
+
+def get_service():
+    from plaid_service import PlaidService  # imports the plaid SDK
+    return _lazy_service("plaid", PlaidService)
+
+
+def get_loader():
+    return _lazy_service("loader", TransactionLoader)
+
+
+def get_analyzer():
+    return _lazy_service("analyzer", TransactionAnalyzer)
+
+
+def get_jobs():
+    return _lazy_service("jobs", JobManager)
+
+
+def create_app():
+    """
+    Application factory. Loads settings from .env, then builds the app; services and connections
+    are created on first use.
+    """
+    load_settings()
+    app = Flask(__name__)
+    app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+    app.config['MAX_CONTENT_LENGTH'] = Config.MAX_UPLOAD_MB * 1024 * 1024  # Imports are streamed, so large exports are fine
+
+    # 🔹 Enhanced CORS Configuration for Plaid
+    CORS(app, resources={r"/*": {
+        "origins": [
+            "https://localhost:3000",
+            "https://127.0.0.1:3000",
+            "http://localhost:3000",
+            "http://127.0.0.1:3000"
+        ],
+        "methods": ["GET", "POST", "OPTIONS"],
+        "allow_headers": ["Content-Type", "Authorization", "X-Requested-With"],
+        "supports_credentials": True,
+        "expose_headers": ["Content-Type", "Authorization"]
+    }})
+
+    app.register_blueprint(api)
+    return app
+
+
+# Load the access token from the database the first time it is needed
+def get_access_token():
+    global access_token, _access_token_loaded
+    if access_token is not None or _access_token_loaded:
+        return access_token
 
     # Connect to database
     db = get_database()
     if db is None:
-        logging.warning("⚠️ Failed to connect to database during initialization")
-    else:
-        logging.info("✅ Successfully connected to database")
+        logging.warning("⚠️ Database not available, access token not loaded yet")
+        return None
 
-        # Try to load access token
-        try:
-            account_doc = db.accounts.find_one({"id": "1"})
-            if account_doc:
-                if "token_id" in account_doc:
-                    access_token = account_doc["token_id"]
-                    logging.info("✅ Successfully loaded access token from database")
-                elif "access_token" in account_doc:
-                    access_token = account_doc["access_token"]
-                    logging.info("✅ Successfully loaded access token from database")
-                else:
-                    logging.info("ℹ️ No access token found in the database")
+    # Try to load access token
+    try:
+        account_doc = db.accounts.find_one({"id": "1"})
+        if account_doc:
+            if "token_id" in account_doc:
+                access_token = account_doc["token_id"]
+                logging.info("✅ Successfully loaded access token from database")
+            elif "access_token" in account_doc:
+                access_token = account_doc["access_token"]
+                logging.info("✅ Successfully loaded access token from database")
             else:
-                logging.info("ℹ️ No account document found in the database")
-        except Exception as e:
-            logging.error(f"❌ Error loading access token: {str(e)}")
+                logging.info("ℹ️ No access token found in the database")
+        else:
+            logging.info("ℹ️ No account document found in the database")
+        # The fallback store does not hold the real account, so look again once MongoDB is back
+        if using_fallback():
+            logging.warning("⚠️ Access token looked up in the in-memory fallback, will retry against MongoDB")
+        else:
+            _access_token_loaded = True
+    except Exception as e:
+        logging.error(f"❌ Error loading access token: {str(e)}")
+
+    return access_token
 
 
 def get_last_month_date_range():
@@ -96,18 +149,26 @@ def get_last_month_date_range():
 
 # Helper function to update access token in both global variable and database
 def update_access_token(token):
-    global access_token, db
+    global access_token
     access_token = token
 
-    # Also update in database if available
-    if db is not None:
+    # Any cached validation belongs to the previous token
+    get_service().client.invalidate_token_validation()
+
+    # Also update in database if available (the in-memory fallback would lose it on reconnect)
+    db = get_database()
+    if db is not None and not using_fallback():
         try:
             result = db.accounts.update_one(
                 {"id": "1"},
-                {"$set": {
-                    "token_id": token,
-                    "last_updated": datetime.now().isoformat()
-                }},
+                {
+                    "$set": {
+                        "token_id": token,
+                        "last_updated": datetime.now().isoformat()
+                    },
+                    # A new token means a new item, so the old sync cursor no longer applies
+                    "$unset": {"sync_cursor": ""}
+                },
                 upsert=True
             )
 
@@ -124,14 +185,62 @@ def update_access_token(token):
 
 
 
+# Background job body: stream Plaid pages into the loader, reporting progress as pages are saved
+def sync_plaid_transactions(token, start_date, end_date, limit=None, progress=None):
+    pages = get_service().iter_transaction_pages(token, start_date, end_date, limit)
+    return get_loader().save_plaid_transaction_pages(pages, progress=progress)
+
+
+# Background job body: import an uploaded file, then delete it since its rows are now in the database
+def import_uploaded_file(filepath, source_name, progress=None):
+    try:
+        return get_loader().load_from_excel(filepath, progress=progress, source_name=source_name)
+    finally:
+        try:
+            os.remove(filepath)
+        except OSError as e:
+            logging.warning(f"⚠️ Could not delete uploaded file {filepath}: {str(e)}")
+
+
+# Helper function to refuse writes that cannot be stored right now
+def database_write_error():
+    """
+    Returns an error response when the database cannot accept writes, or None.
+    While MongoDB is down the in-memory fallback (DB_FALLBACK=memory) only serves reads:
+    anything written to it would be lost once MongoDB reconnects.
+    """
+    if get_database() is None:
+        logging.error("❌ Database connection not available")
+        return jsonify({"error": "Database connection failed"}), 500
+    if using_fallback():
+        logging.warning("⚠️ MongoDB unavailable, refusing a write to the read-only in-memory fallback")
+        return jsonify({"error": "Database is read-only until MongoDB reconnects"}), 503
+    return None
+
+
 # Helper function to check for allowed file extensions
 def allowed_file(filename):
     return '.' in filename and \
         filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
+# Helper function to validate date filters before they reach a query or the analysis cache
+def invalid_date_filter(start_date=None, end_date=None, year=None):
+    """
+    Returns an error message for an unparseable start_date/end_date (YYYY-MM-DD) or year (YYYY),
+    or None when every given filter is valid. Unvalidated values would silently match nothing.
+    """
+    for label, value in (("start_date", start_date), ("end_date", end_date)):
+        if value and Transaction.parse_date(value) is None:
+            return f"{label} must be in YYYY-MM-DD format"
+    # The year range must end before datetime's maximum year
+    if year and not (str(year).isdigit() and 1 <= int(year) < 9999):
+        return "year must be in YYYY format"
+    return None
+
+
 # Add custom headers to every response for Plaid
-@app.after_request
+@api.after_app_request
 def add_plaid_headers(response):
     # Set headers needed for Plaid Link to work
     response.headers['Access-Control-Allow-Origin'] = 'https://localhost:3000'
@@ -148,7 +257,7 @@ def add_plaid_headers(response):
     return response
 
 
-@app.route("/link/token/create", methods=["POST"])
+@api.route("/link/token/create", methods=["POST"])
 def create_link_token():
     """Step 1: Generate a Link Token for user authentication."""
     try:
@@ -157,12 +266,12 @@ def create_link_token():
         # Check if we already have a valid token in our global variable
         force_new_token = request.json.get("force_new_token", False)
 
-        if access_token is not None and not force_new_token:
+        if get_access_token() is not None and not force_new_token:
             logging.info("✅ Valid access token exists, skipping link token creation")
             return jsonify({"existing_token": True, "message": "Using existing token"})
 
         # Proceed with link token creation if needed
-        link_token_response = service.link_chase_account()
+        link_token_response = get_service().link_chase_account()
         logging.info("✅ Link Token Created")
         return jsonify(link_token_response.to_dict())
     except Exception as e:
@@ -170,7 +279,7 @@ def create_link_token():
         return jsonify({"error": f"Failed to generate link token: {str(e)}"}), 500
 
 
-@app.route("/item/public_token/exchange", methods=["POST"])
+@api.route("/item/public_token/exchange", methods=["POST"])
 def exchange_public_token():
     """Step 3: Exchange a `public_token` for a permanent `access_token`."""
     try:
@@ -180,7 +289,7 @@ def exchange_public_token():
             logging.warning("⚠️ Missing public_token in request")
             return jsonify({"error": "public_token is required"}), 400
 
-        access_token_response = service.exchange_public_token(public_token)
+        access_token_response = get_service().exchange_public_token(public_token)
 
         # Update the global access token and database
         if "access_token" in access_token_response:
@@ -196,60 +305,47 @@ def exchange_public_token():
         return jsonify({"error": f"Failed to exchange public token: {str(e)}"}), 500
 
 
-@app.route("/validate-token", methods=["GET"])
+@api.route("/validate-token", methods=["GET"])
 def validate_token():
     """Validates if a stored token exists and is valid."""
     try:
         logging.info("🔹 Request received: /validate-token")
 
         # Check the global access token
-        if access_token is None:
+        token = get_access_token()
+        if token is None:
             logging.info("ℹ️ No access token available")
             return jsonify({"valid": False, "message": "No access token found"})
 
-        # Use Plaid client to verify token by fetching minimal data
-        try:
-            # Get the last 1 day of transactions to verify token
-            start_date = (datetime.now() - timedelta(days=1)).date()
-            end_date = datetime.now().date()
-
-            # Use the client directly to avoid circular imports
-            from plaid_client import PlaidClient
-            client = PlaidClient()
-
-            # Try to get a small amount of data to verify the token works
-            response = client.client.transactions_get(
-                plaid.model.transactions_get_request.TransactionsGetRequest(
-                    access_token=access_token,
-                    start_date=start_date,
-                    end_date=end_date,
-                    options=plaid.model.transactions_get_request_options.TransactionsGetRequestOptions(
-                        count=1
-                    )
-                )
-            )
-
-            # If we get here, the token is valid
-            logging.info("✅ Access token is valid")
-            return jsonify({"valid": True, "message": "Token is valid"})
-
-        except Exception as e:
-            logging.error(f"❌ Error validating token: {str(e)}")
-            # Token might be expired or invalid
-            return jsonify({"valid": False, "message": "Token validation failed"})
+        # Use the shared Plaid client to verify the token; recent outcomes are served from its TTL cache
+        result = get_service().client.check_access_token(token)
+        if result["valid"]:
+            logging.info(f"✅ Access token is valid{' (cached)' if result['cached'] else ''}")
+        return jsonify(result)
 
     except Exception as e:
         logging.error(f"❌ Error in token validation: {str(e)}")
         return jsonify({"valid": False, "message": f"Error validating token: {str(e)}"}), 500
 
 
-@app.route("/transactions/get-from-db", methods=["POST"])
+@api.route("/plaid/request-stats", methods=["GET"])
+def plaid_request_stats():
+    """Report Plaid request, retry and throttling counters."""
+    try:
+        return jsonify(get_service().client.request_stats())
+    except Exception as e:
+        logging.error(f"❌ Error fetching Plaid request stats: {str(e)}", exc_info=True)
+        return jsonify({"error": f"Failed to fetch Plaid request stats: {str(e)}"}), 500
+
+
+@api.route("/transactions/get-from-db", methods=["POST"])
 def get_transactions_from_db():
     """Get transactions directly from MongoDB database with pagination support."""
     try:
         logging.info("🔹 Request received: /transactions/get-from-db")
 
         # Check if we have a database connection
+        db = get_database()
         if db is None:
             logging.error("❌ Database connection not available")
             return jsonify({"error": "Database connection failed"}), 500
@@ -259,23 +355,30 @@ def get_transactions_from_db():
         end_date = request.json.get("end_date")
         limit = int(request.json.get("limit", 1000))  # Default to 1000
 
+        error = invalid_date_filter(start_date, end_date)
+        if error:
+            logging.warning(f"⚠️ Invalid date filter: {error}")
+            return jsonify({"error": error}), 400
+
         # Build query filters
         query = {}
         if start_date or end_date:
             date_filter = {}
             if start_date:
-                date_filter["$gte"] = start_date
+                date_filter["$gte"] = Transaction.parse_date(start_date)
             if end_date:
-                date_filter["$lte"] = end_date
+                date_filter["$lte"] = Transaction.parse_date(end_date)
             query["date"] = date_filter
 
-        # Execute query
-        transactions = list(db.transactions.find(query).sort("date", -1).limit(limit))
+        # Execute query. Raw payloads left on documents not yet migrated are skipped;
+        # the detail view loads them on demand from /transactions/<id>/raw
+        transactions = list(db.transactions.find(query, {"original_data": 0}).sort("date", -1).limit(limit))
 
-        # Convert ObjectId to string for JSON serialization
+        # Convert ObjectId to string and BSON dates to YYYY-MM-DD for JSON serialization
         for txn in transactions:
             if "_id" in txn:
                 txn["_id"] = str(txn["_id"])
+            txn["date"] = Transaction.format_date(txn.get("date"))
 
         # Get total count for pagination
         total_count = db.transactions.count_documents(query)
@@ -291,14 +394,14 @@ def get_transactions_from_db():
         return jsonify({"error": f"Failed to fetch transactions: {str(e)}"}), 500
 
 
-@app.route("/transactions/get", methods=["POST"])
+@api.route("/transactions/get", methods=["POST"])
 def get_transactions():
-    """Fetch transactions using `access_token` with pagination support."""
+    """Fetch transactions from Plaid into the database, returning how many were saved."""
     try:
         logging.info("🔹 Request received: /transactions/get")
 
         # Try to get token from request first, then fall back to global
-        token = access_token
+        token = get_access_token()
 
         # Check if we have a valid token
         if token is None:
@@ -308,42 +411,87 @@ def get_transactions():
         # Get date parameters
         start_date = request.json.get("start_date")
         end_date = request.json.get("end_date")
-        limit = min(request.json.get("limit", 1000), 1000)
+        limit = request.json.get("limit")
+        # Long ranges outlast a request, so fetching runs as a job unless the caller opts out
+        background = request.json.get("background", True)
 
         if not start_date or not end_date:
             start_date, end_date = get_last_month_date_range()
 
-        # Call Plaid service
-        if start_date and end_date:
-            plaid_transactions = service.get_transactions(token, start_date, end_date, limit)
-        else:
-            plaid_transactions = service.get_transactions(token, limit=limit)
+        error_response = database_write_error()
+        if error_response:
+            return error_response
 
-        # Check if we got an error back
-        if isinstance(plaid_transactions, dict) and "error" in plaid_transactions:
-            logging.warning(f"⚠️ Error from Plaid service: {plaid_transactions['error']}")
-            return jsonify({"error": plaid_transactions["error"]}), 400
+        if background:
+            job = get_jobs().submit(
+                "plaid_sync",
+                sync_plaid_transactions,
+                token, start_date, end_date, limit,
+                description=f"Plaid transactions {start_date} to {end_date}"
+            )
+            logging.info(f"✅ Plaid sync queued as job {job.id}")
+            return jsonify({"job_id": job.id, "status_url": f"/jobs/{job.id}"}), 202
 
-        logging.info(f"✅ Transactions Retrieved: {len(plaid_transactions)} transactions")
+        # Stream pages from Plaid straight into the loader so each page is saved as it arrives.
+        # Only the counts are returned: callers read the saved rows from /transactions/get-from-db
+        save_result = sync_plaid_transactions(token, start_date, end_date, limit)
 
-        save_result = loader.save_plaid_transactions(plaid_transactions)
-        logging.info(f"✅ Saved transactions to database: {save_result}")
-        return jsonify({"transactions": plaid_transactions})
+        # Nothing was fetched and the page source failed, so report the Plaid error
+        if not save_result["success"] and save_result["pages"] == 0:
+            logging.warning(f"⚠️ Error from Plaid service: {save_result['message']}")
+            return jsonify({"error": f"Failed to fetch transactions: {save_result['message']}"}), 400
+
+        logging.info(f"✅ Saved transactions to database: {save_result['message']}")
+        return jsonify(save_result)
     except Exception as e:
         logging.error(f"❌ Error fetching transactions: {str(e)}", exc_info=True)
         return jsonify({"error": f"Failed to fetch transactions: {str(e)}"}), 500
 
 
-@app.route('/transactions/update', methods=['PUT'])
+@api.route("/transactions/sync", methods=["POST"])
+def sync_transactions():
+    """Apply incremental transaction changes from Plaid's cursor-based /transactions/sync."""
+    try:
+        logging.info("🔹 Request received: /transactions/sync")
+
+        token = get_access_token()
+        if token is None:
+            logging.warning("⚠️ No access token available")
+            return jsonify({"error": "No access token available"}), 400
+
+        error_response = database_write_error()
+        if error_response:
+            return error_response
+
+        if (request.get_json(silent=True) or {}).get("background", True):
+            job = get_jobs().submit("plaid_sync", get_service().sync_transactions, token, get_loader(),
+                                    description="Plaid incremental sync")
+            logging.info(f"✅ Plaid incremental sync queued as job {job.id}")
+            return jsonify({"job_id": job.id, "status_url": f"/jobs/{job.id}"}), 202
+
+        result = get_service().sync_transactions(token, get_loader())
+        if not result["success"]:
+            logging.warning(f"⚠️ Transactions sync failed: {result['message']}")
+            return jsonify({"error": result["message"], "result": result}), 400
+
+        logging.info(f"✅ Transactions synced: {result}")
+        return jsonify(result)
+    except Exception as e:
+        logging.error(f"❌ Error syncing transactions: {str(e)}", exc_info=True)
+        return jsonify({"error": f"Failed to sync transactions: {str(e)}"}), 500
+
+
+@api.route('/transactions/update', methods=['PUT'])
 def update_transaction():
     """Update a transaction in the database."""
     try:
         logging.info("🔹 Request received: /transactions/update")
 
-        # Check if we have a database connection
-        if db is None:
-            logging.error("❌ Database connection not available")
-            return jsonify({"error": "Database connection failed"}), 500
+        # Check if we have a database connection that accepts writes
+        error_response = database_write_error()
+        if error_response:
+            return error_response
+        db = get_database()
 
         # Get transaction data from request
         transaction_data = request.json
@@ -365,19 +513,37 @@ def update_transaction():
         # Remove None values
         update_fields = {k: v for k, v in update_fields.items() if v is not None}
 
+        # Dates are stored as BSON dates alongside their YYYYMM month key
+        if "date" in update_fields:
+            parsed_date = Transaction.parse_date(update_fields["date"])
+            if parsed_date is None:
+                logging.warning(f"⚠️ Invalid date for transaction {transaction_id}: {update_fields['date']}")
+                return jsonify({"error": "date must be in YYYY-MM-DD format"}), 400
+            update_fields["date"] = parsed_date
+            update_fields["yyyymm"] = Transaction.month_key(parsed_date)
+
         if not update_fields:
             logging.warning("⚠️ No fields to update")
             return jsonify({"error": "No fields to update"}), 400
 
-        # Perform update
-        result = db.transactions.update_one(
-            {"transaction_id": transaction_id},
-            {"$set": update_fields}
-        )
+        # Perform update, reading back the previous values to move the daily rollup contribution.
+        # The lock keeps a concurrent import of the same transaction from applying a stale delta
+        with rollup_write_lock:
+            previous = db.transactions.find_one_and_update(
+                {"transaction_id": transaction_id},
+                {"$set": {**update_fields, "last_updated": Transaction.last_updated_now()}},
+                projection=ROLLUP_SOURCE_FIELDS,
+                return_document=ReturnDocument.BEFORE
+            )
+
+            if previous is None:
+                logging.warning(f"⚠️ Transaction not found: {transaction_id}")
+                return jsonify({"error": "Transaction not found"}), 404
 
-        if result.matched_count == 0:
-            logging.warning(f"⚠️ Transaction not found: {transaction_id}")
-            return jsonify({"error": "Transaction not found"}), 404
+            rollup_result = get_loader().rollups.apply([previous], [{**previous, **update_fields}])
+        if rollup_result["error"]:
+            logging.error(f"❌ Daily rollup update for {transaction_id} failed: {rollup_result['error']}")
+        bump_generation()
 
         logging.info(f"✅ Transaction updated: {transaction_id}")
         return jsonify({
@@ -391,7 +557,35 @@ def update_transaction():
         return jsonify({"error": f"Failed to update transaction: {str(e)}"}), 500
 
 
-@app.route('/upload', methods=['POST'])
+@api.route('/transactions/<transaction_id>/raw', methods=['GET'])
+def get_raw_transaction(transaction_id):
+    """Return the raw source payload of a single transaction, for the detail view."""
+    try:
+        logging.info(f"🔹 Request received: /transactions/{transaction_id}/raw")
+
+        # Check if we have a database connection
+        db = get_database()
+        if db is None:
+            logging.error("❌ Database connection not available")
+            return jsonify({"error": "Database connection failed"}), 500
+
+        payload = get_loader().payloads.get(transaction_id)
+        if payload is None:
+            # Documents written before the payload split still embed their payload
+            legacy = db.transactions.find_one({"transaction_id": transaction_id}, {"_id": 0, "original_data": 1})
+            payload = legacy.get("original_data") if legacy else None
+
+        if payload is None:
+            logging.warning(f"⚠️ Raw payload not found: {transaction_id}")
+            return jsonify({"error": "Raw payload not found"}), 404
+
+        return jsonify({"transaction_id": transaction_id, "original_data": payload})
+    except Exception as e:
+        logging.error(f"❌ Error fetching raw transaction payload: {str(e)}", exc_info=True)
+        return jsonify({"error": f"Failed to fetch raw transaction payload: {str(e)}"}), 500
+
+
+@api.route('/upload', methods=['POST'])
 def upload_file():
     """Handle transaction data file uploads (Excel or CSV)."""
     try:
@@ -409,6 +603,10 @@ def upload_file():
             logging.warning("⚠️ No file selected")
             return jsonify({"error": "No file selected"}), 400
 
+        error_response = database_write_error()
+        if error_response:
+            return error_response
+
         # Check if the file type is allowed
         if file and allowed_file(file.filename):
             # Create a unique filename to prevent overwriting
@@ -417,19 +615,29 @@ def upload_file():
             unique_filename = f"{uuid.uuid4().hex}.{file_extension}"
 
             # Save the file
-            filepath = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
+            os.makedirs(current_app.config['UPLOAD_FOLDER'], exist_ok=True)
+            filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], unique_filename)
             file.save(filepath)
 
-            # Process the file and load transactions
-            result = loader.load_from_excel(filepath)
+            # Import the file in the background so large exports don't block the request
+            # The original name, not the generated one, keeps generated transaction ids stable across re-uploads
+            try:
+                job = get_jobs().submit(
+                    "upload", import_uploaded_file, filepath, original_filename, description=original_filename
+                )
+            except Exception:
+                # The job would have deleted the file once done
+                os.remove(filepath)
+                raise
 
-            logging.info(f"✅ File uploaded and processed: {original_filename}")
+            logging.info(f"✅ File uploaded and queued for import as job {job.id}: {original_filename}")
             return jsonify({
                 "success": True,
-                "message": "File uploaded and processed successfully",
+                "message": "File uploaded, import started",
                 "original_filename": original_filename,
-                "result": result
-            })
+                "job_id": job.id,
+                "status_url": f"/jobs/{job.id}"
+            }), 202
         else:
             logging.warning(f"⚠️ File type not allowed: {file.filename}")
             return jsonify({
@@ -441,13 +649,14 @@ def upload_file():
         return jsonify({"error": f"Failed to upload file: {str(e)}"}), 500
 
 
-@app.route('/analysis/spending-by-category', methods=['GET'])
+@api.route('/analysis/spending-by-category', methods=['GET'])
 def spending_by_category():
     """Analyze spending by category."""
     try:
         logging.info("🔹 Request received: /analysis/spending-by-category")
 
         # Check if we have a database connection
+        db = get_database()
         if db is None:
             logging.error("❌ Database connection not available")
             return jsonify({"error": "Database connection failed"}), 500
@@ -455,7 +664,12 @@ def spending_by_category():
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
 
-        result = analyzer.spending_by_category(start_date, end_date)
+        error = invalid_date_filter(start_date, end_date)
+        if error:
+            logging.warning(f"⚠️ Invalid date filter: {error}")
+            return jsonify({"error": error}), 400
+
+        result = get_analyzer().spending_by_category(start_date, end_date)
         logging.info("✅ Spending by category analysis completed")
         return jsonify(result)
     except Exception as e:
@@ -463,20 +677,26 @@ def spending_by_category():
         return jsonify({"error": f"Failed to analyze spending: {str(e)}"}), 500
 
 
-@app.route('/analysis/monthly-trend', methods=['GET'])
+@api.route('/analysis/monthly-trend', methods=['GET'])
 def monthly_trend():
     """Analyze monthly spending trends."""
     try:
         logging.info("🔹 Request received: /analysis/monthly-trend")
 
         # Check if we have a database connection
+        db = get_database()
         if db is None:
             logging.error("❌ Database connection not available")
             return jsonify({"error": "Database connection failed"}), 500
 
         year = request.args.get('year')
 
-        result = analyzer.monthly_spending_trend(year)
+        error = invalid_date_filter(year=year)
+        if error:
+            logging.warning(f"⚠️ Invalid date filter: {error}")
+            return jsonify({"error": error}), 400
+
+        result = get_analyzer().monthly_spending_trend(year)
         logging.info("✅ Monthly spending trend analysis completed")
         return jsonify(result)
     except Exception as e:
@@ -484,13 +704,14 @@ def monthly_trend():
         return jsonify({"error": f"Failed to analyze monthly trend: {str(e)}"}), 500
 
 
-@app.route('/analysis/top-merchants', methods=['GET'])
+@api.route('/analysis/top-merchants', methods=['GET'])
 def top_merchants():
     """Get top merchants by spending amount."""
     try:
         logging.info("🔹 Request received: /analysis/top-merchants")
 
         # Check if we have a database connection
+        db = get_database()
         if db is None:
             logging.error("❌ Database connection not available")
             return jsonify({"error": "Database connection failed"}), 500
@@ -499,7 +720,12 @@ def top_merchants():
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
 
-        result = analyzer.top_merchants(limit, start_date, end_date)
+        error = invalid_date_filter(start_date, end_date)
+        if error:
+            logging.warning(f"⚠️ Invalid date filter: {error}")
+            return jsonify({"error": error}), 400
+
+        result = get_analyzer().top_merchants(limit, start_date, end_date)
         logging.info(f"✅ Top {limit} merchants analysis completed")
         return jsonify(result)
     except Exception as e:
@@ -507,8 +733,77 @@ def top_merchants():
         return jsonify({"error": f"Failed to analyze top merchants: {str(e)}"}), 500
 
 
-# Initialize the app before running
-initialize_app()
+@api.route('/analysis/dashboard', methods=['GET'])
+def analysis_dashboard():
+    """Return spending by category, the monthly trend and top merchants in one response."""
+    try:
+        logging.info("🔹 Request received: /analysis/dashboard")
+
+        # Check if we have a database connection
+        db = get_database()
+        if db is None:
+            logging.error("❌ Database connection not available")
+            return jsonify({"error": "Database connection failed"}), 500
+
+        start_date = request.args.get('start_date')
+        end_date = request.args.get('end_date')
+        year = request.args.get('year')
+        limit = request.args.get('limit', default=10, type=int)
+
+        error = invalid_date_filter(start_date, end_date, year)
+        if error:
+            logging.warning(f"⚠️ Invalid date filter: {error}")
+            return jsonify({"error": error}), 400
+
+        result = get_analyzer().dashboard(start_date, end_date, year, limit)
+        logging.info("✅ Analysis dashboard completed")
+        return jsonify(result)
+    except Exception as e:
+        logging.error(f"❌ Error building analysis dashboard: {str(e)}", exc_info=True)
+        return jsonify({"error": f"Failed to build analysis dashboard: {str(e)}"}), 500
+
+
+@api.route('/analysis/cache-stats', methods=['GET'])
+def analysis_cache_stats():
+    """Report hit/miss counters of the /analysis/* result cache, and the analytics snapshot when enabled."""
+    try:
+        stats = analysis_cache.stats()
+        if Config.ANALYTICS_SNAPSHOT:
+            from analytics_snapshot import analytics_snapshot
+            stats["snapshot"] = analytics_snapshot.stats()
+        return jsonify(stats)
+    except Exception as e:
+        logging.error(f"❌ Error fetching analysis cache stats: {str(e)}", exc_info=True)
+        return jsonify({"error": f"Failed to fetch analysis cache stats: {str(e)}"}), 500
+
+
+@api.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Report the status and progress of a background ingest job."""
+    try:
+        job = get_jobs().get(job_id)
+        if job is None:
+            logging.warning(f"⚠️ Job not found: {job_id}")
+            return jsonify({"error": "Job not found"}), 404
+
+        return jsonify(job.to_dict())
+    except Exception as e:
+        logging.error(f"❌ Error fetching job status: {str(e)}", exc_info=True)
+        return jsonify({"error": f"Failed to fetch job status: {str(e)}"}), 500
+
+
+@api.route('/db/pool-stats', methods=['GET'])
+def db_pool_stats():
+    """Report MongoDB connection pool usage and reconnect circuit breaker state."""
+    try:
+        return jsonify(pool_stats())
+    except Exception as e:
+        logging.error(f"❌ Error fetching database pool stats: {str(e)}", exc_info=True)
+        return jsonify({"error": f"Failed to fetch database pool stats: {str(e)}"}), 500
+
+
+# Module-level app for `flask run`, WSGI servers (app:app) and `python app.py`
+app = create_app()
 
 if __name__ == "__main__":
     # 🔹 Load SSL Certificates for HTTPS
@@ -0,0 +1,380 @@
+import asyncio
+import contextlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from pymongo import ReturnDocument
+from config import Config
+from daily_rollups import (
+    REBUILD_PIPELINE, ROLLUP_COLLECTION, ROLLUP_SOURCE_FIELDS, rollup_deltas, rollup_document, rollup_operations,
+    rollup_write_lock
+)
+from index_manager import INDEX_REGISTRY, index_name
+from mongodb_client import client_options, connection_settings, get_database
+from result_cache import analysis_cache, bump_generation, call_arguments
+from raw_payload_store import PAYLOAD_COLLECTION, RawPayloadStore
+from transaction_analyzer import TransactionAnalyzer
+from transaction_loader import TransactionLoader, UpsertPlan
+from transaction_model import Transaction
+
+try:
+    from motor.motor_asyncio import AsyncIOMotorClient
+except ImportError:  # Motor is optional
+    AsyncIOMotorClient = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Collection methods whose result is a cursor that has to be drained
+_CURSOR_METHODS = ("find", "aggregate")
+
+
+class AsyncTransactionRepository:
+    """
+    asyncio data access for the operations of TransactionLoader, TransactionAnalyzer and the
+    /transactions/* routes, so one process can overlap many concurrent queries and writes.
+
+    Two drivers are supported:
+    - "motor": the native async driver, with the same pool options as the sync client.
+      The client binds to the event loop it is first used in, so create the repository inside that loop.
+    - "thread": the regular database from get_database() (MongoDB or the in-memory fallback),
+      with every call run on a bounded thread pool, and loads written by TransactionLoader itself.
+      Used when Motor is not installed or DB_BACKEND=memory.
+
+    Responses are built by the same TransactionAnalyzer helpers as the sync path, so both return identical data.
+    """
+
+    def __init__(self, driver=None):
+        if driver is None:
+            driver = "motor" if AsyncIOMotorClient is not None and Config.DB_BACKEND != "memory" else "thread"
+        if driver not in ("motor", "thread"):
+            raise ValueError("driver must be one of: motor, thread")
+        if driver == "motor" and AsyncIOMotorClient is None:
+            raise RuntimeError("motor is required for the motor driver (pip install motor)")
+
+        self.driver = driver
+        self.use_rollups = Config.ANALYTICS_SOURCE == "rollups"
+        self._indexes_checked = False
+        self._rollups_checked = False
+        self._client = None
+        self._motor_db = None
+        self._executor = None
+        self._loader = None
+        self._writer_lock = None
+        self.payloads = None
+
+        if driver == "motor":
+            settings = connection_settings()
+            self._client = AsyncIOMotorClient(settings["uri"], **client_options())
+            self._motor_db = self._client[settings["database"]]
+            self.payloads = RawPayloadStore(self._motor_db[PAYLOAD_COLLECTION])
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=Config.DB_ASYNC_WORKERS, thread_name_prefix="async-db")
+            self._loader = TransactionLoader()
+
+    async def _run(self, collection_name, method, *args, **kwargs):
+        """Awaits a collection method; find/aggregate cursors are returned as lists."""
+        if self._motor_db is not None:
+            collection = self._motor_db[collection_name]
+            if method in _CURSOR_METHODS:
+                return await getattr(collection, method)(*args, **kwargs).to_list(length=None)
+            return await getattr(collection, method)(*args, **kwargs)
+
+        def call():
+            db = get_database()
+            if db is None:
+                raise RuntimeError("Database connection not available")
+            result = getattr(db[collection_name], method)(*args, **kwargs)
+            return list(result) if method in _CURSOR_METHODS else result
+
+        return await asyncio.get_running_loop().run_in_executor(self._executor, call)
+
+    def close(self):
+        """Closes the Motor client or shuts down the worker threads."""
+        if self._client is not None:
+            self._client.close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+    # /transactions/* routes
+
+    async def find_transactions(self, start_date=None, end_date=None, limit=1000):
+        """
+        Async counterpart of /transactions/get-from-db; the page and the total count are fetched concurrently.
+
+        Args:
+            start_date (str, optional): Filter by start date (YYYY-MM-DD)
+            end_date (str, optional): Filter by end date (YYYY-MM-DD)
+            limit (int): Maximum number of transactions returned, newest first
+
+        Returns:
+            dict: Transactions, total matching count and returned count
+        """
+        query = TransactionAnalyzer._date_query(start_date, end_date)
+        transactions, total_count = await asyncio.gather(
+            self._run("transactions", "find", query, {"original_data": 0}, sort=[("date", -1)], limit=limit),
+            self._run("transactions", "count_documents", query),
+        )
+
+        # Convert ObjectId to string and BSON dates to YYYY-MM-DD for JSON serialization
+        for txn in transactions:
+            if "_id" in txn:
+                txn["_id"] = str(txn["_id"])
+            txn["date"] = Transaction.format_date(txn.get("date"))
+
+        return {
+            "transactions": transactions,
+            "total_count": total_count,
+            "returned_count": len(transactions)
+        }
+
+    async def update_transaction(self, transaction_id, fields):
+        """
+        Async counterpart of /transactions/update.
+
+        Args:
+            transaction_id (str): Transaction to update
+            fields (dict): name, amount, date (YYYY-MM-DD) and/or category; None values are ignored
+
+        Returns:
+            bool: True if the transaction exists
+
+        Raises:
+            ValueError: If there is nothing to update or the date is invalid
+        """
+        update_fields = {key: fields.get(key) for key in ("name", "amount", "date", "category")}
+        update_fields = {key: value for key, value in update_fields.items() if value is not None}
+
+        # Dates are stored as BSON dates alongside their YYYYMM month key
+        if "date" in update_fields:
+            parsed_date = Transaction.parse_date(update_fields["date"])
+            if parsed_date is None:
+                raise ValueError("date must be in YYYY-MM-DD format")
+            update_fields["date"] = parsed_date
+            update_fields["yyyymm"] = Transaction.month_key(parsed_date)
+
+        if not update_fields:
+            raise ValueError("No fields to update")
+
+        async with self._rollup_writer():
+            previous = await self._run(
+                "transactions", "find_one_and_update", {"transaction_id": transaction_id},
+                {"$set": {**update_fields, "last_updated": Transaction.last_updated_now()}},
+                projection=ROLLUP_SOURCE_FIELDS, return_document=ReturnDocument.BEFORE
+            )
+            if previous is None:
+                return False
+
+            await self._apply_rollups([previous], [{**previous, **update_fields}], transaction_id)
+        bump_generation()
+        return True
+
+    async def get_raw_payload(self, transaction_id):
+        """Async counterpart of /transactions/<id>/raw. Returns the raw payload, or None if none is stored."""
+        document = await self._run(PAYLOAD_COLLECTION, "find_one", {"transaction_id": transaction_id})
+        if document is not None:
+            return RawPayloadStore.decode(document)
+
+        # Documents written before the payload split still embed their payload
+        legacy = await self._run("transactions", "find_one", {"transaction_id": transaction_id}, {"_id": 0, "original_data": 1})
+        return legacy.get("original_data") if legacy else None
+
+    # TransactionLoader
+
+    async def _ensure_rollups(self):
+        """Async counterpart of DailyRollupStore.ensure_built, run once per repository."""
+        if self._rollups_checked:
+            return
+        has_rollups, has_transactions = await asyncio.gather(
+            self._run(ROLLUP_COLLECTION, "find_one", {}, {"_id": 1}),
+            self._run("transactions", "find_one", {}, {"_id": 1}),
+        )
+        await self._ensure_indexes()
+        if has_rollups is None and has_transactions is not None:
+            logging.info("ℹ️ daily_rollups is empty, building it from the transactions collection")
+            groups = await self._run("transactions", "aggregate", REBUILD_PIPELINE, allowDiskUse=True)
+            await self._run(ROLLUP_COLLECTION, "delete_many", {})
+            if groups:
+                await self._run(ROLLUP_COLLECTION, "insert_many", [rollup_document(group) for group in groups])
+        self._rollups_checked = True
+
+    async def _apply_rollups(self, removed, added, context):
+        """Applies daily rollup deltas; failures are logged since the transactions are already written."""
+        operations = rollup_operations(rollup_deltas(removed, added))
+        if not operations:
+            return
+        try:
+            await self._ensure_rollups()
+            await self._run(ROLLUP_COLLECTION, "bulk_write", operations, ordered=True)
+        except Exception as e:
+            logging.error(
+                f"❌ Daily rollup update for {context} failed, run `python migrations.py rebuild-rollups`: {str(e)}"
+            )
+
+    @contextlib.asynccontextmanager
+    async def _rollup_writer(self):
+        """
+        Holds the process-wide rollup_write_lock, shared with the sync writers, without blocking the event loop.
+        Coroutines of this repository queue on an asyncio lock; only the first one polls the thread lock.
+        Worker threads never wait on it, so the holder can always get a thread for its own calls.
+        """
+        if self._writer_lock is None:
+            self._writer_lock = asyncio.Lock()
+        async with self._writer_lock:
+            while not rollup_write_lock.acquire(blocking=False):
+                await asyncio.sleep(0.001)
+            try:
+                yield
+            finally:
+                rollup_write_lock.release()
+
+    async def _ensure_indexes(self):
+        """Async counterpart of index_manager.ensure_indexes (create_index is idempotent), run once per repository."""
+        if self._indexes_checked:
+            return
+        for spec in INDEX_REGISTRY:
+            try:
+                await self._run(spec["collection"], "create_index", spec["keys"], unique=spec.get("unique", False))
+            except Exception as e:
+                logging.error(f"❌ Failed to create index {spec['collection']}.{index_name(spec['keys'])}: {str(e)}")
+        self._indexes_checked = True
+
+    async def _upsert_batch(self, offset, batch):
+        """Writes one batch following the same UpsertPlan as TransactionLoader and returns its counts."""
+        async with self._rollup_writer():
+            return await self._write_batch(offset, batch)
+
+    async def _write_batch(self, offset, batch):
+        if self._motor_db is None:
+            # The thread driver shares the sync database, so the loader itself writes the batch
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, self._loader.upsert_batch, offset, batch
+            )
+
+        try:
+            cursor = await self._run(
+                "transactions", "find",
+                {"transaction_id": {"$in": [txn.transaction_id for txn in batch]}},
+                ROLLUP_SOURCE_FIELDS
+            )
+            existing = {doc["transaction_id"]: doc for doc in cursor}
+        except Exception as e:
+            # Fall back to writing the whole batch if the lookup fails
+            logging.warning(f"⚠️ Could not load content hashes for batch at offset {offset}: {str(e)}")
+            existing = None
+
+        plan = UpsertPlan(offset, batch, existing)
+        if not plan.changed:
+            return plan.counts
+
+        error = None
+        try:
+            await self.payloads.collection.bulk_write(self.payloads.operations(plan.changed), ordered=False)
+        except Exception as e:
+            error = e
+        plan.record_payload_write(error)
+        if not plan.changed:
+            return plan.counts
+
+        result, error = None, None
+        try:
+            result = await self._run("transactions", "bulk_write", plan.transaction_operations(), ordered=False)
+        except Exception as e:
+            error = e
+        plan.record_transaction_write(result, error)
+
+        changes = plan.rollup_changes()
+        if changes:
+            await self._apply_rollups(*changes, f"async batch at offset {offset}")
+        return plan.counts
+
+    async def bulk_upsert(self, transactions, batch_size=None):
+        """
+        Async counterpart of TransactionLoader._bulk_upsert. Batches are scheduled together, but each
+        holds rollup_write_lock while it writes, so they are written one at a time.
+
+        Args:
+            transactions (list): Transaction objects to write
+            batch_size (int, optional): Transactions per bulk_write, defaults to LOADER_BATCH_SIZE
+
+        Returns:
+            dict: Inserted/updated/unchanged counts and a list of per-batch errors
+        """
+        batch_size = batch_size or Config.LOADER_BATCH_SIZE
+        await self._ensure_indexes()
+        results = await asyncio.gather(*(
+            self._upsert_batch(start, transactions[start:start + batch_size])
+            for start in range(0, len(transactions), batch_size)
+        ))
+
+        # Cached analysis results are stale once anything was written
+        if sum(counts["unchanged"] for counts in results) < len(transactions):
+            bump_generation()
+
+        totals = {"inserted": 0, "updated": 0, "unchanged": 0, "errors": []}
+        for counts in results:
+            for key in ("inserted", "updated", "unchanged"):
+                totals[key] += counts[key]
+            totals["errors"].extend(counts["errors"])
+        return totals
+
+    # TransactionAnalyzer. Like the sync analyzer, these answer from daily_rollups unless ANALYTICS_SOURCE=transactions
+
+    async def _cached(self, method, arguments, compute):
+        """Serves an analysis from the process-wide cache, sharing entries with the sync TransactionAnalyzer."""
+        arguments = (("use_rollups", self.use_rollups),) + call_arguments(method, None, *arguments)
+        hit, value, generation = analysis_cache.lookup(method.__name__, arguments)
+        if hit:
+            return value
+        value = await compute()
+        analysis_cache.store(method.__name__, arguments, generation, value)
+        return value
+
+    async def _aggregate_source(self, pipeline):
+        if self.use_rollups:
+            await self._ensure_rollups()
+        return await self._run(TransactionAnalyzer.source_fields(self.use_rollups)["collection"], "aggregate", pipeline)
+
+    async def spending_by_category(self, start_date=None, end_date=None):
+        """Async counterpart of TransactionAnalyzer.spending_by_category."""
+        async def compute():
+            result = await self._aggregate_source(
+                TransactionAnalyzer.category_pipeline(start_date, end_date, self.use_rollups)
+            )
+            return TransactionAnalyzer.summarize_categories(result)
+
+        return await self._cached(TransactionAnalyzer.spending_by_category, (start_date, end_date), compute)
+
+    async def monthly_spending_trend(self, year=None):
+        """Async counterpart of TransactionAnalyzer.monthly_spending_trend."""
+        async def compute():
+            result = await self._aggregate_source(TransactionAnalyzer.monthly_pipeline(year, self.use_rollups))
+            return TransactionAnalyzer.summarize_monthly(result)
+
+        return await self._cached(TransactionAnalyzer.monthly_spending_trend, (year,), compute)
+
+    async def top_merchants(self, limit=10, start_date=None, end_date=None):
+        """Async counterpart of TransactionAnalyzer.top_merchants; the date range lookup runs concurrently."""
+        async def compute():
+            merchant_query = self._aggregate_source(
+                TransactionAnalyzer.merchant_pipeline(start_date, end_date, limit, self.use_rollups)
+            )
+            if start_date and end_date:
+                return TransactionAnalyzer.summarize_merchants(await merchant_query, None, start_date, end_date)
+
+            result, date_result = await asyncio.gather(
+                merchant_query,
+                self._aggregate_source(TransactionAnalyzer.date_range_pipeline(start_date, end_date, self.use_rollups)),
+            )
+            return TransactionAnalyzer.summarize_merchants(result, date_result, start_date, end_date)
+
+        return await self._cached(TransactionAnalyzer.top_merchants, (limit, start_date, end_date), compute)
+
+    async def dashboard(self, start_date=None, end_date=None, year=None, limit=10):
+        """Async counterpart of TransactionAnalyzer.dashboard."""
+        async def compute():
+            result = await self._aggregate_source(
+                TransactionAnalyzer.dashboard_pipeline(start_date, end_date, year, limit, self.use_rollups)
+            )
+            return TransactionAnalyzer.summarize_dashboard(result, start_date, end_date)
+
+        return await self._cached(TransactionAnalyzer.dashboard, (start_date, end_date, year, limit), compute)
@@ -0,0 +1,62 @@
+"""
+Microbenchmark of the per-request post-processing in spending_by_category and
+monthly_spending_trend: the pandas path versus the plain Python/NumPy path used below
+Config.ANALYZER_PANDAS_MIN_ROWS. Only the result builders are timed, not the aggregation.
+
+Usage:
+    python benchmarks/bench_analyzer_postprocess.py [--rows 8 12 50 1000] [--repeat 2000]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def category_result(rows):
+    """category_pipeline output with `rows` categories, largest first."""
+    return [{"_id": f"Category {i}", "total_amount": round(5000 / (i + 1), 2), "count": 10 + i}
+            for i in range(rows)]
+
+
+def monthly_data(rows):
+    """The rows summarize_monthly builds from monthly_pipeline output, for `rows` consecutive months."""
+    return [{"year": str(2020 + i // 12), "month": i % 12 + 1, "total_amount": round(1000 + (i * 37.5) % 400, 2),
+             "transaction_count": 20 + i % 7} for i in range(rows)]
+
+
+def per_call(function, argument, repeat):
+    """Mean seconds per call of function(argument) over `repeat` calls, after one warm-up call."""
+    function(argument)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        function(argument)
+    return (time.perf_counter() - started) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[8, 12, 50, 1000])
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    from transaction_analyzer import TransactionAnalyzer
+
+    print(f"{'builder':<10} {'rows':>6} {'pandas':>12} {'fast':>12} {'speedup':>8}")
+    for rows in args.rows:
+        categories = category_result(rows)
+        monthly = monthly_data(rows)
+        for label, slow, fast, argument in (
+            ("category", TransactionAnalyzer._categories_with_pandas, TransactionAnalyzer._categories_fast, categories),
+            ("monthly", TransactionAnalyzer._monthly_with_pandas, TransactionAnalyzer._monthly_fast, monthly),
+        ):
+            pandas_time = per_call(slow, argument, args.repeat)
+            fast_time = per_call(fast, argument, args.repeat)
+            print(f"{label:<10} {rows:>6} {pandas_time * 1e6:>9.1f} us {fast_time * 1e6:>9.1f} us "
+                  f"{pandas_time / fast_time:>7.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
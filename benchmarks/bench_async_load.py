@@ -0,0 +1,171 @@
+"""
+Load test comparing requests/sec of the sync data path (pymongo calls on a pool of worker
+threads, like Flask's threaded server) with AsyncTransactionRepository (one event loop).
+
+The request mix is the dashboard queries plus /transactions/get-from-db pages and updates.
+With --backend memory both paths share the in-process store, which measures the overhead of
+each path; run with --backend mongo (and Motor installed) to measure overlap against a real server.
+
+Usage:
+    python benchmarks/bench_async_load.py [--backend memory|mongo] [--transactions 20000]
+                                          [--requests 500] [--concurrency 32]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def sample_transactions(count):
+    """Transactions spread over two years, 50 merchants and 8 categories."""
+    from transaction_model import Transaction
+
+    transactions = []
+    for i in range(count):
+        txn = Transaction({
+            "transaction_id": f"bench-{i:08d}",
+            "account_id": "bench-account",
+            "name": f"Merchant {i % 50}",
+            "amount": round(1 + (i * 7.31) % 250, 2),
+            "authorized_date": (date(2023, 1, 1) + timedelta(days=i % 730)).isoformat(),
+        })
+        txn.category = f"Category {i % 8}"
+        transactions.append(txn)
+    return transactions
+
+
+def request_mix(count):
+    """The i-th request of the load, as (name, kwargs)."""
+    mix = [
+        ("spending_by_category", {"start_date": "2024-01-01", "end_date": "2024-12-31"}),
+        ("monthly_spending_trend", {"year": "2024"}),
+        ("top_merchants", {"limit": 10}),
+        ("find_transactions", {"start_date": "2024-06-01", "end_date": "2024-06-30", "limit": 100}),
+        ("update_transaction", {}),
+    ]
+    for i in range(count):
+        name, kwargs = mix[i % len(mix)]
+        if name == "update_transaction":
+            kwargs = {"transaction_id": f"bench-{i:08d}", "fields": {"category": f"Category {i % 5}"}}
+        yield name, kwargs
+
+
+def sync_request(analyzer, name, kwargs):
+    """Runs one request through the sync path, the way the Flask routes do."""
+    if name == "find_transactions":
+        from transaction_model import Transaction
+        query = analyzer._date_query(kwargs["start_date"], kwargs["end_date"])
+        collection = analyzer.transactions_collection
+        transactions = list(collection.find(query, {"original_data": 0}).sort("date", -1).limit(kwargs["limit"]))
+        for txn in transactions:
+            txn["_id"] = str(txn["_id"])
+            txn["date"] = Transaction.format_date(txn.get("date"))
+        return {"transactions": transactions, "total_count": collection.count_documents(query)}
+    if name == "update_transaction":
+        from pymongo import ReturnDocument
+        from daily_rollups import ROLLUP_SOURCE_FIELDS, DailyRollupStore
+        from result_cache import bump_generation
+        from transaction_model import Transaction
+        previous = analyzer.transactions_collection.find_one_and_update(
+            {"transaction_id": kwargs["transaction_id"]},
+            {"$set": {**kwargs["fields"], "last_updated": Transaction.last_updated_now()}},
+            projection=ROLLUP_SOURCE_FIELDS, return_document=ReturnDocument.BEFORE
+        )
+        if previous is not None:
+            DailyRollupStore(analyzer.db).apply([previous], [{**previous, **kwargs["fields"]}])
+            bump_generation()
+        return previous is not None
+    return getattr(analyzer, name)(**kwargs)
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def report(label, elapsed, latencies):
+    print(f"{label:<6} {len(latencies) / elapsed:8.1f} req/s   "
+          f"p50 {percentile(latencies, 0.5) * 1000:7.1f} ms   p95 {percentile(latencies, 0.95) * 1000:7.1f} ms")
+
+
+def run_sync(requests, concurrency):
+    from transaction_analyzer import TransactionAnalyzer
+    analyzer = TransactionAnalyzer()
+
+    def timed(name, kwargs):
+        started = time.perf_counter()
+        sync_request(analyzer, name, kwargs)
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = list(executor.map(lambda request: timed(*request), requests))
+    return time.perf_counter() - started, latencies
+
+
+async def run_async(requests, concurrency, driver):
+    from async_repository import AsyncTransactionRepository
+    repository = AsyncTransactionRepository(driver)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def timed(name, kwargs):
+        async with semaphore:
+            started = time.perf_counter()
+            await getattr(repository, name)(**kwargs)
+            return time.perf_counter() - started
+
+    try:
+        started = time.perf_counter()
+        latencies = await asyncio.gather(*(timed(name, kwargs) for name, kwargs in requests))
+        return time.perf_counter() - started, latencies
+    finally:
+        repository.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=("memory", "mongo"), default="memory")
+    parser.add_argument("--driver", choices=("motor", "thread"), default=None,
+                        help="Async driver, defaults to motor when installed")
+    parser.add_argument("--transactions", type=int, default=20000)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    # Must be set before config is imported
+    os.environ["DB_BACKEND"] = args.backend
+    os.environ.setdefault("DB_FALLBACK", "none")
+    # Measure the data path itself rather than /analysis/* cache hits
+    os.environ.setdefault("ANALYSIS_CACHE_SIZE", "0")
+
+    from config import load_settings
+    load_settings()
+    from mongodb_client import get_database
+    from transaction_loader import TransactionLoader
+    if get_database() is None:
+        print("❌ Database connection not available")
+        return 1
+
+    loader = TransactionLoader()
+    seeded = loader._bulk_upsert(sample_transactions(args.transactions))
+    print(f"seeded {args.transactions} transactions ({seeded['inserted']} new) on the {args.backend} backend")
+
+    requests = list(request_mix(args.requests))
+    # Warm up both paths so connection setup is not measured
+    run_sync(requests[:10], args.concurrency)
+    asyncio.run(run_async(requests[:10], args.concurrency, args.driver))
+
+    print(f"{args.requests} requests, concurrency {args.concurrency}")
+    report("sync", *run_sync(requests, args.concurrency))
+    elapsed, latencies = asyncio.run(run_async(requests, args.concurrency, args.driver))
+    report("async", elapsed, latencies)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
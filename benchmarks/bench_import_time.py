@@ -0,0 +1,72 @@
+"""
+Measures the cold-start import time of the backend with `python -X importtime`.
+
+Each run imports the module in a fresh interpreter and reports the cumulative import time,
+the heaviest top-level imports, and whether heavy optional modules (pandas, plaid) were loaded.
+
+Usage:
+    python benchmarks/bench_import_time.py [--module app] [--repeat 5] [--top 10]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that should only be imported when a request first needs them
+LAZY_MODULES = ("pandas", "plaid")
+
+
+def parse_importtime(stderr):
+    """Returns [(cumulative_us, depth, module)] parsed from -X importtime output."""
+    entries = []
+    for line in stderr.splitlines():
+        # Lines look like "import time:   self [us] | cumulative | <indent>module"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        cumulative_us = int(fields[1])
+        module = fields[2].rstrip()
+        depth = (len(module) - len(module.lstrip())) // 2
+        entries.append((cumulative_us, depth, module.strip()))
+    return entries
+
+
+def measure(module):
+    """Imports `module` in a fresh interpreter and returns the parsed importtime entries."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    runs = [measure(args.module) for _ in range(args.repeat)]
+    totals = [next(us for us, _, name in entries if name == args.module) for entries in runs]
+    best = runs[totals.index(min(totals))]
+
+    print(f"import {args.module}: best {min(totals) / 1000:.1f} ms, "
+          f"median {sorted(totals)[len(totals) // 2] / 1000:.1f} ms over {args.repeat} runs")
+
+    print("heaviest direct imports:")
+    direct = sorted(((us, name) for us, depth, name in best if depth == 1), reverse=True)
+    for us, name in direct[:args.top]:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+
+    loaded = {name for _, _, name in best}
+    for lazy in LAZY_MODULES:
+        print(f"{lazy:<8} imported at startup: {'yes' if lazy in loaded else 'no'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Compares the CPU cost of turning one /transactions/get page into Transaction objects
+with and without plaid-python model hydration.
+
+- sdk: ApiClient.deserialize -> response.to_dict() -> Transaction
+- raw: json.loads -> Transaction (PLAID_RAW_JSON mode)
+
+Usage:
+    python benchmarks/bench_plaid_raw_json.py [--page-size 500] [--repeat 20]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from plaid.api_client import ApiClient
+from plaid.configuration import Configuration
+from plaid.model.transactions_get_response import TransactionsGetResponse
+from transaction_model import Transaction
+
+
+def sample_transaction(i):
+    """A sandbox-shaped Plaid transaction."""
+    day = i % 28 + 1
+    return {
+        "account_id": "BxBXxLj1m4HMXBm9WZZmCWVbPjX16EHwv99vp",
+        "account_owner": None,
+        "amount": round(5 + (i * 7.31) % 250, 2),
+        "authorized_date": f"2024-03-{day:02d}",
+        "authorized_datetime": None,
+        "category": ["Food and Drink", "Restaurants"],
+        "category_id": "13005000",
+        "check_number": None,
+        "date": f"2024-03-{day:02d}",
+        "datetime": None,
+        "iso_currency_code": "USD",
+        "location": {
+            "address": "300 Post St", "city": "San Francisco", "region": "CA", "postal_code": "94108",
+            "country": "US", "lat": 40.740352, "lon": -74.001761, "store_number": "1235"
+        },
+        "logo_url": None,
+        "merchant_name": f"Merchant {i % 40}",
+        "name": f"MERCHANT {i % 40} PURCHASE",
+        "payment_channel": "in store",
+        "payment_meta": {
+            "by_order_of": None, "payee": None, "payer": None, "payment_method": None,
+            "payment_processor": None, "ppd_id": None, "reason": None, "reference_number": None
+        },
+        "pending": False,
+        "pending_transaction_id": None,
+        "personal_finance_category": {"detailed": "FOOD_AND_DRINK_RESTAURANT", "primary": "FOOD_AND_DRINK"},
+        "transaction_code": None,
+        "transaction_id": f"lPNjeW1nR6CDn5okmGQ6hEpMo4lLNoSrzqDj{i:06d}",
+        "transaction_type": "place",
+        "unofficial_currency_code": None,
+        "website": None,
+    }
+
+
+def sample_page(page_size):
+    return json.dumps({
+        "accounts": [],
+        "item": {
+            "available_products": [], "billed_products": ["transactions"], "consent_expiration_time": None,
+            "error": None, "institution_id": "ins_3", "item_id": "eVBnVMp7zdTJLkRNr33Rs6zr7KNJqBFL9DrE6",
+            "update_type": "background", "webhook": ""
+        },
+        "request_id": "45QSn",
+        "total_transactions": page_size,
+        "transactions": [sample_transaction(i) for i in range(page_size)],
+    }).encode("utf-8")
+
+
+class FakeResponse:
+    """Stands in for the urllib3 response the SDK normally deserializes."""
+
+    def __init__(self, data):
+        self.data = data
+
+    def getheader(self, name, default=None):
+        return default
+
+
+def sdk_path(api_client, body):
+    response = api_client.deserialize(FakeResponse(body), (TransactionsGetResponse,), True)
+    return [Transaction(txn) for txn in response.to_dict()["transactions"]]
+
+
+def raw_path(api_client, body):
+    return [Transaction(txn) for txn in json.loads(body)["transactions"]]
+
+
+def measure(func, api_client, body, repeat):
+    func(api_client, body)  # warm up
+    start = time.process_time()
+    for _ in range(repeat):
+        func(api_client, body)
+    return (time.process_time() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    api_client = ApiClient(Configuration(host="https://sandbox.plaid.com"))
+    body = sample_page(args.page_size)
+
+    sdk_ms = measure(sdk_path, api_client, body, args.repeat)
+    raw_ms = measure(raw_path, api_client, body, args.repeat)
+
+    print(f"page of {args.page_size} transactions, {len(body) / 1024:.0f} KiB, {args.repeat} runs")
+    print(f"  sdk models : {sdk_ms:8.2f} ms CPU per page")
+    print(f"  raw json   : {raw_ms:8.2f} ms CPU per page")
+    print(f"  saved      : {sdk_ms - raw_ms:8.2f} ms CPU per page ({sdk_ms / raw_ms:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,25 +3,105 @@ from dotenv import load_dotenv
 
 
 class Config:
-    """Loads environment variables securely."""
-    load_dotenv(dotenv_path=".env")
-
-    PLAID_CLIENT_ID = os.getenv("PLAID_CLIENT_ID")
-    PLAID_SECRET = os.getenv("PLAID_SECRET")
-    PLAID_ENV = os.getenv("PLAID_ENV", "sandbox")
-    PLAID_PRODUCTS = os.getenv("PLAID_PRODUCTS", "transactions").split(",")
-    PLAID_COUNTRY_CODES = os.getenv("PLAID_COUNTRY_CODES", "US").split(",")
-
-    # Make sure we have a proper HTTPS URL for the redirect URI
-    # This is required for OAuth flows with Plaid
-    PLAID_REDIRECT_URI = os.getenv("PLAID_REDIRECT_URI", "https://localhost:3000/oauth-callback")
-
-    # Database credentials
-    DB_USER = os.getenv("DB_USER")
-    DB_PASSWORD = os.getenv("DB_PASSWORD")
-    DB_HOST = os.getenv("DB_HOST")
-    DB_PORT = os.getenv("DB_PORT", "5432")
-    DB_NAME = os.getenv("DB_NAME")
+    """
+    Settings read from environment variables.
+    Values are read from the process environment when this module is imported; call load_settings()
+    at startup to also pick up a .env file.
+    """
+
+    @classmethod
+    def reload(cls):
+        """Re-reads every setting from the process environment."""
+        cls.PLAID_CLIENT_ID = os.getenv("PLAID_CLIENT_ID")
+        cls.PLAID_SECRET = os.getenv("PLAID_SECRET")
+        cls.PLAID_ENV = os.getenv("PLAID_ENV", "sandbox")
+        cls.PLAID_PRODUCTS = os.getenv("PLAID_PRODUCTS", "transactions").split(",")
+        cls.PLAID_COUNTRY_CODES = os.getenv("PLAID_COUNTRY_CODES", "US").split(",")
+
+        # Make sure we have a proper HTTPS URL for the redirect URI
+        # This is required for OAuth flows with Plaid
+        cls.PLAID_REDIRECT_URI = os.getenv("PLAID_REDIRECT_URI", "https://localhost:3000/oauth-callback")
+
+        # Maximum number of /transactions/get pages fetched concurrently during backfills
+        cls.PLAID_FETCH_CONCURRENCY = int(os.getenv("PLAID_FETCH_CONCURRENCY", "4"))
+
+        # Client-side Plaid rate limit and retry policy for transient failures
+        cls.PLAID_RATE_LIMIT_PER_SEC = float(os.getenv("PLAID_RATE_LIMIT_PER_SEC", "10"))
+        cls.PLAID_RATE_LIMIT_BURST = int(os.getenv("PLAID_RATE_LIMIT_BURST", "20"))
+        cls.PLAID_MAX_RETRIES = int(os.getenv("PLAID_MAX_RETRIES", "5"))
+        cls.PLAID_BACKOFF_BASE_SECONDS = float(os.getenv("PLAID_BACKOFF_BASE_SECONDS", "0.5"))
+        cls.PLAID_BACKOFF_MAX_SECONDS = float(os.getenv("PLAID_BACKOFF_MAX_SECONDS", "30"))
+
+        # Shared Plaid HTTP connection pool size and per-request timeouts
+        cls.PLAID_POOL_MAXSIZE = int(os.getenv("PLAID_POOL_MAXSIZE", "10"))
+        cls.PLAID_CONNECT_TIMEOUT_SECONDS = float(os.getenv("PLAID_CONNECT_TIMEOUT_SECONDS", "5"))
+        cls.PLAID_READ_TIMEOUT_SECONDS = float(os.getenv("PLAID_READ_TIMEOUT_SECONDS", "30"))
+
+        # How long a /validate-token outcome is reused before Plaid is asked again
+        cls.PLAID_TOKEN_VALIDATION_TTL_SECONDS = int(os.getenv("PLAID_TOKEN_VALIDATION_TTL_SECONDS", "300"))
+
+        # Parse transaction responses as raw JSON instead of building plaid-python model objects.
+        # The payloads differ in detail from the SDK's (e.g. timestamp formats), so switching modes changes
+        # every content_hash and the next load rewrites each stored transaction once
+        cls.PLAID_RAW_JSON = os.getenv("PLAID_RAW_JSON", "false").lower() in ("1", "true", "yes")
+
+        # Database credentials
+        cls.DB_USER = os.getenv("DB_USER")
+        cls.DB_PASSWORD = os.getenv("DB_PASSWORD")
+        cls.DB_HOST = os.getenv("DB_HOST")
+        cls.DB_PORT = os.getenv("DB_PORT", "5432")
+        cls.DB_NAME = os.getenv("DB_NAME")
+
+        # MongoDB connection pool sizing and timeouts
+        cls.DB_MAX_POOL_SIZE = int(os.getenv("DB_MAX_POOL_SIZE", "50"))
+        cls.DB_MIN_POOL_SIZE = int(os.getenv("DB_MIN_POOL_SIZE", "0"))
+        cls.DB_MAX_IDLE_TIME_MS = int(os.getenv("DB_MAX_IDLE_TIME_MS", "300000"))
+        cls.DB_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("DB_WAIT_QUEUE_TIMEOUT_MS", "5000"))
+        cls.DB_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("DB_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+        cls.DB_CONNECT_TIMEOUT_MS = int(os.getenv("DB_CONNECT_TIMEOUT_MS", "5000"))
+        cls.DB_SOCKET_TIMEOUT_MS = int(os.getenv("DB_SOCKET_TIMEOUT_MS", "10000"))
+
+        # Reconnect circuit breaker: after a failed connect, wait this long (doubling per failure, capped) before retrying
+        cls.DB_RECONNECT_BASE_SECONDS = float(os.getenv("DB_RECONNECT_BASE_SECONDS", "2"))
+        cls.DB_RECONNECT_MAX_SECONDS = float(os.getenv("DB_RECONNECT_MAX_SECONDS", "60"))
+
+        # Storage backend: "mongo", or "memory" to always use the in-process store (benchmarks, local development)
+        cls.DB_BACKEND = os.getenv("DB_BACKEND", "mongo").lower()
+        # What get_database() returns while MongoDB is unreachable: "none", or "memory" to keep serving reads
+        # from the in-process store (read-only: writes are refused until MongoDB reconnects)
+        cls.DB_FALLBACK = os.getenv("DB_FALLBACK", "none").lower()
+
+        # Async repository: threads used to run pymongo calls when Motor is not installed (or DB_BACKEND=memory)
+        cls.DB_ASYNC_WORKERS = int(os.getenv("DB_ASYNC_WORKERS", "16"))
+
+        # Analytics source: "rollups" (pre-aggregated daily_rollups) or "transactions" (re-aggregate every call)
+        cls.ANALYTICS_SOURCE = os.getenv("ANALYTICS_SOURCE", "rollups").lower()
+
+        # Answer /analysis/* from an in-process columnar snapshot of the transactions collection
+        cls.ANALYTICS_SNAPSHOT = os.getenv("ANALYTICS_SNAPSHOT", "false").lower() in ("1", "true", "yes")
+        # Seconds before the snapshot re-checks MongoDB for writes made by other processes
+        cls.ANALYTICS_SNAPSHOT_MAX_AGE = float(os.getenv("ANALYTICS_SNAPSHOT_MAX_AGE", "30"))
+
+        # Maximum number of /analysis/* results kept in the in-process LRU cache (0 disables caching)
+        cls.ANALYSIS_CACHE_SIZE = int(os.getenv("ANALYSIS_CACHE_SIZE", "256"))
+
+        # Analysis results with more rows than this are post-processed with pandas instead of plain Python/NumPy
+        cls.ANALYZER_PANDAS_MIN_ROWS = int(os.getenv("ANALYZER_PANDAS_MIN_ROWS", "1000"))
+
+        # Number of transactions written per MongoDB bulk_write batch
+        cls.LOADER_BATCH_SIZE = int(os.getenv("LOADER_BATCH_SIZE", "1000"))
+
+        # Compression for raw transaction payloads kept in transaction_payloads: none, zlib or zstd (needs zstandard)
+        cls.RAW_PAYLOAD_COMPRESSION = os.getenv("RAW_PAYLOAD_COMPRESSION", "zlib")
+        cls.RAW_PAYLOAD_COMPRESSION_LEVEL = int(os.getenv("RAW_PAYLOAD_COMPRESSION_LEVEL", "6"))
+
+        # File uploads: rows parsed per import chunk and the maximum accepted upload size
+        cls.UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", "5000"))
+        cls.MAX_UPLOAD_MB = int(os.getenv("MAX_UPLOAD_MB", "512"))
+
+        # Background ingest jobs: worker threads and how many finished jobs to keep for status polling
+        cls.JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+        cls.JOB_HISTORY_SIZE = int(os.getenv("JOB_HISTORY_SIZE", "100"))
 
     @classmethod
     def validate(cls):
@@ -44,4 +124,17 @@ class Config:
         if cls.PLAID_REDIRECT_URI and not cls.PLAID_REDIRECT_URI.startswith("https://"):
             print(f"WARNING: PLAID_REDIRECT_URI should use HTTPS. Current value: {cls.PLAID_REDIRECT_URI}")
 
-        return True
\ No newline at end of file
+        return True
+
+
+def load_settings(dotenv_path=".env"):
+    """
+    Loads a .env file into the process environment and re-reads Config from it.
+    Variables already set in the environment take precedence over the file. Call it once at
+    startup, before any service or connection is created.
+    """
+    load_dotenv(dotenv_path=dotenv_path)
+    Config.reload()
+
+
+Config.reload()
@@ -0,0 +1,19 @@
+import os
+
+# Tests run against the in-process store; set before config.py is imported by any test module
+os.environ.setdefault("DB_BACKEND", "memory")
+os.environ.setdefault("DB_FALLBACK", "none")
+
+import pytest
+import mongodb_client
+from memory_store import MemoryDatabase
+from result_cache import analysis_cache
+
+
+@pytest.fixture
+def memory_db(monkeypatch):
+    """A fresh in-memory database returned by get_database() for the duration of a test."""
+    db = MemoryDatabase("expenses-test")
+    monkeypatch.setattr(mongodb_client, "_memory_database", db)
+    analysis_cache.bump_generation()
+    return db
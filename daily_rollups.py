@@ -0,0 +1,190 @@
+import logging
+import threading
+from pymongo import DeleteMany, InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+from config import Config
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Collection holding one pre-aggregated document per (day, category, merchant, currency)
+ROLLUP_COLLECTION = "daily_rollups"
+
+# Transaction fields a rollup contribution is computed from; writers read these back before changing a document
+ROLLUP_SOURCE_FIELDS = {"_id": 0, "transaction_id": 1, "content_hash": 1, "date": 1, "yyyymm": 1,
+                        "category": 1, "name": 1, "iso_currency_code": 1, "amount": 1}
+
+# Held by every transaction writer in this process from reading the stored values until its rollup
+# deltas are applied. Otherwise two writers changing the same transaction would both subtract the
+# value they read, and the rollups would drift. Writers in other processes (e.g. migrations.py)
+# are not covered; `python migrations.py rebuild-rollups` corrects any drift they cause.
+rollup_write_lock = threading.Lock()
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def rollup_key(document):
+    """Returns the (day, category, merchant, currency) key a transaction document contributes to."""
+    # The merchant is the transaction `name`, which is what top_merchants reports
+    return (document.get("date"), document.get("category"), document.get("name"), document.get("iso_currency_code"))
+
+
+# Recomputes every rollup from the transactions collection
+REBUILD_PIPELINE = [
+    {"$group": {
+        "_id": {"day": "$date", "category": "$category", "merchant": "$name", "currency": "$iso_currency_code"},
+        "yyyymm": {"$first": "$yyyymm"},
+        "total_amount": {"$sum": "$amount"},
+        "count": {"$sum": 1},
+        "min_amount": {"$min": "$amount"},
+        "max_amount": {"$max": "$amount"}
+    }}
+]
+
+
+def rollup_document(group):
+    """Flattens one REBUILD_PIPELINE result into a daily_rollups document."""
+    document = dict(group["_id"])
+    document.update({key: value for key, value in group.items() if key != "_id"})
+    return document
+
+
+def rollup_deltas(removed=(), added=()):
+    """
+    Computes the per-key changes for transaction documents leaving and entering the rollups.
+    An updated transaction is passed as its old document in `removed` and its new one in `added`.
+
+    Args:
+        removed (iterable): Transaction documents whose contribution is subtracted
+        added (iterable): Transaction documents whose contribution is added
+
+    Returns:
+        dict: {key: {"yyyymm", "total_amount", "count", "min_amount", "max_amount"}} for keys that changed
+    """
+    deltas = {}
+
+    def delta_for(document):
+        key = rollup_key(document)
+        delta = deltas.get(key)
+        if delta is None:
+            delta = deltas[key] = {"yyyymm": document.get("yyyymm"), "total_amount": 0, "count": 0,
+                                   "min_amount": None, "max_amount": None}
+        return delta
+
+    for document in removed:
+        delta = delta_for(document)
+        delta["count"] -= 1
+        if _is_number(document.get("amount")):
+            delta["total_amount"] -= document["amount"]
+
+    for document in added:
+        delta = delta_for(document)
+        delta["count"] += 1
+        amount = document.get("amount")
+        if _is_number(amount):
+            delta["total_amount"] += amount
+            delta["min_amount"] = amount if delta["min_amount"] is None else min(delta["min_amount"], amount)
+            delta["max_amount"] = amount if delta["max_amount"] is None else max(delta["max_amount"], amount)
+
+    # An update that leaves the key and amount unchanged cancels out
+    return {key: delta for key, delta in deltas.items()
+            if delta["count"] or delta["total_amount"] or delta["min_amount"] is not None}
+
+
+def rollup_operations(deltas):
+    """
+    Turns rollup deltas into an ordered list of bulk_write requests: one `$inc` upsert per key,
+    followed by a cleanup of keys whose count dropped to zero when anything was removed.
+    min_amount/max_amount only ever widen; a rebuild narrows them again after removals.
+    """
+    operations = []
+    shrinking = False
+    for (day, category, merchant, currency), delta in deltas.items():
+        update = {
+            "$inc": {"total_amount": delta["total_amount"], "count": delta["count"]},
+            "$setOnInsert": {"yyyymm": delta["yyyymm"]},
+        }
+        if delta["min_amount"] is not None:
+            update["$min"] = {"min_amount": delta["min_amount"]}
+            update["$max"] = {"max_amount": delta["max_amount"]}
+        operations.append(UpdateOne(
+            {"day": day, "category": category, "merchant": merchant, "currency": currency},
+            update, upsert=True
+        ))
+        shrinking = shrinking or delta["count"] < 0
+
+    if shrinking:
+        operations.append(DeleteMany({"count": {"$lte": 0}}))
+    return operations
+
+
+class DailyRollupStore:
+    """
+    Maintains the `daily_rollups` collection: sum, count, min and max of transaction amounts per
+    (day, category, merchant, currency). Writers apply `$inc` deltas as they change transactions,
+    so analytics read a number of documents proportional to the days in range rather than to the
+    number of transactions. The unique key index is provisioned by index_manager.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.collection = db[ROLLUP_COLLECTION]
+
+    def apply(self, removed=(), added=()):
+        """
+        Applies the rollup changes for transaction documents leaving and entering the collection.
+
+        Args:
+            removed (iterable): Old transaction documents (projected on ROLLUP_SOURCE_FIELDS)
+            added (iterable): New transaction documents
+
+        Returns:
+            dict: Number of rollup keys written and an error message if the write failed
+        """
+        operations = rollup_operations(rollup_deltas(removed, added))
+        if not operations:
+            return {"written": 0, "error": None}
+
+        try:
+            # Ordered, so the zero-count cleanup runs after the decrements
+            result = self.collection.bulk_write(operations, ordered=True)
+            return {"written": result.upserted_count + result.modified_count, "error": None}
+        except BulkWriteError as e:
+            write_errors = (e.details or {}).get("writeErrors", [])
+            return {"written": 0, "error": write_errors[0].get("errmsg") if write_errors else str(e)}
+        except Exception as e:
+            return {"written": 0, "error": str(e)}
+
+    def rebuild(self, batch_size=None):
+        """
+        Recomputes every rollup from the transactions collection, e.g. after a migration or to
+        correct drift from concurrent writers. Readers may see partial totals while it runs.
+
+        Returns:
+            int: Number of rollup documents written
+        """
+        batch_size = batch_size or Config.LOADER_BATCH_SIZE
+        self.collection.delete_many({})
+        written = 0
+        operations = []
+        for group in self.db["transactions"].aggregate(REBUILD_PIPELINE, allowDiskUse=True):
+            operations.append(InsertOne(rollup_document(group)))
+            if len(operations) >= batch_size:
+                written += self.collection.bulk_write(operations, ordered=False).inserted_count
+                operations = []
+        if operations:
+            written += self.collection.bulk_write(operations, ordered=False).inserted_count
+
+        logging.info(f"✅ Rebuilt {written} daily rollups")
+        return written
+
+    def ensure_built(self):
+        """
+        Builds the rollups once for a database that has transactions but no rollups yet.
+        Must run before the first incremental update, which would otherwise make the rollups look built.
+        """
+        if self.collection.find_one({}, {"_id": 1}) is None and self.db["transactions"].find_one({}, {"_id": 1}) is not None:
+            logging.info("ℹ️ daily_rollups is empty, building it from the transactions collection")
+            self.rebuild()
@@ -21,81 +21,31 @@ const AnalysisDashboard = () => {
         year: new Date().getFullYear().toString()
     });
 
-    // Fetch category spending data
-    const fetchCategoryData = async () => {
-        setLoading(prev => ({ ...prev, categories: true }));
-        setError(prev => ({ ...prev, categories: null }));
+    // Fetch the whole dashboard (categories, monthly trend, top merchants) in one request
+    const fetchDashboard = async () => {
+        setLoading({ categories: true, monthly: true, merchants: true });
+        setError({ categories: null, monthly: null, merchants: null });
 
         try {
-            const response = await axios.get("https://localhost:8000/analysis/spending-by-category", {
-                params: {
-                    start_date: dateRange.startDate,
-                    end_date: dateRange.endDate
-                },
-                withCredentials: true
-            });
-
-            setCategoryData(response.data);
-        } catch (err) {
-            console.error("Error fetching category data:", err);
-            setError(prev => ({
-                ...prev,
-                categories: err.response?.data?.error || "Failed to fetch category data"
-            }));
-        } finally {
-            setLoading(prev => ({ ...prev, categories: false }));
-        }
-    };
-
-    // Fetch monthly trend data
-    const fetchMonthlyData = async () => {
-        setLoading(prev => ({ ...prev, monthly: true }));
-        setError(prev => ({ ...prev, monthly: null }));
-
-        try {
-            const response = await axios.get("https://localhost:8000/analysis/monthly-trend", {
-                params: {
-                    year: dateRange.year
-                },
-                withCredentials: true
-            });
-
-            setMonthlyData(response.data);
-        } catch (err) {
-            console.error("Error fetching monthly data:", err);
-            setError(prev => ({
-                ...prev,
-                monthly: err.response?.data?.error || "Failed to fetch monthly data"
-            }));
-        } finally {
-            setLoading(prev => ({ ...prev, monthly: false }));
-        }
-    };
-
-    // Fetch top merchants data
-    const fetchMerchantData = async () => {
-        setLoading(prev => ({ ...prev, merchants: true }));
-        setError(prev => ({ ...prev, merchants: null }));
-
-        try {
-            const response = await axios.get("https://localhost:8000/analysis/top-merchants", {
+            const response = await axios.get("https://localhost:8000/analysis/dashboard", {
                 params: {
                     start_date: dateRange.startDate,
                     end_date: dateRange.endDate,
+                    year: dateRange.year,
                     limit: 10
                 },
                 withCredentials: true
             });
 
-            setMerchantData(response.data);
+            setCategoryData(response.data.spending_by_category);
+            setMonthlyData(response.data.monthly_trend);
+            setMerchantData(response.data.top_merchants);
         } catch (err) {
-            console.error("Error fetching merchant data:", err);
-            setError(prev => ({
-                ...prev,
-                merchants: err.response?.data?.error || "Failed to fetch merchant data"
-            }));
+            console.error("Error fetching dashboard data:", err);
+            const message = err.response?.data?.error || "Failed to fetch dashboard data";
+            setError({ categories: message, monthly: message, merchants: message });
         } finally {
-            setLoading(prev => ({ ...prev, merchants: false }));
+            setLoading({ categories: false, monthly: false, merchants: false });
         }
     };
 
@@ -110,16 +60,12 @@ const AnalysisDashboard = () => {
 
     // Initial data fetch
     useEffect(() => {
-        fetchCategoryData();
-        fetchMonthlyData();
-        fetchMerchantData();
+        fetchDashboard();
     }, []);
 
     // Refresh data based on filters
     const handleRefresh = () => {
-        fetchCategoryData();
-        fetchMonthlyData();
-        fetchMerchantData();
+        fetchDashboard();
     };
 
     // Format currency
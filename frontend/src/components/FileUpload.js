@@ -48,7 +48,22 @@ const FileUpload = ({ onUploadSuccess }) => {
                 withCredentials: true
             });
 
-            setUploadResult(response.data);
+            // The server imports the file in the background; poll the job until it finishes
+            let job = { status: "queued" };
+            while (job.status === "queued" || job.status === "running") {
+                await new Promise(resolve => setTimeout(resolve, 1000));
+                const jobResponse = await axios.get(`https://localhost:8000${response.data.status_url}`, {
+                    withCredentials: true
+                });
+                job = jobResponse.data;
+            }
+
+            if (job.status === "failed") {
+                const lastError = job.errors.length ? job.errors[job.errors.length - 1] : null;
+                throw new Error((job.result && job.result.message) || (typeof lastError === "string" ? lastError : "Import failed."));
+            }
+
+            setUploadResult({ ...job.result, success: true });
             setFile(null);
 
             // Reset file input
@@ -56,7 +71,7 @@ const FileUpload = ({ onUploadSuccess }) => {
 
             // Call the success callback if provided
             if (onUploadSuccess && typeof onUploadSuccess === 'function') {
-                onUploadSuccess(response.data);
+                onUploadSuccess(job.result);
             }
 
         } catch (err) {
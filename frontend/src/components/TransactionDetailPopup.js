@@ -1,8 +1,31 @@
-import React from 'react';
+import React, { useEffect, useState } from 'react';
+import axios from 'axios';
 
 const TransactionDetailPopup = ({ transaction, onClose, onEdit }) => {
+    const [rawData, setRawData] = useState(null);
+
+    // Rows loaded from the database don't carry the raw Plaid payload, so fetch it on demand
+    useEffect(() => {
+        setRawData(null);
+        if (!transaction || !transaction.transaction_id || transaction.payment_channel !== undefined) return;
+
+        let cancelled = false;
+        axios.get(`https://localhost:8000/transactions/${encodeURIComponent(transaction.transaction_id)}/raw`, {
+            withCredentials: true
+        })
+            .then(response => {
+                if (!cancelled) setRawData(response.data.original_data);
+            })
+            .catch(err => console.error("Error fetching raw transaction:", err));
+
+        return () => { cancelled = true; };
+    }, [transaction]);
+
     if (!transaction) return null;
 
+    // Fields from the raw payload fill in whatever the list row doesn't have
+    const details = rawData ? { ...rawData, ...transaction } : transaction;
+
     // Format date for display
     const formatDate = (dateString) => {
         const date = new Date(dateString);
@@ -97,25 +120,25 @@ const TransactionDetailPopup = ({ transaction, onClose, onEdit }) => {
                             </div>
                         )}
 
-                        {transaction.payment_channel && (
+                        {details.payment_channel && (
                             <div>
                                 <div style={{ fontWeight: 'bold', marginBottom: '5px' }}>Payment Method</div>
-                                <div>{transaction.payment_channel}</div>
+                                <div>{details.payment_channel}</div>
                             </div>
                         )}
 
-                        {transaction.pending !== undefined && (
+                        {details.pending !== undefined && (
                             <div>
                                 <div style={{ fontWeight: 'bold', marginBottom: '5px' }}>Status</div>
-                                <div>{transaction.pending ? "Pending" : "Completed"}</div>
+                                <div>{details.pending ? "Pending" : "Completed"}</div>
                             </div>
                         )}
                     </div>
 
-                    {transaction.location && (
+                    {details.location && (
                         <div style={{ marginTop: '15px' }}>
                             <div style={{ fontWeight: 'bold', marginBottom: '5px' }}>Location</div>
-                            <div>{JSON.stringify(transaction.location)}</div>
+                            <div>{JSON.stringify(details.location)}</div>
                         </div>
                     )}
                 </div>
@@ -35,31 +35,45 @@ const Transactions = ({ accessToken }) => {
         console.log("Fetching transactions with date range:", dateRange);
 
         try {
-            // Try to fetch from the new DB endpoint first
-            let response;
+            // Pull the latest transactions from Plaid into the database. If that fails,
+            // the transactions saved earlier are still shown
             try {
-                // First try the direct DB endpoint which should return all transactions
-                response = await axios.post("https://localhost:8000/transactions/get", {
-                    start_date: dateRange.startDate,
-                    end_date: dateRange.endDate,
-                    limit: 2000 // Request a high limit
-                }, {
-                    withCredentials: true
-                });
-                console.log("Using direct DB endpoint for transactions");
-            } catch (dbErr) {
-                console.log("Direct DB endpoint failed, falling back to Plaid API", dbErr);
-                // Fall back to the Plaid API endpoint
-                response = await axios.post("https://localhost:8000/transactions/get", {
+                const refresh = await axios.post("https://localhost:8000/transactions/get", {
                     access_token: accessToken,
                     start_date: dateRange.startDate,
-                    end_date: dateRange.endDate,
-                    limit: 1000 // Request a high limit from Plaid API
+                    end_date: dateRange.endDate
                 }, {
                     withCredentials: true
                 });
+
+                // The server fetches from Plaid in the background; poll the job until it finishes
+                let job = { status: "queued" };
+                while (job.status === "queued" || job.status === "running") {
+                    await new Promise(resolve => setTimeout(resolve, 1000));
+                    const jobResponse = await axios.get(`https://localhost:8000${refresh.data.status_url}`, {
+                        withCredentials: true
+                    });
+                    job = jobResponse.data;
+                }
+
+                if (job.status === "failed") {
+                    console.log("Plaid refresh failed, showing transactions already in the database", job.errors);
+                } else {
+                    console.log(`Saved ${job.result.processed} transactions from Plaid (${job.result.inserted} new, ${job.result.updated} updated)`);
+                }
+            } catch (plaidErr) {
+                console.log("Plaid refresh failed, showing transactions already in the database", plaidErr);
             }
 
+            // The transactions themselves are read back from the database
+            const response = await axios.post("https://localhost:8000/transactions/get-from-db", {
+                start_date: dateRange.startDate,
+                end_date: dateRange.endDate,
+                limit: 2000 // Request a high limit
+            }, {
+                withCredentials: true
+            });
+
             if (response.data.transactions) {
                 const txns = response.data.transactions;
 
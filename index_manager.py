@@ -0,0 +1,264 @@
+"""
+Declarative MongoDB index registry.
+
+Indexes are listed next to the query shapes they serve, created idempotently at startup, and
+checked with `explain` so endpoints that still scan the whole collection can be spotted.
+
+Only date-bounded shapes are index-backed. Without a date range (or, for the monthly trend, a year)
+the analyzer pipelines group every document, and MongoDB answers them with a COLLSCAN: no index
+would let them read less. Run `report` with filters to check the bounded shapes.
+
+Usage:
+    python index_manager.py ensure
+    python index_manager.py report [--start-date 2024-01-01] [--end-date 2024-12-31] [--year 2024]
+"""
+import argparse
+import logging
+import sys
+from pymongo import ASCENDING
+from config import Config, load_settings
+from mongodb_client import get_database
+from transaction_analyzer import TransactionAnalyzer
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Every index the application relies on. Names are left to MongoDB's default (e.g. "date_1"),
+# so indexes created before the registry existed are recognised instead of duplicated.
+INDEX_REGISTRY = [
+    {
+        "collection": "transactions",
+        "keys": [("transaction_id", ASCENDING)],
+        "unique": True,
+        "used_by": ["loader upserts", "/transactions/update"],
+    },
+    {
+        "collection": "transactions",
+        "keys": [("date", ASCENDING)],
+        "used_by": ["/transactions/get-from-db (the sort, and the range when given)"],
+    },
+    {
+        "collection": "transactions",
+        "keys": [("date", ASCENDING), ("category", ASCENDING), ("amount", ASCENDING)],
+        "used_by": ["/analysis/spending-by-category with a date range"],
+    },
+    {
+        "collection": "transactions",
+        "keys": [("date", ASCENDING), ("name", ASCENDING), ("amount", ASCENDING)],
+        "used_by": ["/analysis/top-merchants with a date range"],
+    },
+    {
+        "collection": "transactions",
+        # Prefixed by date: the year filter becomes a date range. Without a year the trend reads every document
+        "keys": [("date", ASCENDING), ("yyyymm", ASCENDING), ("amount", ASCENDING)],
+        "used_by": ["/analysis/monthly-trend with a year"],
+    },
+    {
+        "collection": "transactions",
+        "keys": [("last_updated", ASCENDING)],
+        "used_by": ["analytics snapshot refresh (ANALYTICS_SNAPSHOT=true)"],
+    },
+    {
+        "collection": "daily_rollups",
+        "keys": [("day", ASCENDING), ("category", ASCENDING), ("merchant", ASCENDING), ("currency", ASCENDING)],
+        "unique": True,
+        "used_by": ["rollup $inc upserts", "/analysis/* with a date range or year and ANALYTICS_SOURCE=rollups"],
+    },
+    {
+        "collection": "transaction_payloads",
+        "keys": [("transaction_id", ASCENDING)],
+        "unique": True,
+        "used_by": ["/transactions/<id>/raw"],
+    },
+]
+
+
+def index_name(keys):
+    """Returns MongoDB's default name for an index key list, e.g. "date_1_category_1"."""
+    return "_".join(f"{field}_{direction}" for field, direction in keys)
+
+
+def ensure_indexes(db, registry=None):
+    """
+    Creates any missing index from the registry. Safe to call on every startup.
+
+    Args:
+        db: MongoDB database
+        registry (list, optional): Index specs, defaults to INDEX_REGISTRY
+
+    Returns:
+        list: One {collection, index, status, error} entry per index, status being "exists", "created" or "failed"
+    """
+    results = []
+    existing_by_collection = {}
+
+    for spec in registry or INDEX_REGISTRY:
+        collection_name = spec["collection"]
+        name = index_name(spec["keys"])
+        entry = {"collection": collection_name, "index": name, "status": "exists", "error": None}
+
+        try:
+            if collection_name not in existing_by_collection:
+                existing_by_collection[collection_name] = set(db[collection_name].index_information())
+
+            if name not in existing_by_collection[collection_name]:
+                db[collection_name].create_index(spec["keys"], unique=spec.get("unique", False))
+                existing_by_collection[collection_name].add(name)
+                entry["status"] = "created"
+                logging.info(f"✅ Created index {collection_name}.{name}")
+        except Exception as e:
+            logging.error(f"❌ Failed to create index {collection_name}.{name}: {str(e)}")
+            entry["status"] = "failed"
+            entry["error"] = str(e)
+
+        results.append(entry)
+
+    return results
+
+
+def query_shapes(start_date=None, end_date=None, year=None):
+    """
+    Returns the query each endpoint runs, as {endpoint: (collection, kind, spec)}.
+    Analyzer pipelines come from TransactionAnalyzer itself so the report cannot drift from them,
+    against daily_rollups or transactions depending on ANALYTICS_SOURCE.
+    """
+    date_query = TransactionAnalyzer._date_query(start_date, end_date)
+    use_rollups = Config.ANALYTICS_SOURCE == "rollups"
+    analytics = TransactionAnalyzer.source_fields(use_rollups)["collection"]
+    return {
+        "/transactions/get-from-db": (
+            "transactions", "find",
+            {"filter": date_query, "projection": {"original_data": 0}, "sort": [("date", -1)], "limit": 1000}
+        ),
+        "/analysis/spending-by-category": (
+            analytics, "aggregate", TransactionAnalyzer.category_pipeline(start_date, end_date, use_rollups)
+        ),
+        "/analysis/monthly-trend": (
+            analytics, "aggregate", TransactionAnalyzer.monthly_pipeline(year, use_rollups)
+        ),
+        "/analysis/top-merchants": (
+            analytics, "aggregate", TransactionAnalyzer.merchant_pipeline(start_date, end_date, use_rollups=use_rollups)
+        ),
+        "/analysis/dashboard": (
+            analytics, "aggregate",
+            TransactionAnalyzer.dashboard_pipeline(start_date, end_date, year, use_rollups=use_rollups)
+        ),
+    }
+
+
+def _plan_stages(node, stages, indexes):
+    """Collects stage names and index names from every plan node under `node`."""
+    if isinstance(node, dict):
+        if "stage" in node:
+            stages.append(node["stage"])
+            if node.get("indexName"):
+                indexes.append(node["indexName"])
+        for value in node.values():
+            _plan_stages(value, stages, indexes)
+    elif isinstance(node, list):
+        for item in node:
+            _plan_stages(item, stages, indexes)
+
+
+def _winning_plans(node):
+    """Yields every winningPlan in an explain document; aggregate explains nest them per stage or shard."""
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key == "winningPlan":
+                yield value
+            else:
+                yield from _winning_plans(value)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _winning_plans(item)
+
+
+def summarize_explain(explain):
+    """
+    Reduces an explain document to the facts that matter for indexing.
+
+    Returns:
+        dict: Plan stages, indexes used, whether the plan scans the collection and whether it is covered
+    """
+    stages, indexes = [], []
+    for plan in _winning_plans(explain):
+        _plan_stages(plan, stages, indexes)
+
+    return {
+        "stages": stages,
+        "indexes": sorted(set(indexes)),
+        "collscan": "COLLSCAN" in stages,
+        # A covered plan answers from the index alone and never fetches documents
+        "covered": bool(indexes) and "FETCH" not in stages and "COLLSCAN" not in stages,
+    }
+
+
+def explain_query_shapes(db, start_date=None, end_date=None, year=None):
+    """
+    Explains every endpoint query shape against the live collections.
+
+    Returns:
+        list: One {endpoint, stages, indexes, collscan, covered, error} entry per endpoint
+    """
+    report = []
+    for endpoint, (collection_name, kind, spec) in query_shapes(start_date, end_date, year).items():
+        entry = {"endpoint": endpoint, "stages": [], "indexes": [], "collscan": False, "covered": False, "error": None}
+        try:
+            if kind == "find":
+                cursor = db[collection_name].find(spec["filter"], spec["projection"]).sort(spec["sort"])
+                explain = cursor.limit(spec["limit"]).explain()
+            else:
+                explain = db.command(
+                    "explain", {"aggregate": collection_name, "pipeline": spec, "cursor": {}},
+                    verbosity="queryPlanner"
+                )
+            entry.update(summarize_explain(explain))
+            if entry["collscan"]:
+                logging.warning(f"⚠️ {endpoint} is doing a COLLSCAN on {collection_name}")
+        except Exception as e:
+            logging.error(f"❌ Could not explain {endpoint}: {str(e)}")
+            entry["error"] = str(e)
+        report.append(entry)
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("ensure", help="Create any missing registry index")
+    report_parser = subparsers.add_parser("report", help="Explain endpoint queries and flag collection scans")
+    report_parser.add_argument("--start-date", default=None)
+    report_parser.add_argument("--end-date", default=None)
+    report_parser.add_argument("--year", default=None)
+    args = parser.parse_args()
+    load_settings()
+
+    db = get_database()
+    if db is None:
+        print("❌ Database connection not available")
+        return 1
+
+    if args.command == "ensure":
+        for entry in ensure_indexes(db):
+            print(f"  {entry['collection']}.{entry['index']:<32} {entry['status']} {entry['error'] or ''}")
+        return 0
+
+    collscans = 0
+    for entry in explain_query_shapes(db, args.start_date, args.end_date, args.year):
+        if entry["error"]:
+            status = f"error: {entry['error']}"
+        elif entry["collscan"]:
+            status = "COLLSCAN"
+            collscans += 1
+        else:
+            status = f"{'covered' if entry['covered'] else 'index'} via {', '.join(entry['indexes'])}"
+        print(f"  {entry['endpoint']:<34} {status}")
+    print(f"{collscans} endpoint(s) doing a COLLSCAN")
+    if collscans and not (args.start_date or args.end_date or args.year):
+        print("ℹ️ Without --start-date/--end-date/--year the analysis queries group every document, so these scans are expected")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
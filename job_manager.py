@@ -0,0 +1,125 @@
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from config import Config
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+
+class Job:
+    """Tracks the status and progress of a single background ingest job."""
+
+    def __init__(self, kind, description=None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.description = description
+        self.status = "queued"
+        self.rows_parsed = 0
+        self.rows_written = 0
+        self.errors = []
+        self.result = None
+        self.created_at = datetime.now().isoformat()
+        self._started = None
+        self._finished = None
+        self._lock = threading.Lock()
+
+    def progress(self, rows_parsed=0, rows_written=0):
+        """Adds to the parsed/written row counters. Passed to ingest code as its progress callback."""
+        with self._lock:
+            self.rows_parsed += rows_parsed
+            self.rows_written += rows_written
+
+    def to_dict(self):
+        """Returns a JSON-serializable snapshot of the job."""
+        with self._lock:
+            if self._started is None:
+                elapsed = 0.0
+            else:
+                elapsed = (self._finished or time.perf_counter()) - self._started
+
+            return {
+                "job_id": self.id,
+                "kind": self.kind,
+                "description": self.description,
+                "status": self.status,
+                "rows_parsed": self.rows_parsed,
+                "rows_written": self.rows_written,
+                "elapsed_seconds": round(elapsed, 3),
+                "errors": list(self.errors),
+                "created_at": self.created_at,
+                "result": self.result
+            }
+
+
+class JobManager:
+    """Runs ingest work (uploads, Plaid syncs) on a thread pool so requests can return immediately."""
+
+    def __init__(self, max_workers=None, history_size=None):
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or Config.JOB_WORKERS,
+            thread_name_prefix="ingest-job"
+        )
+        # Finished jobs are kept for status polling, oldest dropped first
+        self.history_size = history_size or Config.JOB_HISTORY_SIZE
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, kind, func, *args, description=None, **kwargs):
+        """
+        Queues `func(*args, progress=job.progress, **kwargs)` and returns the job right away.
+
+        Args:
+            kind (str): Short job type, e.g. "upload" or "plaid_sync"
+            func (callable): Ingest function accepting a `progress` keyword argument
+            description (str, optional): Human-readable description shown in the status
+
+        Returns:
+            Job: The queued job
+        """
+        job = Job(kind, description)
+
+        with self._lock:
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.history_size:
+                oldest_id, oldest = next(iter(self._jobs.items()))
+                if oldest.status in ("queued", "running"):
+                    break
+                self._jobs.pop(oldest_id)
+
+        self.executor.submit(self._run, job, func, args, kwargs)
+        logging.info(f"🔹 Queued {kind} job {job.id}")
+        return job
+
+    def _run(self, job, func, args, kwargs):
+        with job._lock:
+            job.status = "running"
+            job._started = time.perf_counter()
+
+        try:
+            result = func(*args, progress=job.progress, **kwargs)
+            with job._lock:
+                job.result = result
+                if isinstance(result, dict):
+                    job.errors.extend(result.get("errors", []))
+                    if result.get("success") is False and result.get("message"):
+                        job.errors.append(result["message"])
+                job.status = "failed" if isinstance(result, dict) and result.get("success") is False else "completed"
+            logging.info(f"✅ {job.kind} job {job.id} finished with status {job.status}")
+        except Exception as e:
+            logging.error(f"❌ {job.kind} job {job.id} failed: {str(e)}", exc_info=True)
+            with job._lock:
+                job.status = "failed"
+                job.errors.append(str(e))
+        finally:
+            with job._lock:
+                job._finished = time.perf_counter()
+
+    def get(self, job_id):
+        """Returns the job with the given id, or None if it is unknown or has been evicted."""
+        with self._lock:
+            return self._jobs.get(job_id)
@@ -0,0 +1,636 @@
+import copy
+import logging
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from bson import ObjectId
+from pymongo import DeleteMany, DeleteOne, InsertOne, UpdateMany, UpdateOne
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Cross-type ordering used by MongoDB comparisons and sorts (missing/null < numbers < strings < ... < dates)
+_TYPE_RANKS = {type(None): 0, bool: 8, int: 1, float: 1, str: 2, dict: 3, list: 4, ObjectId: 7, datetime: 9}
+
+
+def _rank(value):
+    return _TYPE_RANKS.get(type(value), 5)
+
+
+def _sort_key(value):
+    """Total-order key for any stored value, following MongoDB's type bracketing."""
+    rank = _rank(value)
+    if rank == 0:
+        return (0, 0)
+    if rank in (3, 4):
+        return (rank, repr(value))
+    return (rank, value)
+
+
+def _get_path(document, path):
+    """Resolves a dotted field path, returning None when any part is missing."""
+    value = document
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _has_path(document, path):
+    value = document
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return False
+        value = value[part]
+    return True
+
+
+def _compare(value, operand, operator):
+    # Range operators only match values of the same type bracket, as in MongoDB
+    if value is None or _rank(value) != _rank(operand):
+        return False
+    if operator == "$gt":
+        return value > operand
+    if operator == "$gte":
+        return value >= operand
+    if operator == "$lt":
+        return value < operand
+    return value <= operand
+
+
+_BSON_TYPES = {"string": str, "date": datetime, "double": float, "int": int, "bool": bool, "object": dict,
+               "array": list, "null": type(None), "objectId": ObjectId}
+
+
+def _match_condition(document, path, condition):
+    value = _get_path(document, path)
+
+    if not isinstance(condition, dict) or not any(key.startswith("$") for key in condition):
+        return value == condition
+
+    for operator, operand in condition.items():
+        if operator == "$eq":
+            matched = value == operand
+        elif operator == "$ne":
+            matched = value != operand
+        elif operator in ("$gt", "$gte", "$lt", "$lte"):
+            matched = _compare(value, operand, operator)
+        elif operator == "$in":
+            matched = value in operand
+        elif operator == "$nin":
+            matched = value not in operand
+        elif operator == "$exists":
+            matched = _has_path(document, path) == bool(operand)
+        elif operator == "$type":
+            matched = _has_path(document, path) and type(value) is _BSON_TYPES[operand]
+        elif operator == "$regex":
+            import re
+            matched = isinstance(value, str) and re.search(operand, value) is not None
+        else:
+            raise NotImplementedError(f"Query operator {operator} is not supported by the in-memory store")
+        if not matched:
+            return False
+    return True
+
+
+def matches(document, query):
+    """Returns True if `document` matches a MongoDB-style query filter."""
+    for key, condition in (query or {}).items():
+        if key == "$or":
+            if not any(matches(document, branch) for branch in condition):
+                return False
+        elif key == "$and":
+            if not all(matches(document, branch) for branch in condition):
+                return False
+        elif not _match_condition(document, key, condition):
+            return False
+    return True
+
+
+def _project(document, projection):
+    """Applies an inclusion or exclusion projection to a copy of the document."""
+    if not projection:
+        return dict(document)
+
+    include_id = projection.get("_id", 1)
+    fields = {key: value for key, value in projection.items() if key != "_id"}
+    if fields and all(fields.values()):
+        projected = {key: document[key] for key in fields if key in document}
+        if include_id and "_id" in document:
+            projected["_id"] = document["_id"]
+        return projected
+
+    projected = {key: value for key, value in document.items() if key not in fields}
+    if not include_id:
+        projected.pop("_id", None)
+    return projected
+
+
+def _sort_documents(documents, sort_spec):
+    """Sorts in place by [(field, direction)], applying keys from last to first so the sort is stable."""
+    for field, direction in reversed(sort_spec):
+        documents.sort(key=lambda doc: _sort_key(_get_path(doc, field)), reverse=direction < 0)
+    return documents
+
+
+def _normalize_sort(key_or_list, direction=None):
+    if isinstance(key_or_list, str):
+        return [(key_or_list, direction or 1)]
+    if isinstance(key_or_list, dict):
+        return list(key_or_list.items())
+    return list(key_or_list)
+
+
+def _apply_update(document, update, inserting=False):
+    """Applies $set/$unset/$inc/$setOnInsert to a document in place. Returns True if it changed."""
+    before = copy.deepcopy(document)
+    for operator, fields in update.items():
+        if operator == "$set" or (operator == "$setOnInsert" and inserting):
+            for path, value in fields.items():
+                target = document
+                parts = path.split(".")
+                for part in parts[:-1]:
+                    target = target.setdefault(part, {})
+                target[parts[-1]] = value
+        elif operator == "$setOnInsert":
+            continue
+        elif operator == "$unset":
+            for path in fields:
+                target = document
+                parts = path.split(".")
+                for part in parts[:-1]:
+                    target = target.get(part, {}) if isinstance(target, dict) else {}
+                if isinstance(target, dict):
+                    target.pop(parts[-1], None)
+        elif operator in ("$min", "$max"):
+            for path, value in fields.items():
+                target = document
+                parts = path.split(".")
+                for part in parts[:-1]:
+                    target = target.setdefault(part, {})
+                current = target.get(parts[-1])
+                if current is None or (_sort_key(value) < _sort_key(current) if operator == "$min"
+                                       else _sort_key(value) > _sort_key(current)):
+                    target[parts[-1]] = value
+        elif operator == "$inc":
+            for path, amount in fields.items():
+                target = document
+                parts = path.split(".")
+                for part in parts[:-1]:
+                    target = target.setdefault(part, {})
+                target[parts[-1]] = (target.get(parts[-1]) or 0) + amount
+        else:
+            raise NotImplementedError(f"Update operator {operator} is not supported by the in-memory store")
+    return document != before
+
+
+class InsertOneResult:
+    def __init__(self, inserted_id):
+        self.inserted_id = inserted_id
+        self.acknowledged = True
+
+
+class InsertManyResult:
+    def __init__(self, inserted_ids):
+        self.inserted_ids = inserted_ids
+        self.acknowledged = True
+
+
+class UpdateResult:
+    def __init__(self, matched_count=0, modified_count=0, upserted_id=None):
+        self.matched_count = matched_count
+        self.modified_count = modified_count
+        self.upserted_id = upserted_id
+        self.acknowledged = True
+
+
+class DeleteResult:
+    def __init__(self, deleted_count=0):
+        self.deleted_count = deleted_count
+        self.acknowledged = True
+
+
+class BulkWriteResult:
+    def __init__(self):
+        self.inserted_count = 0
+        self.matched_count = 0
+        self.modified_count = 0
+        self.deleted_count = 0
+        self.upserted_count = 0
+        self.upserted_ids = {}
+        self.acknowledged = True
+
+
+class MemoryCursor:
+    """Minimal cursor over already-matched documents, supporting sort/skip/limit chaining."""
+
+    def __init__(self, documents, projection=None):
+        self._documents = documents
+        self._projection = projection
+        self._sort = None
+        self._skip = 0
+        self._limit = 0
+
+    def sort(self, key_or_list, direction=None):
+        self._sort = _normalize_sort(key_or_list, direction)
+        return self
+
+    def skip(self, count):
+        self._skip = count
+        return self
+
+    def limit(self, count):
+        self._limit = count
+        return self
+
+    def __iter__(self):
+        documents = self._documents
+        if self._sort:
+            documents = _sort_documents(list(documents), self._sort)
+        end = self._skip + self._limit if self._limit else None
+        for document in documents[self._skip:end]:
+            yield _project(document, self._projection)
+
+
+class SortedIndex:
+    """Sorted (value, _id) index on one field, used to answer range and equality filters with bisect."""
+
+    def __init__(self, field):
+        self.field = field
+        self.keys = []
+        self.ids = []
+
+    def add(self, document):
+        key = _sort_key(_get_path(document, self.field))
+        position = bisect_right(self.keys, key)
+        self.keys.insert(position, key)
+        self.ids.insert(position, document["_id"])
+
+    def remove(self, document):
+        key = _sort_key(_get_path(document, self.field))
+        position = bisect_left(self.keys, key)
+        while position < len(self.ids) and self.ids[position] != document["_id"]:
+            position += 1
+        if position < len(self.ids):
+            del self.keys[position]
+            del self.ids[position]
+
+    def candidates(self, condition):
+        """Returns the _ids whose value may satisfy `condition`, or None if the index cannot narrow it."""
+        if not isinstance(condition, dict) or not any(key.startswith("$") for key in condition):
+            key = _sort_key(condition)
+            return self.ids[bisect_left(self.keys, key):bisect_right(self.keys, key)]
+
+        lower, upper = 0, len(self.keys)
+        bounded = False
+        for operator, operand in condition.items():
+            key = _sort_key(operand)
+            if operator in ("$gt", "$gte", "$lt", "$lte"):
+                # Type bracketing: a range on one type never matches values of another
+                lower = max(lower, bisect_left(self.keys, (key[0],)))
+                upper = min(upper, bisect_left(self.keys, (key[0] + 1,)))
+                bounded = True
+            if operator == "$gte":
+                lower = max(lower, bisect_left(self.keys, key))
+            elif operator == "$gt":
+                lower = max(lower, bisect_right(self.keys, key))
+            elif operator == "$lte":
+                upper = min(upper, bisect_right(self.keys, key))
+            elif operator == "$lt":
+                upper = min(upper, bisect_left(self.keys, key))
+        return self.ids[lower:upper] if bounded else None
+
+
+class MemoryCollection:
+    """
+    In-process collection implementing the subset of pymongo's Collection API the app uses.
+    Documents live in a dict keyed by _id. Unique single-field indexes are hash maps and the
+    leading field of other indexes (e.g. date) gets a sorted index for range filters.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._documents = {}
+        self._indexes = {"_id_": {"key": [("_id", 1)], "unique": True}}
+        self._unique = {}
+        self._sorted = {}
+        self._lock = threading.RLock()
+
+    # Indexes
+
+    def create_index(self, keys, unique=False, **kwargs):
+        keys = _normalize_sort(keys, 1)
+        name = kwargs.get("name") or "_".join(f"{field}_{direction}" for field, direction in keys)
+        with self._lock:
+            if name in self._indexes:
+                return name
+            self._indexes[name] = {"key": keys, "unique": unique}
+            field = keys[0][0]
+            if unique and len(keys) == 1:
+                mapping = {}
+                for document in self._documents.values():
+                    value = _get_path(document, field)
+                    if value in mapping:
+                        raise ValueError(f"Duplicate key for unique index {name}: {value!r}")
+                    mapping[value] = document["_id"]
+                self._unique[field] = mapping
+            elif field not in self._sorted:
+                index = SortedIndex(field)
+                for document in self._documents.values():
+                    index.add(document)
+                self._sorted[field] = index
+        return name
+
+    def index_information(self):
+        with self._lock:
+            return {name: dict(spec) for name, spec in self._indexes.items()}
+
+    def _index_add(self, document):
+        for field, mapping in self._unique.items():
+            value = _get_path(document, field)
+            existing = mapping.get(value)
+            if existing is not None and existing != document["_id"]:
+                raise ValueError(f"Duplicate key for unique field {field}: {value!r}")
+        for field, mapping in self._unique.items():
+            mapping[_get_path(document, field)] = document["_id"]
+        for index in self._sorted.values():
+            index.add(document)
+
+    def _index_remove(self, document):
+        for field, mapping in self._unique.items():
+            value = _get_path(document, field)
+            if mapping.get(value) == document["_id"]:
+                del mapping[value]
+        for index in self._sorted.values():
+            index.remove(document)
+
+    def _candidates(self, query):
+        """Narrows the documents to scan using a hash or sorted index when the filter allows it."""
+        query = query or {}
+        for field, mapping in self._unique.items():
+            condition = query.get(field)
+            if condition is None:
+                continue
+            if isinstance(condition, dict) and "$in" in condition:
+                ids = [mapping[value] for value in condition["$in"] if value in mapping]
+            elif isinstance(condition, dict):
+                continue
+            else:
+                ids = [mapping[condition]] if condition in mapping else []
+            return [self._documents[_id] for _id in ids]
+
+        for field, index in self._sorted.items():
+            if field in query:
+                ids = index.candidates(query[field])
+                if ids is not None:
+                    return [self._documents[_id] for _id in ids]
+
+        return list(self._documents.values())
+
+    def _matching(self, query):
+        return [document for document in self._candidates(query) if matches(document, query)]
+
+    # Reads
+
+    def find(self, filter=None, projection=None, sort=None, skip=0, limit=0):
+        with self._lock:
+            cursor = MemoryCursor(self._matching(filter), projection)
+        if sort:
+            cursor.sort(sort)
+        return cursor.skip(skip).limit(limit)
+
+    def find_one(self, filter=None, projection=None):
+        for document in self.find(filter, projection).limit(1):
+            return document
+        return None
+
+    def count_documents(self, filter=None):
+        with self._lock:
+            return len(self._matching(filter))
+
+    def aggregate(self, pipeline, **kwargs):
+        with self._lock:
+            documents = None
+            stages = list(pipeline)
+            # A leading $match uses the indexes
+            if stages and "$match" in stages[0]:
+                documents = self._matching(stages.pop(0)["$match"])
+            if documents is None:
+                documents = list(self._documents.values())
+            return iter(run_pipeline(documents, stages))
+
+    # Writes
+
+    def insert_one(self, document):
+        with self._lock:
+            document = dict(document)
+            document.setdefault("_id", ObjectId())
+            if document["_id"] in self._documents:
+                raise ValueError(f"Duplicate _id: {document['_id']!r}")
+            self._index_add(document)
+            self._documents[document["_id"]] = document
+            return InsertOneResult(document["_id"])
+
+    def insert_many(self, documents, ordered=True):
+        with self._lock:
+            inserted_ids = [self.insert_one(document).inserted_id for document in documents]
+        return InsertManyResult(inserted_ids)
+
+    def _update(self, filter, update, upsert, multi):
+        with self._lock:
+            targets = self._matching(filter)
+            if not multi:
+                targets = targets[:1]
+
+            if not targets:
+                if not upsert:
+                    return UpdateResult()
+                # Seed the new document with the equality fields of the filter
+                document = {key: value for key, value in filter.items()
+                            if not key.startswith("$") and not isinstance(value, dict)}
+                _apply_update(document, update, inserting=True)
+                return UpdateResult(upserted_id=self.insert_one(document).inserted_id)
+
+            modified = 0
+            for document in targets:
+                updated = copy.copy(document)
+                if _apply_update(updated, update):
+                    self._index_remove(document)
+                    try:
+                        self._index_add(updated)
+                    except ValueError:
+                        self._index_add(document)
+                        raise
+                    self._documents[document["_id"]] = updated
+                    modified += 1
+            return UpdateResult(matched_count=len(targets), modified_count=modified)
+
+    def find_one_and_update(self, filter, update, projection=None, upsert=False, return_document=False):
+        """Updates the first match and returns it as it was before (default) or after the update."""
+        with self._lock:
+            before = self.find_one(filter)
+            result = self._update(filter, update, upsert, multi=False)
+            if return_document:
+                _id = before["_id"] if before is not None else result.upserted_id
+                document = self._documents.get(_id)
+                return _project(document, projection) if document is not None else None
+            return _project(before, projection) if before is not None else None
+
+    def update_one(self, filter, update, upsert=False):
+        return self._update(filter, update, upsert, multi=False)
+
+    def update_many(self, filter, update, upsert=False):
+        return self._update(filter, update, upsert, multi=True)
+
+    def delete_many(self, filter):
+        with self._lock:
+            targets = self._matching(filter)
+            for document in targets:
+                self._index_remove(document)
+                del self._documents[document["_id"]]
+            return DeleteResult(len(targets))
+
+    def delete_one(self, filter):
+        with self._lock:
+            targets = self._matching(filter)[:1]
+            for document in targets:
+                self._index_remove(document)
+                del self._documents[document["_id"]]
+            return DeleteResult(len(targets))
+
+    def bulk_write(self, requests, ordered=True):
+        """Applies UpdateOne/UpdateMany/InsertOne/DeleteOne/DeleteMany requests."""
+        result = BulkWriteResult()
+        with self._lock:
+            for position, request in enumerate(requests):
+                if isinstance(request, (UpdateOne, UpdateMany)):
+                    outcome = self._update(request._filter, request._doc, request._upsert,
+                                           multi=isinstance(request, UpdateMany))
+                    result.matched_count += outcome.matched_count
+                    result.modified_count += outcome.modified_count
+                    if outcome.upserted_id is not None:
+                        result.upserted_count += 1
+                        result.upserted_ids[position] = outcome.upserted_id
+                elif isinstance(request, InsertOne):
+                    self.insert_one(request._doc)
+                    result.inserted_count += 1
+                elif isinstance(request, (DeleteOne, DeleteMany)):
+                    delete = self.delete_many if isinstance(request, DeleteMany) else self.delete_one
+                    result.deleted_count += delete(request._filter).deleted_count
+                else:
+                    raise NotImplementedError(f"{type(request).__name__} is not supported by the in-memory store")
+        return result
+
+
+def _evaluate(expression, document):
+    """Evaluates a "$field" path, a constant, or a dict of such expressions (compound _id)."""
+    if isinstance(expression, str) and expression.startswith("$"):
+        return _get_path(document, expression[1:])
+    if isinstance(expression, dict):
+        return {key: _evaluate(value, document) for key, value in expression.items()}
+    return expression
+
+
+def _group(documents, spec):
+    groups = {}
+    order = []
+    for document in documents:
+        group_id = _evaluate(spec["_id"], document)
+        group_key = repr(group_id) if isinstance(group_id, dict) else group_id
+        state = groups.get(group_key)
+        if state is None:
+            state = groups[group_key] = {"_id": group_id, "_counts": {}}
+            order.append(group_key)
+
+        for field, accumulator in spec.items():
+            if field == "_id":
+                continue
+            (operator, expression), = accumulator.items()
+            value = _evaluate(expression, document)
+            current = state.get(field)
+
+            if operator == "$sum":
+                numeric = value if isinstance(value, (int, float)) and not isinstance(value, bool) else 0
+                state[field] = (current or 0) + numeric
+            elif operator == "$avg":
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    state[field] = (current or 0) + value
+                    state["_counts"][field] = state["_counts"].get(field, 0) + 1
+                else:
+                    state.setdefault(field, None)
+            elif operator in ("$min", "$max"):
+                if value is None:
+                    state.setdefault(field, None)
+                elif current is None or (
+                    _sort_key(value) < _sort_key(current) if operator == "$min" else _sort_key(value) > _sort_key(current)
+                ):
+                    state[field] = value
+            elif operator == "$first":
+                state.setdefault(field, value)
+            elif operator == "$last":
+                state[field] = value
+            elif operator == "$push":
+                state.setdefault(field, []).append(value)
+            else:
+                raise NotImplementedError(f"Accumulator {operator} is not supported by the in-memory store")
+
+    results = []
+    for group_key in order:
+        state = groups[group_key]
+        counts = state.pop("_counts")
+        for field, count in counts.items():
+            state[field] = state[field] / count
+        results.append(state)
+    return results
+
+
+def run_pipeline(documents, pipeline):
+    """Runs the supported aggregation stages ($match, $group, $sort, $limit, $skip, $project, $facet) over documents."""
+    for stage in pipeline:
+        (name, spec), = stage.items()
+        if name == "$match":
+            documents = [document for document in documents if matches(document, spec)]
+        elif name == "$group":
+            documents = _group(documents, spec)
+        elif name == "$sort":
+            documents = _sort_documents(list(documents), list(spec.items()))
+        elif name == "$limit":
+            documents = documents[:spec]
+        elif name == "$skip":
+            documents = documents[spec:]
+        elif name == "$project":
+            documents = [_project(document, spec) for document in documents]
+        elif name == "$facet":
+            documents = [{facet: run_pipeline(documents, stages) for facet, stages in spec.items()}]
+        else:
+            raise NotImplementedError(f"Aggregation stage {name} is not supported by the in-memory store")
+    return [dict(document) for document in documents]
+
+
+class MemoryDatabase:
+    """In-process stand-in for a pymongo Database: collections are created on first access."""
+
+    def __init__(self, name="memory"):
+        self.name = name
+        self._collections = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name):
+        with self._lock:
+            collection = self._collections.get(name)
+            if collection is None:
+                collection = self._collections[name] = MemoryCollection(name)
+            return collection
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    def list_collection_names(self):
+        with self._lock:
+            return list(self._collections)
+
+    def command(self, command, *args, **kwargs):
+        raise NotImplementedError(f"Database command {command!r} is not supported by the in-memory store")
@@ -0,0 +1,212 @@
+"""
+One-off data migrations for the transactions database.
+
+Usage:
+    python migrations.py split-raw-payloads [--batch-size 1000]
+    python migrations.py convert-dates [--batch-size 1000]
+    python migrations.py rebuild-rollups [--batch-size 1000]
+"""
+import argparse
+import logging
+import sys
+import time
+import bson
+from pymongo import UpdateOne
+from config import Config, load_settings
+from daily_rollups import DailyRollupStore
+from index_manager import ensure_indexes
+from mongodb_client import get_database
+from raw_payload_store import PAYLOAD_COLLECTION, RawPayloadStore
+from transaction_model import Transaction
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+
+def collection_size(db, name):
+    """
+    Returns {count, size, storage_size} in bytes for a collection.
+    Uses collStats when the server supports it, otherwise sums the BSON size of every document.
+    """
+    try:
+        stats = db.command("collStats", name)
+        return {"count": stats.get("count", 0), "size": stats.get("size", 0), "storage_size": stats.get("storageSize")}
+    except Exception:
+        count, size = 0, 0
+        for document in db[name].find():
+            count += 1
+            size += len(bson.encode(document))
+        return {"count": count, "size": size, "storage_size": None}
+
+
+def _format_bytes(value):
+    if value is None:
+        return "n/a"
+    for unit in ("B", "KiB", "MiB"):
+        if value < 1024:
+            return f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} GiB"
+
+
+def _report_sizes(db, names, title):
+    sizes = {name: collection_size(db, name) for name in names}
+    print(title)
+    for name, size in sizes.items():
+        print(
+            f"  {name:<22} {size['count']:>10} docs  data {_format_bytes(size['size']):>12}  "
+            f"storage {_format_bytes(size['storage_size']):>12}"
+        )
+    return sizes
+
+
+def split_raw_payloads(db, batch_size=None):
+    """
+    Moves the `original_data` embedded in transactions documents into the raw payload collection.
+    Each batch writes the payloads first and only then unsets `original_data`, so the migration
+    can be interrupted and re-run safely.
+
+    Args:
+        db: MongoDB database
+        batch_size (int, optional): Documents migrated per batch
+
+    Returns:
+        dict: Migrated count, elapsed time and collection sizes before and after
+    """
+    batch_size = batch_size or Config.LOADER_BATCH_SIZE
+    ensure_indexes(db)
+    store = RawPayloadStore(db[PAYLOAD_COLLECTION])
+    transactions = db["transactions"]
+    names = ["transactions", PAYLOAD_COLLECTION]
+
+    before = _report_sizes(db, names, "Before:")
+    started = time.perf_counter()
+    migrated = 0
+
+    while True:
+        batch = list(transactions.find(
+            {"original_data": {"$exists": True}},
+            {"_id": 0, "transaction_id": 1, "original_data": 1, "content_hash": 1}
+        ).limit(batch_size))
+        if not batch:
+            break
+
+        operations = [
+            UpdateOne(
+                {"transaction_id": doc["transaction_id"]},
+                {"$set": store.encode(
+                    doc["transaction_id"],
+                    doc["original_data"],
+                    doc.get("content_hash") or Transaction.fingerprint(doc["original_data"])
+                )},
+                upsert=True
+            )
+            for doc in batch
+        ]
+        # Let a failed write raise: the unset below must not run for payloads that weren't stored
+        store.collection.bulk_write(operations, ordered=False)
+
+        ids = [doc["transaction_id"] for doc in batch]
+        transactions.update_many({"transaction_id": {"$in": ids}}, {"$unset": {"original_data": ""}})
+        migrated += len(batch)
+        logging.info(f"Moved {migrated} raw payloads so far")
+
+    elapsed = time.perf_counter() - started
+    after = _report_sizes(db, names, "After:")
+    print(f"Moved {migrated} raw payloads in {elapsed:.1f}s using {store.compression} compression")
+    print("Note: storage size on disk only shrinks once MongoDB reuses or compacts the freed space")
+
+    return {"migrated": migrated, "elapsed_seconds": round(elapsed, 3), "before": before, "after": after}
+
+
+def convert_dates(db, batch_size=None):
+    """
+    Rewrites string `date` fields on transactions documents as BSON dates and fills in the
+    integer `yyyymm` month key, also for documents that have a BSON date but no month key.
+    Documents whose date cannot be parsed are left untouched and counted as skipped.
+
+    Args:
+        db: MongoDB database
+        batch_size (int, optional): Updates sent per bulk write
+
+    Returns:
+        dict: Converted and skipped counts
+    """
+    batch_size = batch_size or Config.LOADER_BATCH_SIZE
+    transactions = db["transactions"]
+    converted, skipped = 0, 0
+    operations = []
+
+    cursor = transactions.find(
+        {"$or": [
+            {"date": {"$type": "string"}},
+            {"date": {"$type": "date"}, "yyyymm": {"$exists": False}}
+        ]},
+        {"_id": 1, "date": 1}
+    )
+    for doc in cursor:
+        parsed = Transaction.parse_date(doc["date"])
+        if parsed is None:
+            skipped += 1
+            continue
+
+        operations.append(UpdateOne(
+            {"_id": doc["_id"]},
+            {"$set": {"date": parsed, "yyyymm": Transaction.month_key(parsed)}}
+        ))
+        if len(operations) >= batch_size:
+            converted += transactions.bulk_write(operations, ordered=False).modified_count
+            operations = []
+            logging.info(f"Converted {converted} transaction dates so far")
+
+    if operations:
+        converted += transactions.bulk_write(operations, ordered=False).modified_count
+
+    ensure_indexes(db)
+    # Rollups are keyed by the BSON day, so rebuild them from the converted dates
+    if converted:
+        DailyRollupStore(db).rebuild(batch_size)
+    print(f"Converted {converted} transaction dates, skipped {skipped} unparseable dates")
+    return {"converted": converted, "skipped": skipped}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    split_parser = subparsers.add_parser(
+        "split-raw-payloads", help="Move embedded original_data into the raw payload collection"
+    )
+    split_parser.add_argument("--batch-size", type=int, default=None)
+
+    dates_parser = subparsers.add_parser(
+        "convert-dates", help="Store string transaction dates as BSON dates with a yyyymm month key"
+    )
+    dates_parser.add_argument("--batch-size", type=int, default=None)
+
+    rollups_parser = subparsers.add_parser(
+        "rebuild-rollups", help="Recompute daily_rollups from the transactions collection"
+    )
+    rollups_parser.add_argument("--batch-size", type=int, default=None)
+
+    args = parser.parse_args()
+    load_settings()
+
+    db = get_database()
+    if db is None:
+        print("❌ Database connection not available")
+        return 1
+
+    if args.command == "split-raw-payloads":
+        split_raw_payloads(db, args.batch_size)
+    elif args.command == "convert-dates":
+        convert_dates(db, args.batch_size)
+    elif args.command == "rebuild-rollups":
+        ensure_indexes(db)
+        written = DailyRollupStore(db).rebuild(args.batch_size)
+        print(f"Rebuilt {written} daily rollups")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,119 +1,364 @@
-from pymongo import MongoClient
+from pymongo import MongoClient, monitoring
 import os
-from dotenv import load_dotenv
+import threading
+import time
 import logging
 import urllib.parse
+from config import Config
+from memory_store import MemoryDatabase
+from result_cache import bump_generation
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
-# Load environment variables
-load_dotenv(dotenv_path=".env")
-
-# Get MongoDB connection details
-MONGO_USER = os.getenv("DB_USER")
-MONGO_PASSWORD = os.getenv("DB_PASSWORD")
-MONGO_HOST = os.getenv("DB_HOST", "localhost")
-MONGO_PORT = os.getenv("DB_PORT", "27017")
-MONGO_DB = os.getenv("DB_NAME", "expenses")
-MONGO_AUTH_SOURCE = os.getenv("DB_AUTH_SOURCE", "admin")  # Added auth source parameter
-
-# URL encode username and password for special characters
-if MONGO_USER:
-    MONGO_USER_ENCODED = urllib.parse.quote_plus(MONGO_USER)
-else:
-    MONGO_USER_ENCODED = MONGO_USER
-
-if MONGO_PASSWORD:
-    MONGO_PASSWORD_ENCODED = urllib.parse.quote_plus(MONGO_PASSWORD)
-else:
-    MONGO_PASSWORD_ENCODED = MONGO_PASSWORD
-
-# Create MongoDB connection string with encoded credentials
-if MONGO_USER_ENCODED and MONGO_PASSWORD_ENCODED:
-    MONGO_URI = f"mongodb://{MONGO_USER_ENCODED}:{MONGO_PASSWORD_ENCODED}@{MONGO_HOST}:{MONGO_PORT}/{MONGO_DB}?authSource={MONGO_AUTH_SOURCE}"
-else:
-    MONGO_URI = f"mongodb://{MONGO_HOST}:{MONGO_PORT}/{MONGO_DB}"
-
-# Masked password for logging
-if MONGO_PASSWORD:
-    password_masked = "*" * len(MONGO_PASSWORD)
-else:
-    password_masked = "None"
-
-logger.info("="*50)
-logger.info("MONGODB CONNECTION DETAILS:")
-logger.info(f"Username: {MONGO_USER}")
-logger.info(f"Password: {password_masked}")
-logger.info(f"Host: {MONGO_HOST}")
-logger.info(f"Port: {MONGO_PORT}")
-logger.info(f"Database: {MONGO_DB}")
-logger.info(f"Auth Source: {MONGO_AUTH_SOURCE}")
-logger.info(f"Connection string format: mongodb://username:******@{MONGO_HOST}:{MONGO_PORT}/{MONGO_DB}?authSource={MONGO_AUTH_SOURCE}")
-logger.info("="*50)
-
-# Global client and db variables
-client = None
-db = None
 
+def connection_settings():
+    """
+    Reads the MongoDB connection details from the environment (.env is loaded by Config)
+    and builds the connection string with URL-encoded credentials.
+    """
+    user = os.getenv("DB_USER")
+    password = os.getenv("DB_PASSWORD")
+    host = os.getenv("DB_HOST", "localhost")
+    port = os.getenv("DB_PORT", "27017")
+    database = os.getenv("DB_NAME", "expenses")
+    auth_source = os.getenv("DB_AUTH_SOURCE", "admin")
 
-def get_database():
+    # URL encode username and password for special characters
+    user_encoded = urllib.parse.quote_plus(user) if user else user
+    password_encoded = urllib.parse.quote_plus(password) if password else password
+
+    # Create MongoDB connection string with encoded credentials
+    if user_encoded and password_encoded:
+        uri = f"mongodb://{user_encoded}:{password_encoded}@{host}:{port}/{database}?authSource={auth_source}"
+    else:
+        uri = f"mongodb://{host}:{port}/{database}"
+
+    return {
+        "user": user,
+        "password": password,
+        "password_encoded": password_encoded,
+        "host": host,
+        "port": port,
+        "database": database,
+        "auth_source": auth_source,
+        "uri": uri,
+    }
+
+
+def log_connection_details(settings):
+    """Logs the connection details with the password masked."""
+    password_masked = "*" * len(settings["password"]) if settings["password"] else "None"
+
+    logger.info("="*50)
+    logger.info("MONGODB CONNECTION DETAILS:")
+    logger.info(f"Username: {settings['user']}")
+    logger.info(f"Password: {password_masked}")
+    logger.info(f"Host: {settings['host']}")
+    logger.info(f"Port: {settings['port']}")
+    logger.info(f"Database: {settings['database']}")
+    logger.info(f"Auth Source: {settings['auth_source']}")
+    logger.info(
+        f"Connection string format: mongodb://username:******@{settings['host']}:{settings['port']}/"
+        f"{settings['database']}?authSource={settings['auth_source']}"
+    )
+    logger.info("="*50)
+
+
+def client_options():
+    """Pool sizing and timeout options shared by the sync MongoClient and the async (Motor) client."""
+    return {
+        "maxPoolSize": Config.DB_MAX_POOL_SIZE,
+        "minPoolSize": Config.DB_MIN_POOL_SIZE,
+        "maxIdleTimeMS": Config.DB_MAX_IDLE_TIME_MS,
+        "waitQueueTimeoutMS": Config.DB_WAIT_QUEUE_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": Config.DB_SERVER_SELECTION_TIMEOUT_MS,
+        "connectTimeoutMS": Config.DB_CONNECT_TIMEOUT_MS,
+        "socketTimeoutMS": Config.DB_SOCKET_TIMEOUT_MS,
+    }
+
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """Counts connection pool events so pool usage can be exposed for monitoring."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {
+            "connections_created": 0,
+            "connections_closed": 0,
+            "checked_out": 0,
+            "checked_in": 0,
+            "checkout_failures": 0,
+            "pool_cleared": 0,
+        }
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._count("pool_cleared")
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._count("connections_created")
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._count("connections_closed")
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self._count("checkout_failures")
+
+    def connection_checked_out(self, event):
+        self._count("checked_out")
+
+    def connection_checked_in(self, event):
+        self._count("checked_in")
+
+    def snapshot(self):
+        """Returns the counters plus the derived number of open and in-use connections."""
+        with self._lock:
+            stats = dict(self._counters)
+        stats["open_connections"] = stats["connections_created"] - stats["connections_closed"]
+        stats["in_use"] = stats["checked_out"] - stats["checked_in"]
+        return stats
+
+
+class CircuitBreaker:
     """
-    Returns the MongoDB database instance.
-    If not connected, attempts to connect first.
-    If connection fails, returns an in-memory fallback.
+    Stops connection attempts from piling up while MongoDB is down.
+    After each failure the breaker opens for a cooldown that doubles per consecutive failure, up to a cap.
+    Once the cooldown expires a single attempt is let through (half-open); success closes the breaker.
     """
-    global client, db
 
-    if db is not None:
-        return db
+    def __init__(self, base_seconds, max_seconds):
+        self.base_seconds = base_seconds
+        self.max_seconds = max_seconds
+        self.failures = 0
+        self.last_error = None
+        self._retry_at = 0.0
 
-    try:
-        # Create a MongoDB client if not already created
-        if client is None:
-            # Print URI for debugging (hide password in logs)
-            debug_uri = MONGO_URI.replace(MONGO_PASSWORD_ENCODED or "", "******") if MONGO_PASSWORD_ENCODED else MONGO_URI
-            logger.info(f"Attempting to connect with URI: {debug_uri}")
+    @property
+    def state(self):
+        if self.failures == 0:
+            return "closed"
+        return "open" if time.monotonic() < self._retry_at else "half_open"
 
-            client = MongoClient(MONGO_URI,
-                                 serverSelectionTimeoutMS=5000,
-                                 connectTimeoutMS=5000,
-                                 socketTimeoutMS=10000)
+    def allow(self):
+        """Returns True if a connection attempt may be made now."""
+        return self.state != "open"
 
-            # Validate connection
-            client.admin.command('ping')  # A lighter way to check connection
-            logger.info("✅ Successfully connected to MongoDB")
+    def record_success(self):
+        self.failures = 0
+        self.last_error = None
+        self._retry_at = 0.0
 
-        # Get the database
-        db = client[MONGO_DB]
+    def record_failure(self, error):
+        self.failures += 1
+        self.last_error = str(error)
+        cooldown = min(self.max_seconds, self.base_seconds * (2 ** (self.failures - 1)))
+        self._retry_at = time.monotonic() + cooldown
+        return cooldown
+
+    def to_dict(self):
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "retry_in_seconds": round(max(0.0, self._retry_at - time.monotonic()), 1) if self.failures else 0.0,
+            "last_error": self.last_error,
+        }
+
+
+class MongoConnectionManager:
+    """
+    Owns the process-wide MongoClient.
+    - Connects lazily on first use, with pool sizing and timeouts from Config
+    - A failed connect is retried on a later call once the circuit breaker's cooldown has passed,
+      so a MongoDB outage at boot does not leave the process permanently without a database
+    - Once connected, the MongoClient reconnects on its own after transient network errors
+    - Pool statistics are collected through a connection pool event listener
+    """
+
+    def __init__(self, uri, db_name, password_encoded=None):
+        self.uri = uri
+        self.db_name = db_name
+        # Only used to mask the password when logging the URI
+        self._password_encoded = password_encoded
+        self.options = client_options()
+        self.breaker = CircuitBreaker(Config.DB_RECONNECT_BASE_SECONDS, Config.DB_RECONNECT_MAX_SECONDS)
+        self.pool_listener = PoolStatsListener()
+        self.client = None
+        self.db = None
+        self._lock = threading.Lock()
+
+    def get_database(self):
+        """
+        Returns the MongoDB database instance, connecting first if needed.
+        Returns None while MongoDB is unreachable; the next call after the cooldown tries again.
+        """
+        if self.db is not None:
+            return self.db
+
+        with self._lock:
+            if self.db is not None:
+                return self.db
+            if not self.breaker.allow():
+                return None
+
+            client = None
+            try:
+                # Print URI for debugging (hide password in logs)
+                debug_uri = self.uri.replace(self._password_encoded, "******") if self._password_encoded else self.uri
+                logger.info(f"Attempting to connect with URI: {debug_uri}")
+
+                client = MongoClient(self.uri, event_listeners=[self.pool_listener], **self.options)
+
+                # Validate connection
+                client.admin.command('ping')  # A lighter way to check connection
+                logger.info("✅ Successfully connected to MongoDB")
+
+                self.client = client
+                self.db = client[self.db_name]
+                self.breaker.record_success()
+                return self.db
+
+            except Exception as e:
+                if client is not None:
+                    client.close()
+                cooldown = self.breaker.record_failure(e)
+                logger.error(f"❌ Failed to connect to MongoDB: {e}")
+                logger.warning(f"Retrying the MongoDB connection in {cooldown:.1f}s; using fallback until then")
+                return None
+
+    def check_connection(self):
+        """Tests the database connection and logs the server version."""
+        try:
+            if self.get_database() is not None:
+                # Try to execute a simple command
+                info = self.client.server_info()
+                logger.info("✅ MongoDB connection successful!")
+                logger.info(f"MongoDB version: {info.get('version')}")
+                return True
+
+        except Exception as e:
+            logger.error(f"❌ MongoDB connection failed: {e}")
+
+        return False
+
+    def stats(self):
+        """Returns connection state, circuit breaker state, pool settings and pool counters."""
+        return {
+            "connected": self.db is not None,
+            "circuit_breaker": self.breaker.to_dict(),
+            "pool_options": dict(self.options),
+            "pool": self.pool_listener.snapshot(),
+        }
+
+    def close(self):
+        """Closes the client; the next get_database() call reconnects."""
+        with self._lock:
+            if self.client is not None:
+                self.client.close()
+            self.client = None
+            self.db = None
+
+
+# Process-wide connection manager, created on first use so importing this module has no side effects
+_connection_manager = None
+_connection_manager_lock = threading.Lock()
+
+
+def get_connection_manager():
+    """Returns the process-wide MongoConnectionManager, creating it on first use."""
+    global _connection_manager
+    if _connection_manager is None:
+        with _connection_manager_lock:
+            if _connection_manager is None:
+                settings = connection_settings()
+                log_connection_details(settings)
+                _connection_manager = MongoConnectionManager(
+                    settings["uri"], settings["database"], settings["password_encoded"]
+                )
+    return _connection_manager
+
+
+# Process-wide in-memory database used when DB_BACKEND=memory or as the fallback while MongoDB is down
+_memory_database = None
+_using_fallback = False
+
+
+def get_memory_database():
+    """Returns the process-wide in-memory database, creating it on first use."""
+    global _memory_database
+    if _memory_database is None:
+        with _connection_manager_lock:
+            if _memory_database is None:
+                _memory_database = MemoryDatabase(os.getenv("DB_NAME", "expenses"))
+    return _memory_database
+
+
+def get_database():
+    """
+    Returns the database instance.
+    If not connected to MongoDB, attempts to connect first.
+    If the connection fails, returns None, or the in-memory store when DB_FALLBACK=memory.
+    The fallback is read-only: it is not copied to MongoDB once it is back, so callers refuse
+    writes while using_fallback() is true.
+    """
+    global _using_fallback
+    if Config.DB_BACKEND == "memory":
+        return get_memory_database()
+
+    db = get_connection_manager().get_database()
+    if db is not None:
+        if _using_fallback:
+            logger.info("✅ MongoDB is back, leaving the in-memory fallback")
+            _using_fallback = False
+            # Results cached from the fallback do not describe the MongoDB data
+            bump_generation()
         return db
 
-    except Exception as e:
-        logger.error(f"❌ Failed to connect to MongoDB: {e}")
-        logger.warning("Using in-memory fallback for database operations")
-        return None  # Changed to return None instead of db which would be None here
+    if Config.DB_FALLBACK != "memory":
+        return None
+    if not _using_fallback:
+        logger.warning("⚠️ Using in-memory fallback for database operations")
+        _using_fallback = True
+        bump_generation()
+    return get_memory_database()
 
 
-def check_connection():
-    """Tests the database connection and prints status."""
-    global client
+def using_fallback():
+    """Whether get_database() is currently serving the in-memory fallback because MongoDB is unreachable."""
+    return _using_fallback
 
-    try:
-        if client is None:
-            get_database()  # This will attempt to create a connection
 
-        if client is not None:
-            # Try to execute a simple command
-            info = client.server_info()
-            logger.info("✅ MongoDB connection successful!")
-            logger.info(f"MongoDB version: {info.get('version')}")
-            return True
+def check_connection():
+    """Tests the database connection and prints status."""
+    return get_connection_manager().check_connection()
 
-    except Exception as e:
-        logger.error(f"❌ MongoDB connection failed: {e}")
 
-    return False
+def pool_stats():
+    """Returns MongoDB connection pool and circuit breaker statistics, plus the backend currently serving requests."""
+    if Config.DB_BACKEND == "memory":
+        return {"backend": "memory", "connected": False}
+    stats = get_connection_manager().stats()
+    stats["backend"] = "memory" if _using_fallback else "mongo"
+    return stats
 
 
 # # Uncomment to test when running this file directly
@@ -213,11 +213,41 @@ from plaid.model.link_token_create_request_user import LinkTokenCreateRequestUse
 from plaid.model.transactions_get_request import TransactionsGetRequest
 from plaid.model.transactions_get_request_options import TransactionsGetRequestOptions
 from plaid.model.item_public_token_exchange_request import ItemPublicTokenExchangeRequest
+from plaid.model.transactions_sync_request import TransactionsSyncRequest
+from plaid.exceptions import ApiException
+from plaid_request_layer import PlaidRequestLayer, plaid_error_code
+from urllib3.connection import HTTPConnection
 from datetime import datetime, date, timedelta
+from collections import deque
+import json
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 
 # Configure logging for production
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
+# Upper bound for get_transactions, which collects every page into a single list
+MAX_BUFFERED_TRANSACTIONS = 10000
+
+# How many times a /transactions/sync loop is restarted when Plaid reports a mutation mid-pagination
+MAX_SYNC_RESTARTS = 3
+
+# Plaid error codes meaning the item's access token no longer works until the user re-authenticates
+ITEM_LOGIN_ERROR_CODES = {
+    "ITEM_LOGIN_REQUIRED",
+    "INVALID_ACCESS_TOKEN",
+    "ITEM_NOT_FOUND",
+    "ACCESS_NOT_GRANTED",
+    "USER_PERMISSION_REVOKED",
+}
+
+# Process-wide client shared by every route and service, see get_plaid_client()
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
 
 class PlaidClient:
     """Handles API requests using the Plaid SDK for Production."""
@@ -237,8 +267,76 @@ class PlaidClient:
         self.configuration = Configuration(host=host)
         self.configuration.api_key["clientId"] = Config.PLAID_CLIENT_ID
         self.configuration.api_key["secret"] = Config.PLAID_SECRET
+        # Size the urllib3 pool for concurrent page fetches and keep idle connections alive,
+        # so TLS handshakes are paid once per connection rather than once per request
+        self.configuration.connection_pool_maxsize = Config.PLAID_POOL_MAXSIZE
+        self.configuration.socket_options = HTTPConnection.default_socket_options + [
+            (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        ]
         self.api_client = ApiClient(self.configuration)
         self.client = plaid_api.PlaidApi(self.api_client)
+        # Rate limiting and retries shared by every call made through this client
+        self.requests = PlaidRequestLayer(
+            timeout=(Config.PLAID_CONNECT_TIMEOUT_SECONDS, Config.PLAID_READ_TIMEOUT_SECONDS),
+            on_error=self._handle_api_error
+        )
+
+        # Parse transaction responses straight from JSON instead of hydrating SDK model objects
+        self.raw_json = Config.PLAID_RAW_JSON
+
+        # access_token -> (valid, message, expires_at) for check_access_token
+        self._token_validation = {}
+        self._token_validation_lock = threading.Lock()
+
+    def validate_access_token(self, access_token):
+        """Checks that an access token works by requesting a single recent transaction. Raises on failure."""
+        end_date = datetime.now().date()
+        self._fetch_transactions_page(access_token, end_date - timedelta(days=1), end_date, 0, 1)
+        return True
+
+    def check_access_token(self, access_token):
+        """
+        Validates an access token, reusing the outcome for PLAID_TOKEN_VALIDATION_TTL_SECONDS.
+        Only definitive outcomes are cached: a working token, or an item login error.
+        Transient failures are reported but checked again on the next call.
+
+        Returns:
+            dict: "valid", "message" and whether the result came from the cache
+        """
+        with self._token_validation_lock:
+            cached = self._token_validation.get(access_token)
+        if cached and cached[2] > time.monotonic():
+            return {"valid": cached[0], "message": cached[1], "cached": True}
+
+        try:
+            self.validate_access_token(access_token)
+            valid, message = True, "Token is valid"
+        except Exception as e:
+            logging.error(f"❌ Error validating token: {str(e)}")
+            if plaid_error_code(e) not in ITEM_LOGIN_ERROR_CODES:
+                return {"valid": False, "message": "Token validation failed", "cached": False}
+            valid, message = False, "Token validation failed"
+
+        with self._token_validation_lock:
+            self._token_validation[access_token] = (
+                valid, message, time.monotonic() + Config.PLAID_TOKEN_VALIDATION_TTL_SECONDS
+            )
+        return {"valid": valid, "message": message, "cached": False}
+
+    def invalidate_token_validation(self, access_token=None):
+        """Forgets cached validation results for one access token, or for all tokens when none is given."""
+        with self._token_validation_lock:
+            if access_token is None:
+                self._token_validation.clear()
+            else:
+                self._token_validation.pop(access_token, None)
+
+    def _handle_api_error(self, error, request_args):
+        """Drops the cached validation of a token as soon as a real Plaid call reports an item login error."""
+        if plaid_error_code(error) not in ITEM_LOGIN_ERROR_CODES:
+            return
+        request = request_args[0] if request_args else None
+        self.invalidate_token_validation(getattr(request, "access_token", None))
 
     def _parse_date(self, date_str):
         """Converts a date string to a date object required by Plaid API."""
@@ -255,97 +353,213 @@ class PlaidClient:
             # Return today's date as fallback
             return datetime.now().date()
 
-    def get_transactions(self, access_token, start_date=None, end_date=None, limit=None):
-        """Fetches transactions from Plaid API with proper pagination.
+    def _resolve_date_range(self, start_date=None, end_date=None):
+        """Applies the default 30-day window and converts both bounds to date objects."""
+        if not start_date:
+            start_date = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
+            logging.info(f"No start_date provided, using default: {start_date}")
+        else:
+            logging.info(f"Using provided start_date: {start_date}")
+
+        if not end_date:
+            end_date = datetime.now().strftime('%Y-%m-%d')
+            logging.info(f"No end_date provided, using default: {end_date}")
+        else:
+            logging.info(f"Using provided end_date: {end_date}")
+
+        return self._parse_date(start_date), self._parse_date(end_date)
+
+    def _fetch_transactions_page(self, access_token, start_date, end_date, offset, count):
+        """Fetches a single /transactions/get page and returns it as a dict."""
+        options = TransactionsGetRequestOptions(
+            count=count,
+            offset=offset
+        )
+        request = TransactionsGetRequest(
+            access_token=access_token,
+            start_date=start_date,
+            end_date=end_date,
+            options=options
+        )
+
+        # Page fetches are idempotent, so a transient failure retries this same offset
+        return self._call_as_dict(self.client.transactions_get, request)
+
+    def _call_as_dict(self, api_method, request):
+        """
+        Calls a Plaid API method through the request layer and returns the response body as a dict.
+        In raw JSON mode the SDK is asked not to preload its response models, and the body is
+        parsed once with json.loads. Dates then stay ISO strings instead of date objects.
+        """
+        if not self.raw_json:
+            response = self.requests.call(api_method, request)
+            # Convert response to dict for easy handling
+            return response.to_dict() if hasattr(response, 'to_dict') else response
+
+        response = self.requests.call(api_method, request, _preload_content=False)
+        try:
+            return json.loads(response.data)
+        finally:
+            # Unread responses keep their pooled connection checked out
+            response.release_conn()
+
+    @staticmethod
+    def _dedupe_page(transactions, seen_ids):
+        """Drops transactions already yielded on an earlier page (offsets shift when new transactions post)."""
+        unique = []
+        for txn in transactions:
+            transaction_id = txn.get("transaction_id")
+            if transaction_id in seen_ids:
+                continue
+            seen_ids.add(transaction_id)
+            unique.append(txn)
+        return unique
+
+    def iter_transaction_pages(self, access_token, start_date=None, end_date=None, limit=None, concurrency=None):
+        """Yields transactions from Plaid API one page at a time.
+
+        The first page tells us `total_transactions`; the remaining offsets are then
+        fetched concurrently on a bounded thread pool and yielded back in offset order.
+        At most `concurrency` pages are in flight, so memory stays bounded and callers
+        can persist each page as soon as it arrives. API errors are raised to the caller.
 
         Args:
             access_token (str): Plaid access token
             start_date (str): Start date in YYYY-MM-DD format
             end_date (str): End date in YYYY-MM-DD format
             limit (int): Maximum number of transactions to retrieve
+            concurrency (int, optional): Maximum number of pages fetched at once
 
-        Returns:
-            list: List of transaction objects
+        Yields:
+            list: A page of up to 500 transaction dicts, deduplicated by transaction_id
         """
-        try:
-            # Ensure we're using the provided dates
-            if not start_date:
-                start_date = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
-                logging.info(f"No start_date provided, using default: {start_date}")
-            else:
-                logging.info(f"Using provided start_date: {start_date}")
+        start_date_obj, end_date_obj = self._resolve_date_range(start_date, end_date)
+        concurrency = max(1, concurrency or Config.PLAID_FETCH_CONCURRENCY)
+        logging.info(f"Making Plaid API request with date range: {start_date_obj} to {end_date_obj}, limit: {limit}")
 
-            if not end_date:
-                end_date = datetime.now().strftime('%Y-%m-%d')
-                logging.info(f"No end_date provided, using default: {end_date}")
-            else:
-                logging.info(f"Using provided end_date: {end_date}")
+        # Set the batch size: use 500 (maximum allowed) or the provided limit if it is lower
+        count_per_request = min(500, limit or 500)
 
-            # Convert date strings to date objects
-            start_date_obj = self._parse_date(start_date)
-            end_date_obj = self._parse_date(end_date)
+        first_page = self._fetch_transactions_page(
+            access_token, start_date_obj, end_date_obj, 0, count_per_request
+        )
+        batch_transactions = first_page.get("transactions", [])
+        if not batch_transactions:
+            return
 
-            logging.info(f"Making Plaid API request with date range: {start_date_obj} to {end_date_obj}, limit: {limit}")
+        total_transactions = first_page.get("total_transactions", 0)
+        end_offset = min(total_transactions, limit) if limit else total_transactions
+        logging.info(f"Retrieved page of {len(batch_transactions)} transactions, {len(batch_transactions)} of {total_transactions}")
 
-            # Initialize pagination variables
-            all_transactions = []
-            has_more = True
-            offset = 0
-            # Set the batch size: use 500 (maximum allowed) or the provided limit if it is lower
-            count_per_request = min(500, limit or 500)
-
-            # Fetch transactions in batches
-            while has_more:
-                # Set options with the current batch size and offset
-                options = TransactionsGetRequestOptions(
-                    count=count_per_request,
-                    offset=offset
-                )
+        seen_ids = set()
+        yield self._dedupe_page(batch_transactions, seen_ids)
+
+        offsets = iter(range(len(batch_transactions), end_offset, count_per_request))
 
-                # Prepare and execute the request
-                request = TransactionsGetRequest(
-                    access_token=access_token,
-                    start_date=start_date_obj,
-                    end_date=end_date_obj,
-                    options=options
+        def fetch(offset):
+            # Never request more than the remaining limit
+            page = self._fetch_transactions_page(
+                access_token, start_date_obj, end_date_obj, offset, min(count_per_request, end_offset - offset)
+            )
+            return offset, page.get("transactions", [])
+
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="plaid-page") as pool:
+            # Keep a sliding window of in-flight requests and hand pages back in offset order
+            in_flight = deque(pool.submit(fetch, offset) for offset in islice(offsets, concurrency))
+
+            while in_flight:
+                offset, batch_transactions = in_flight.popleft().result()
+
+                next_offset = next(offsets, None)
+                if next_offset is not None:
+                    in_flight.append(pool.submit(fetch, next_offset))
+
+                logging.info(
+                    f"Retrieved page of {len(batch_transactions)} transactions, "
+                    f"{offset + len(batch_transactions)} of {total_transactions}"
                 )
+                unique_transactions = self._dedupe_page(batch_transactions, seen_ids)
+                if unique_transactions:
+                    yield unique_transactions
 
-                response = self.client.transactions_get(request)
+    def iter_sync_pages(self, access_token, cursor=None, count=500):
+        """Yields incremental transaction updates from Plaid's /transactions/sync endpoint.
 
-                # Convert response to dict for easy handling
-                response_dict = response.to_dict() if hasattr(response, 'to_dict') else response
+        Starting from `cursor` (or the beginning of the item's history when it is empty),
+        each page contains only what changed since the previous cursor. If Plaid reports
+        that data changed during pagination, the loop restarts from the original cursor,
+        so consumers must apply pages idempotently.
 
-                # Get this batch of transactions
-                batch_transactions = response_dict.get("transactions", [])
-                all_transactions.extend(batch_transactions)
+        Args:
+            access_token (str): Plaid access token
+            cursor (str, optional): Cursor returned by the last completed sync
+            count (int): Number of updates to request per page (max 500)
 
-                # Log the number of transactions retrieved for the batch
-                logging.info(f"Retrieved batch of {len(batch_transactions)} transactions, total so far: {len(all_transactions)}")
+        Yields:
+            dict: "added", "modified" and "removed" lists, plus "next_cursor" and "has_more"
+        """
+        restarts = 0
+        page_cursor = cursor
+
+        while True:
+            request_args = {"access_token": access_token, "count": count}
+            if page_cursor:
+                request_args["cursor"] = page_cursor
+
+            try:
+                response_dict = self._call_as_dict(self.client.transactions_sync, TransactionsSyncRequest(**request_args))
+            except ApiException as e:
+                if plaid_error_code(e) == "TRANSACTIONS_SYNC_MUTATION_DURING_PAGINATION" and restarts < MAX_SYNC_RESTARTS:
+                    restarts += 1
+                    logging.warning(f"⚠️ Transactions changed during sync pagination, restarting ({restarts}/{MAX_SYNC_RESTARTS})")
+                    page_cursor = cursor
+                    continue
+                raise
+
+            page = {
+                "added": response_dict.get("added", []),
+                "modified": response_dict.get("modified", []),
+                "removed": [txn["transaction_id"] for txn in response_dict.get("removed", [])],
+                "next_cursor": response_dict.get("next_cursor"),
+                "has_more": response_dict.get("has_more", False)
+            }
+            logging.info(
+                f"Retrieved sync page: {len(page['added'])} added, {len(page['modified'])} modified, "
+                f"{len(page['removed'])} removed"
+            )
 
-                # Update the offset for the next batch
-                offset += len(batch_transactions)
+            yield page
 
-                # Get the total number of transactions available in the given date range
-                total_transactions = response_dict.get("total_transactions", 0)
+            if not page["has_more"]:
+                return
+            page_cursor = page["next_cursor"]
 
-                # Continue pagination if there are more transactions and the requested limit has not been reached
-                has_more = (offset < total_transactions) and (not limit or len(all_transactions) < limit)
+    def get_transactions(self, access_token, start_date=None, end_date=None, limit=None):
+        """Fetches transactions from Plaid API with proper pagination.
+
+        Args:
+            access_token (str): Plaid access token
+            start_date (str): Start date in YYYY-MM-DD format
+            end_date (str): End date in YYYY-MM-DD format
+            limit (int): Maximum number of transactions to retrieve
 
-                # If no transactions were returned, exit the loop
-                if len(batch_transactions) == 0:
-                    has_more = False
+        Returns:
+            list: List of transaction objects
+        """
+        try:
+            all_transactions = []
 
-                # Safety check to prevent excessive API calls (for example, stopping after 10,000 transactions)
-                if len(all_transactions) >= 10000:
-                    logging.warning("Retrieved 10,000+ transactions, stopping to prevent excessive API calls")
-                    has_more = False
+            for batch_transactions in self.iter_transaction_pages(access_token, start_date, end_date, limit):
+                all_transactions.extend(batch_transactions)
 
-            # If a limit was provided and we overshot the value, truncate the list to the exact number
-            if limit and len(all_transactions) > limit:
-                logging.info(f"Reached requested limit of {limit} transactions, truncating the results")
-                all_transactions = all_transactions[:limit]
+                # Safety check: this method buffers everything in memory, use iter_transaction_pages for backfills
+                if len(all_transactions) >= MAX_BUFFERED_TRANSACTIONS:
+                    logging.warning(
+                        f"Retrieved {MAX_BUFFERED_TRANSACTIONS}+ transactions, stopping to bound memory use"
+                    )
+                    break
 
-            logging.info(f"✅ Successfully retrieved {len(all_transactions)} transactions from {start_date_obj} to {end_date_obj}")
+            logging.info(f"✅ Successfully retrieved {len(all_transactions)} transactions from {start_date} to {end_date}")
             return all_transactions
 
         except Exception as e:
@@ -374,7 +588,7 @@ class PlaidClient:
             )
 
             # Execute the API call
-            response = self.client.link_token_create(request)
+            response = self.requests.call(self.client.link_token_create, request, idempotent=False)
             link_token_data = response
 
             # Log a portion of the token for debugging (not the full token for security)
@@ -390,7 +604,7 @@ class PlaidClient:
         """Exchanges a `public_token` for a permanent `access_token`."""
         try:
             request = ItemPublicTokenExchangeRequest(public_token=public_token)
-            response = self.client.item_public_token_exchange(request)
+            response = self.requests.call(self.client.item_public_token_exchange, request, idempotent=False)
 
             response_dict = response
 
@@ -402,3 +616,18 @@ class PlaidClient:
         except Exception as e:
             logging.error(f"❌ Failed to exchange public token: {str(e)}")
             return {"error": f"Failed to exchange public token: {str(e)}"}
+
+    def request_stats(self):
+        """Returns retry and throttling counters for calls made through this client."""
+        return self.requests.stats()
+
+
+def get_plaid_client():
+    """Returns the process-wide PlaidClient, creating it on first use."""
+    global _shared_client
+
+    if _shared_client is None:
+        with _shared_client_lock:
+            if _shared_client is None:
+                _shared_client = PlaidClient()
+    return _shared_client
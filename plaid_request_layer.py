@@ -0,0 +1,168 @@
+import json
+import logging
+import random
+import threading
+import time
+from plaid.exceptions import ApiException
+from urllib3.exceptions import HTTPError as Urllib3HTTPError
+from config import Config
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Plaid error codes that describe a temporary condition rather than a bad request
+TRANSIENT_ERROR_CODES = {
+    "RATE_LIMIT_EXCEEDED",
+    "INTERNAL_SERVER_ERROR",
+    "PLANNED_MAINTENANCE",
+    "INSTITUTION_DOWN",
+    "INSTITUTION_NOT_RESPONDING",
+    "PRODUCT_NOT_READY",
+}
+
+
+def plaid_error_code(error):
+    """Returns Plaid's error_code (e.g. "ITEM_LOGIN_REQUIRED") from an ApiException, or None."""
+    if not isinstance(error, ApiException) or not error.body:
+        return None
+    try:
+        return json.loads(error.body).get("error_code")
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Thread-safe client-side rate limiter: `rate` requests per second with bursts up to `capacity`."""
+
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Takes one token, sleeping until one is available. Returns the number of seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+                self._last_refill = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+
+            time.sleep(delay)
+            waited += delay
+
+
+class PlaidRequestLayer:
+    """
+    Shared request layer for Plaid API calls.
+    - Throttles every call through a client-side token bucket
+    - Retries transient failures (rate limits, 5xx, connection errors) with exponential backoff and full jitter
+    - Non-idempotent calls are only retried when Plaid rejected them with a rate limit, since the request was not processed
+    - Keeps counters for requests, retries and throttled waits
+    """
+
+    def __init__(self, rate=None, burst=None, max_retries=None, backoff_base=None, backoff_max=None, timeout=None,
+                 on_error=None):
+        self.bucket = TokenBucket(rate or Config.PLAID_RATE_LIMIT_PER_SEC, burst or Config.PLAID_RATE_LIMIT_BURST)
+        self.max_retries = Config.PLAID_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_base = backoff_base or Config.PLAID_BACKOFF_BASE_SECONDS
+        self.backoff_max = backoff_max or Config.PLAID_BACKOFF_MAX_SECONDS
+        # Default (connect, read) timeout passed to every SDK call
+        self.timeout = timeout
+        # Optional callback(error, request_args) invoked for every failed call
+        self.on_error = on_error
+        self._counters = {
+            "requests": 0,
+            "retries": 0,
+            "rate_limited": 0,
+            "failures": 0,
+            "throttled_waits": 0,
+            "throttled_seconds": 0.0,
+        }
+        self._lock = threading.Lock()
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+
+    @staticmethod
+    def _is_rate_limited(error):
+        return isinstance(error, ApiException) and (
+            error.status == 429 or plaid_error_code(error) == "RATE_LIMIT_EXCEEDED"
+        )
+
+    @staticmethod
+    def _is_transient(error):
+        if isinstance(error, ApiException):
+            return (error.status or 0) >= 500 or error.status == 429 or plaid_error_code(error) in TRANSIENT_ERROR_CODES
+        # Connection resets, timeouts and other transport errors raised by urllib3
+        return isinstance(error, (Urllib3HTTPError, ConnectionError, TimeoutError))
+
+    def _backoff_delay(self, attempt, error):
+        """Exponential backoff with full jitter, honouring a Retry-After header when Plaid sends one."""
+        headers = getattr(error, "headers", None) or {}
+        retry_after = headers.get("Retry-After") if hasattr(headers, "get") else None
+        if retry_after:
+            try:
+                return min(self.backoff_max, float(retry_after))
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def call(self, func, *args, idempotent=True, **kwargs):
+        """
+        Calls a Plaid API method through the rate limiter and retry policy.
+
+        Args:
+            func (callable): Plaid API method, e.g. `client.transactions_get`
+            idempotent (bool): Whether the call is safe to repeat after a server-side failure
+
+        Returns:
+            The API response. The last error is raised once retries are exhausted.
+        """
+        if self.timeout is not None:
+            kwargs.setdefault("_request_timeout", self.timeout)
+
+        attempt = 0
+        while True:
+            waited = self.bucket.acquire()
+            if waited:
+                self._count("throttled_waits")
+                self._count("throttled_seconds", waited)
+
+            self._count("requests")
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                if self.on_error:
+                    self.on_error(e, args)
+                if self._is_rate_limited(e):
+                    self._count("rate_limited")
+
+                retryable = self._is_rate_limited(e) or (idempotent and self._is_transient(e))
+                if not retryable or attempt >= self.max_retries:
+                    self._count("failures")
+                    raise
+
+                delay = self._backoff_delay(attempt, e)
+                attempt += 1
+                self._count("retries")
+                logging.warning(
+                    f"⚠️ Plaid call {getattr(func, '__name__', func)} failed ({plaid_error_code(e) or type(e).__name__}), "
+                    f"retry {attempt}/{self.max_retries} in {delay:.2f}s"
+                )
+                time.sleep(delay)
+
+    def stats(self):
+        """Returns a snapshot of the request counters."""
+        with self._lock:
+            snapshot = dict(self._counters)
+        snapshot["throttled_seconds"] = round(snapshot["throttled_seconds"], 3)
+        return snapshot
@@ -1,18 +1,25 @@
 import logging
-from plaid_client import PlaidClient
+from plaid_client import get_plaid_client
 from mongodb_client import get_database
 from datetime import datetime, timedelta
 
 # Configure logging instead of print statements
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
+# The single linked account's document in `accounts`, holding its access token and sync cursor
+ACCOUNT_FILTER = {"id": "1"}
+
 
 class PlaidService:
     """Handles transaction retrieval and authentication with Plaid."""
 
     def __init__(self):
-        self.client = PlaidClient()
-        self.db = get_database()
+        self.client = get_plaid_client()
+
+    @property
+    def db(self):
+        """The MongoDB database, looked up on each use so a reconnect after an outage is picked up."""
+        return get_database()
 
     def link_chase_account(self):
         """Generates a Link Token for Plaid authentication in production."""
@@ -37,7 +44,7 @@ class PlaidService:
             # Store the access token in the database
             if self.db is not None:
                 self.db.accounts.update_one(
-                    {"id": 1},
+                    ACCOUNT_FILTER,
                     {"$set": {"access_token": access_token}},
                     upsert=True
                 )
@@ -66,8 +73,8 @@ class PlaidService:
             end_date = datetime.now().strftime('%Y-%m-%d')
 
         # Try to obtain the access_token if not provided
-        if not access_token and self.db:
-            account_doc = self.db.accounts.find_one({"id": 1})
+        if not access_token and self.db is not None:
+            account_doc = self.db.accounts.find_one(ACCOUNT_FILTER)
             if account_doc and "access_token" in account_doc:
                 access_token = account_doc["access_token"]
                 logging.info("✅ Retrieved access token from database.")
@@ -91,6 +98,106 @@ class PlaidService:
             logging.error(f"❌ Failed to fetch transactions: {e}")
             return {"error": str(e)}
 
+    def iter_transaction_pages(self,
+                               access_token: str,
+                               start_date: str = None,
+                               end_date: str = None,
+                               limit: int = None):
+        """
+        Streams transactions from the Plaid API one page at a time.
+        Pages are yielded as they arrive so they can be saved without buffering the whole range.
+        """
+        if not access_token:
+            raise ValueError("access_token is required")
+
+        return self.client.iter_transaction_pages(
+            access_token,
+            start_date=start_date,
+            end_date=end_date,
+            limit=limit
+        )
+
+    def get_sync_cursor(self, access_token):
+        """
+        Returns the stored /transactions/sync cursor for the item behind `access_token`, if any.
+        The cursor lives on the account document; one saved for a previous token is not reused.
+        """
+        if self.db is None:
+            return None
+        account_doc = self.db.accounts.find_one(ACCOUNT_FILTER, {"token_id": 1, "sync_cursor": 1})
+        if not account_doc or account_doc.get("token_id") != access_token:
+            return None
+        return account_doc.get("sync_cursor")
+
+    def save_sync_cursor(self, access_token, cursor):
+        """Persists the /transactions/sync cursor on the account document, next to the access token it belongs to."""
+        if self.db is None:
+            return
+        self.db.accounts.update_one(
+            ACCOUNT_FILTER,
+            {"$set": {"token_id": access_token, "sync_cursor": cursor, "sync_cursor_updated": datetime.now().isoformat()}},
+            upsert=True
+        )
+
+    def sync_transactions(self, access_token: str, loader, progress=None):
+        """
+        Applies incremental changes from Plaid's /transactions/sync through the loader.
+        Only added/modified/removed deltas since the stored cursor are fetched, and the new
+        cursor is saved once every page has been applied.
+
+        Args:
+            access_token (str): Plaid access token
+            loader (TransactionLoader): Loader used to apply each page of deltas
+            progress (callable, optional): Called with (rows_parsed, rows_written) after each page
+
+        Returns:
+            dict: Combined result across all sync pages
+        """
+        if not access_token:
+            logging.warning("❌ Access token is missing.")
+            return {"success": False, "message": "access_token is required"}
+
+        cursor = self.get_sync_cursor(access_token)
+        logging.info(f"🔄 Starting transactions sync ({'incremental' if cursor else 'initial'})")
+
+        summary = {"success": True, "pages": 0, "added": 0, "modified": 0, "removed": 0,
+                   "inserted": 0, "updated": 0, "unchanged": 0, "deleted": 0, "errors": []}
+        next_cursor = cursor
+
+        try:
+            for page in self.client.iter_sync_pages(access_token, cursor):
+                result = loader.apply_sync_deltas(page["added"], page["modified"], page["removed"])
+                summary["pages"] += 1
+                summary["added"] += len(page["added"])
+                summary["modified"] += len(page["modified"])
+                summary["removed"] += len(page["removed"])
+                for key in ("inserted", "updated", "unchanged", "deleted"):
+                    summary[key] += result.get(key, 0)
+                summary["errors"].extend(result.get("errors", []))
+                next_cursor = page["next_cursor"]
+
+                if progress:
+                    parsed = len(page["added"]) + len(page["modified"]) + len(page["removed"])
+                    progress(parsed, result.get("inserted", 0) + result.get("updated", 0) + result.get("deleted", 0))
+        except Exception as e:
+            logging.error(f"❌ Transactions sync failed: {str(e)}", exc_info=True)
+            summary["success"] = False
+            summary["message"] = f"Transactions sync failed: {str(e)}"
+            return summary
+
+        # Only advance the cursor when every page was written, so failed writes are fetched again
+        if summary["errors"]:
+            summary["success"] = False
+            summary["message"] = "Sync applied with write errors, cursor not advanced"
+        else:
+            self.save_sync_cursor(access_token, next_cursor)
+            summary["message"] = (
+                f"Synced {summary['added']} added, {summary['modified']} modified, {summary['removed']} removed"
+            )
+
+        logging.info(f"✅ {summary['message']}")
+        return summary
+
     def exchange_public_token(self, public_token):
         """Exchanges a `public_token` for a permanent `access_token`."""
         if not public_token:
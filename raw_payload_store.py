@@ -0,0 +1,119 @@
+import json
+import logging
+import zlib
+from pymongo import UpdateOne
+from config import Config
+
+try:
+    import zstandard
+except ImportError:  # zstd compression is optional
+    zstandard = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Collection holding the raw source payload of each transaction, keyed by transaction_id
+PAYLOAD_COLLECTION = "transaction_payloads"
+
+# Supported values for RAW_PAYLOAD_COMPRESSION
+COMPRESSIONS = ("none", "zlib", "zstd")
+
+
+class RawPayloadStore:
+    """
+    Stores the raw source JSON of transactions (the Plaid payload or imported row) outside the
+    `transactions` collection, so analysis queries only touch the small normalized documents.
+    Payloads are optionally compressed and are only read back on demand, e.g. by the detail popup.
+    The unique transaction_id index is provisioned by index_manager.
+    """
+
+    def __init__(self, collection, compression=None):
+        # The PAYLOAD_COLLECTION collection of a pymongo (or Motor) database
+        self.collection = collection
+        self.compression = self._resolve_compression(compression or Config.RAW_PAYLOAD_COMPRESSION)
+
+    @staticmethod
+    def _resolve_compression(compression):
+        compression = compression.lower()
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"RAW_PAYLOAD_COMPRESSION must be one of: {', '.join(COMPRESSIONS)}")
+        if compression == "zstd" and zstandard is None:
+            logging.warning("⚠️ zstandard is not installed, compressing raw payloads with zlib instead")
+            return "zlib"
+        return compression
+
+    def encode(self, transaction_id, payload, content_hash=None):
+        """
+        Builds the stored document for one payload.
+
+        Args:
+            transaction_id (str): Transaction the payload belongs to
+            payload (dict): Serializable source payload
+            content_hash (str, optional): Fingerprint of the payload, kept alongside it
+
+        Returns:
+            dict: Document for the payload collection
+        """
+        raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        document = {
+            "transaction_id": transaction_id,
+            "encoding": self.compression,
+            "content_hash": content_hash,
+            "raw_size": len(raw),
+        }
+
+        if self.compression == "zlib":
+            document["payload"] = zlib.compress(raw, Config.RAW_PAYLOAD_COMPRESSION_LEVEL)
+        elif self.compression == "zstd":
+            document["payload"] = zstandard.ZstdCompressor(level=Config.RAW_PAYLOAD_COMPRESSION_LEVEL).compress(raw)
+        else:
+            document["payload"] = payload
+
+        document["stored_size"] = len(document["payload"]) if self.compression != "none" else len(raw)
+        return document
+
+    @staticmethod
+    def decode(document):
+        """Returns the payload dict held in a stored document, whatever encoding it was written with."""
+        encoding = document.get("encoding", "none")
+        payload = document.get("payload")
+
+        if encoding == "none":
+            return payload
+        if encoding == "zlib":
+            return json.loads(zlib.decompress(payload))
+        if encoding == "zstd":
+            if zstandard is None:
+                raise RuntimeError("zstandard is required to read zstd-compressed payloads")
+            return json.loads(zstandard.ZstdDecompressor().decompress(payload))
+        raise ValueError(f"Unknown payload encoding: {encoding}")
+
+    def operations(self, transactions):
+        """Returns the upserts that store the encoded payloads of Transaction objects."""
+        return [
+            UpdateOne(
+                {"transaction_id": txn.transaction_id},
+                {"$set": self.encode(txn.transaction_id, txn.original_data, txn.content_hash)},
+                upsert=True
+            )
+            for txn in transactions
+        ]
+
+    @staticmethod
+    def failed_ids(transactions, write_errors=None):
+        """
+        Returns the ids of the transactions whose payload upsert failed, given the writeErrors of an
+        unordered bulk write of operations(transactions). Without write errors, every id is returned.
+        """
+        if not write_errors:
+            return {txn.transaction_id for txn in transactions}
+        return {transactions[error["index"]].transaction_id for error in write_errors if "index" in error}
+
+    def get(self, transaction_id):
+        """Returns the raw payload of a transaction, or None if none is stored."""
+        document = self.collection.find_one({"transaction_id": transaction_id})
+        return None if document is None else self.decode(document)
+
+    def delete_many(self, transaction_ids):
+        """Deletes the payloads of the given transaction ids. Returns the number deleted."""
+        return self.collection.delete_many({"transaction_id": {"$in": list(transaction_ids)}}).deleted_count
@@ -0,0 +1,112 @@
+import functools
+import inspect
+import threading
+from collections import OrderedDict
+from config import Config
+
+
+class ResultCache:
+    """
+    LRU cache for analysis results, invalidated by a global data-generation counter.
+    - Entries are keyed by (generation, name, arguments), so bumping the generation makes every
+      earlier result unreachable; they are also dropped at once to free the memory
+    - Writers bump the generation after their write, so a result computed from pre-write data is
+      stored under the old generation and never served afterwards
+    - The counter lives in this process: writes made by another process (e.g. migrations.py)
+      are not seen until the next local write or a restart
+    Cached results are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_entries=None):
+        # None follows Config.ANALYSIS_CACHE_SIZE, which load_settings() can change after import
+        self._max_entries = max_entries
+        self.generation = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    @property
+    def max_entries(self):
+        return Config.ANALYSIS_CACHE_SIZE if self._max_entries is None else self._max_entries
+
+    def lookup(self, name, arguments):
+        """
+        Returns (hit, value, generation). On a miss, pass the returned generation to store()
+        so a result computed while a write happened is not cached under the new generation.
+        """
+        with self._lock:
+            generation = self.generation
+            key = (generation, name, arguments)
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._counters["hits"] += 1
+                return True, self._entries[key], generation
+            self._counters["misses"] += 1
+            return False, None, generation
+
+    def store(self, name, arguments, generation, value):
+        """Caches a result computed at `generation`, evicting the least recently used entries."""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[(generation, name, arguments)] = value
+            self._entries.move_to_end((generation, name, arguments))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def get_or_compute(self, name, arguments, compute):
+        hit, value, generation = self.lookup(name, arguments)
+        if hit:
+            return value
+        value = compute()
+        self.store(name, arguments, generation, value)
+        return value
+
+    def bump_generation(self):
+        """Invalidates every cached result. Call after any write that can change an analysis result."""
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self._counters["invalidations"] += 1
+
+    def stats(self):
+        """Returns hit/miss/eviction/invalidation counters, the hit ratio and the current size."""
+        with self._lock:
+            stats = dict(self._counters)
+            stats["generation"] = self.generation
+            stats["entries"] = len(self._entries)
+        stats["max_entries"] = self.max_entries
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
+
+
+# Process-wide cache shared by the sync analyzer and the async repository
+analysis_cache = ResultCache()
+
+
+def bump_generation():
+    """Invalidates the process-wide analysis cache."""
+    analysis_cache.bump_generation()
+
+
+def call_arguments(method, *args, **kwargs):
+    """Normalizes a call to a hashable tuple of (parameter, value), with defaults filled in."""
+    bound = inspect.signature(method).bind(*args, **kwargs)
+    bound.apply_defaults()
+    return tuple((name, value) for name, value in bound.arguments.items() if name != "self")
+
+
+def cached_analysis(method):
+    """
+    Caches an analyzer method in the process-wide analysis cache, keyed by its name, its
+    arguments and the analyzer's data source.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        arguments = (("use_rollups", self.use_rollups),) + call_arguments(method, self, *args, **kwargs)
+        return analysis_cache.get_or_compute(method.__name__, arguments, lambda: method(self, *args, **kwargs))
+    return wrapper
@@ -0,0 +1,77 @@
+import io
+import time
+
+import pytest
+import app as app_module
+
+
+class FakePlaidService:
+    """Yields fixed Plaid transaction pages instead of calling Plaid."""
+
+    def __init__(self, pages):
+        self.pages = pages
+
+    def iter_transaction_pages(self, access_token, start_date=None, end_date=None, limit=None):
+        return iter(self.pages)
+
+
+def plaid_transaction(transaction_id, amount, pending=False):
+    return {"transaction_id": transaction_id, "account_id": "acc", "name": "Coffee", "amount": amount,
+            "authorized_date": "2024-03-01", "iso_currency_code": "USD", "pending": pending}
+
+
+def wait_for_job(client, status_url, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(status_url).get_json()
+        if job["status"] not in ("queued", "running"):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {status_url} did not finish")
+
+
+@pytest.fixture
+def client(monkeypatch, memory_db):
+    monkeypatch.setattr(app_module, "_services", {})
+    monkeypatch.setattr(app_module, "access_token", "access-sandbox-token")
+    return app_module.app.test_client()
+
+
+def test_transactions_get_returns_counts_not_rows(client, memory_db):
+    pages = [[plaid_transaction("t1", 4.5), plaid_transaction("t2", 3.0, pending=True)], [plaid_transaction("t3", 12.0)]]
+    app_module._services["plaid"] = FakePlaidService(pages)
+
+    response = client.post("/transactions/get", json={"start_date": "2024-03-01", "end_date": "2024-03-31",
+                                                      "background": False})
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert "transactions" not in body
+    assert (body["pages"], body["total"], body["pending"], body["inserted"]) == (2, 3, 1, 2)
+
+    stored = client.post("/transactions/get-from-db", json={"start_date": "2024-03-01", "end_date": "2024-03-31"})
+    assert sorted(txn["transaction_id"] for txn in stored.get_json()["transactions"]) == ["t1", "t3"]
+
+
+def test_transactions_get_runs_in_the_background_by_default(client, memory_db):
+    app_module._services["plaid"] = FakePlaidService([[plaid_transaction("t1", 4.5)]])
+
+    response = client.post("/transactions/get", json={"start_date": "2024-03-01", "end_date": "2024-03-31"})
+
+    assert response.status_code == 202
+    job = wait_for_job(client, response.get_json()["status_url"])
+    assert job["status"] == "completed"
+    assert job["result"]["inserted"] == 1
+
+
+def test_uploaded_file_is_deleted_after_import(client, memory_db, monkeypatch, tmp_path):
+    monkeypatch.setitem(app_module.app.config, "UPLOAD_FOLDER", str(tmp_path))
+    data = {"file": (io.BytesIO(b"Date,Description,Amount\n2024-03-01,Coffee,4.50\n"), "export.csv")}
+
+    response = client.post("/upload", data=data, content_type="multipart/form-data")
+
+    assert response.status_code == 202
+    job = wait_for_job(client, response.get_json()["status_url"])
+    assert job["status"] == "completed"
+    assert job["result"]["inserted"] == 1
+    assert list(tmp_path.iterdir()) == []
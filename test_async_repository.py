@@ -0,0 +1,86 @@
+import asyncio
+import threading
+
+from async_repository import AsyncTransactionRepository
+from daily_rollups import DailyRollupStore
+from transaction_loader import TransactionLoader
+from transaction_model import Transaction
+
+
+def make_transactions(count, amount=10.0):
+    transactions = []
+    for i in range(count):
+        txn = Transaction({"transaction_id": f"t{i}", "account_id": "acc", "name": f"Merchant {i % 3}",
+                           "amount": amount + i, "authorized_date": f"2024-03-{i % 28 + 1:02d}"})
+        txn.category = f"Category {i % 2}"
+        transactions.append(txn)
+    return transactions
+
+
+def rollups(db):
+    """Rollup totals and counts by key; min/max only ever widen between rebuilds, so they are left out."""
+    return sorted(
+        ((doc["day"], doc["category"], doc["merchant"], doc["currency"]), doc["total_amount"], doc["count"])
+        for doc in db["daily_rollups"].find({})
+    )
+
+
+def bulk_upsert(transactions, batch_size=4):
+    async def run():
+        repository = AsyncTransactionRepository(driver="thread")
+        try:
+            return await repository.bulk_upsert(transactions, batch_size=batch_size)
+        finally:
+            repository.close()
+
+    return asyncio.run(run())
+
+
+def test_thread_driver_writes_through_the_loader(memory_db):
+    result = bulk_upsert(make_transactions(10))
+
+    assert (result["inserted"], result["unchanged"], result["errors"]) == (10, 0, [])
+    assert memory_db["transactions"].count_documents({}) == 10
+    assert memory_db["transaction_payloads"].count_documents({}) == 10
+    assert "transaction_id_1" in memory_db["transactions"].index_information()
+
+    result = bulk_upsert(make_transactions(10))
+    assert result["unchanged"] == 10
+
+
+def test_async_rollups_match_a_rebuild(memory_db):
+    bulk_upsert(make_transactions(10))
+    bulk_upsert(make_transactions(12, amount=20.0))
+    incremental = rollups(memory_db)
+
+    DailyRollupStore(memory_db).rebuild()
+    assert incremental == rollups(memory_db)
+
+
+def test_async_and_sync_writers_keep_rollups_consistent(memory_db):
+    loader = TransactionLoader(batch_size=4)
+    loader._bulk_upsert(make_transactions(12))
+
+    def sync_writer():
+        for round_number in range(10):
+            loader._bulk_upsert(make_transactions(12, amount=100.0 + round_number))
+
+    async def async_writer():
+        repository = AsyncTransactionRepository(driver="thread")
+        try:
+            for round_number in range(10):
+                await asyncio.gather(
+                    repository.bulk_upsert(make_transactions(12, amount=200.0 + round_number), batch_size=4),
+                    repository.update_transaction(f"t{round_number}", {"amount": 7.5 + round_number}),
+                )
+        finally:
+            repository.close()
+
+    thread = threading.Thread(target=sync_writer)
+    thread.start()
+    asyncio.run(async_writer())
+    thread.join()
+
+    incremental = rollups(memory_db)
+    DailyRollupStore(memory_db).rebuild()
+    assert incremental == rollups(memory_db)
@@ -0,0 +1,36 @@
+import os
+import pytest
+from config import Config, load_settings
+
+
+@pytest.fixture
+def restore_config(monkeypatch):
+    """Lets a test change the environment, then re-reads Config from the restored one."""
+    yield monkeypatch
+    monkeypatch.undo()
+    Config.reload()
+
+
+def test_load_settings_reads_dotenv_without_overriding_the_environment(restore_config, tmp_path):
+    restore_config.delenv("JOB_WORKERS", raising=False)
+    restore_config.setenv("LOADER_BATCH_SIZE", "250")
+    # Variables load_dotenv adds are removed again when the test finishes
+    restore_config.setattr(os, "environ", os.environ.copy())
+    dotenv = tmp_path / ".env"
+    dotenv.write_text("JOB_WORKERS=7\nLOADER_BATCH_SIZE=9999\n")
+
+    load_settings(str(dotenv))
+
+    assert Config.JOB_WORKERS == 7
+    assert Config.LOADER_BATCH_SIZE == 250
+
+
+def test_reload_reads_only_the_process_environment(restore_config, tmp_path):
+    restore_config.chdir(tmp_path)
+    (tmp_path / ".env").write_text("JOB_WORKERS=7\n")
+    restore_config.delenv("JOB_WORKERS", raising=False)
+
+    Config.reload()
+
+    assert "JOB_WORKERS" not in os.environ
+    assert Config.JOB_WORKERS == 2
@@ -0,0 +1,94 @@
+import random
+import threading
+
+import app as app_module
+from daily_rollups import DailyRollupStore, rollup_deltas
+from transaction_loader import TransactionLoader
+
+
+def plaid_transaction(transaction_id, amount, day=1):
+    return {"transaction_id": transaction_id, "account_id": "acc", "name": f"Merchant {transaction_id[-1]}",
+            "amount": amount, "authorized_date": f"2024-03-{day:02d}", "iso_currency_code": "USD"}
+
+
+def rollup_totals(db):
+    """Total and count per rollup key; min/max only ever widen between rebuilds, so they are left out."""
+    return {
+        (doc["day"], doc["category"], doc["merchant"], doc["currency"]): (round(doc["total_amount"], 6), doc["count"])
+        for doc in db["daily_rollups"].find({}) if doc["count"]
+    }
+
+
+def test_concurrent_writers_keep_rollups_consistent(memory_db, monkeypatch):
+    ids = [f"t{i}" for i in range(10)]
+    loader = TransactionLoader(batch_size=5)
+    loader.save_plaid_transactions([plaid_transaction(txn_id, 1.0) for txn_id in ids])
+    monkeypatch.setattr(app_module, "_services", {"loader": loader})
+    client = app_module.app.test_client()
+    failures = []
+
+    def importer(seed):
+        rng = random.Random(seed)
+        for _ in range(15):
+            loader.save_plaid_transactions([
+                plaid_transaction(txn_id, rng.randint(1, 500) / 4, rng.randint(1, 3)) for txn_id in ids
+            ])
+
+    def editor(seed):
+        rng = random.Random(seed)
+        for _ in range(30):
+            response = client.put("/transactions/update",
+                                  json={"transaction_id": rng.choice(ids), "amount": rng.randint(1, 500) / 4})
+            if response.status_code != 200:
+                failures.append(response.get_json())
+
+    threads = [threading.Thread(target=importer, args=(seed,)) for seed in range(3)]
+    threads += [threading.Thread(target=editor, args=(seed,)) for seed in range(3, 6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert failures == []
+    incremental = rollup_totals(memory_db)
+    DailyRollupStore(memory_db).rebuild()
+    assert incremental == rollup_totals(memory_db)
+
+
+def rollup_source(transaction_id, amount, day="2024-03-01", name="Coffee"):
+    return {"transaction_id": transaction_id, "date": day, "yyyymm": 202403, "category": "Food",
+            "name": name, "iso_currency_code": "USD", "amount": amount}
+
+
+def test_rollup_deltas_sum_added_documents_per_key():
+    deltas = rollup_deltas(added=[rollup_source("a", 4.5), rollup_source("b", 3.0), rollup_source("c", 10, name="Tea")])
+
+    assert deltas == {
+        ("2024-03-01", "Food", "Coffee", "USD"): {"yyyymm": 202403, "total_amount": 7.5, "count": 2,
+                                                  "min_amount": 3.0, "max_amount": 4.5},
+        ("2024-03-01", "Food", "Tea", "USD"): {"yyyymm": 202403, "total_amount": 10, "count": 1,
+                                               "min_amount": 10, "max_amount": 10},
+    }
+
+
+def test_rollup_deltas_move_an_updated_document_between_keys():
+    deltas = rollup_deltas(removed=[rollup_source("a", 4.5)], added=[rollup_source("a", 5.0, day="2024-03-02")])
+
+    assert deltas[("2024-03-01", "Food", "Coffee", "USD")] == {
+        "yyyymm": 202403, "total_amount": -4.5, "count": -1, "min_amount": None, "max_amount": None}
+    assert deltas[("2024-03-02", "Food", "Coffee", "USD")]["total_amount"] == 5.0
+
+
+def test_rollup_deltas_skip_keys_that_cancel_out():
+    # Amounts that are not numbers still count as a row, but leave nothing to write once balanced
+    assert rollup_deltas(added=[rollup_source("a", None)]) == {
+        ("2024-03-01", "Food", "Coffee", "USD"): {"yyyymm": 202403, "total_amount": 0, "count": 1,
+                                                  "min_amount": None, "max_amount": None},
+    }
+    assert rollup_deltas(removed=[rollup_source("a", None)], added=[rollup_source("a", None)]) == {}
+
+    # Balanced totals still carry the added amounts, which may widen min/max
+    delta = rollup_deltas(removed=[rollup_source("a", 4), rollup_source("b", 4)],
+                          added=[rollup_source("a", 2), rollup_source("b", 6)])
+    assert delta[("2024-03-01", "Food", "Coffee", "USD")] == {"yyyymm": 202403, "total_amount": 0, "count": 0,
+                                                             "min_amount": 2, "max_amount": 6}
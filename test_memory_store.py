@@ -0,0 +1,67 @@
+from memory_store import MemoryCollection, run_pipeline
+
+DOCUMENTS = [
+    {"name": "Coffee", "category": "Food", "amount": 4.5, "day": "2024-03-01"},
+    {"name": "Lunch", "category": "Food", "amount": 12, "day": "2024-03-02"},
+    {"name": "Rent", "category": "Housing", "amount": 1200, "day": "2024-03-01"},
+    {"name": "Refund", "category": "Food", "amount": None, "day": None},
+    {"name": "Cash", "category": None, "amount": 20, "day": "2024-04-01"},
+]
+
+
+def test_match_group_sort_limit():
+    result = run_pipeline(DOCUMENTS, [
+        {"$match": {"day": {"$gte": "2024-03-01", "$lte": "2024-03-31"}}},
+        {"$group": {"_id": "$category", "total": {"$sum": "$amount"}, "count": {"$sum": 1}}},
+        {"$sort": {"total": -1}},
+        {"$limit": 1},
+    ])
+
+    assert result == [{"_id": "Housing", "total": 1200, "count": 1}]
+
+
+def test_group_accumulators_ignore_missing_values_like_mongo():
+    result = run_pipeline(DOCUMENTS, [
+        {"$match": {"category": "Food"}},
+        {"$group": {"_id": None, "total": {"$sum": "$amount"}, "average": {"$avg": "$amount"},
+                    "first_day": {"$min": "$day"}, "last_day": {"$max": "$day"}, "count": {"$sum": 1}}},
+    ])
+
+    # $sum treats null as 0, $avg/$min/$max skip it, and the null-amount row is still counted
+    assert result == [{"_id": None, "total": 16.5, "average": 8.25, "first_day": "2024-03-01",
+                       "last_day": "2024-03-02", "count": 3}]
+
+
+def test_group_by_compound_id_and_null_key():
+    result = run_pipeline(DOCUMENTS, [
+        {"$match": {"name": {"$ne": "Lunch"}}},
+        {"$group": {"_id": {"category": "$category", "day": "$day"}, "count": {"$sum": 1}}},
+    ])
+
+    assert all(row["count"] == 1 for row in result)
+    assert {(row["_id"]["category"], row["_id"]["day"]) for row in result} == {
+        ("Food", "2024-03-01"), ("Housing", "2024-03-01"), ("Food", None), (None, "2024-04-01"),
+    }
+
+
+def test_facet_runs_each_sub_pipeline_over_the_same_input():
+    result = run_pipeline(DOCUMENTS, [
+        {"$match": {"amount": {"$gt": 10}}},
+        {"$facet": {
+            "largest": [{"$sort": {"amount": -1}}, {"$limit": 2}, {"$project": {"_id": 0, "name": 1}}],
+            "count": [{"$group": {"_id": None, "n": {"$sum": 1}}}],
+        }},
+    ])
+
+    assert result == [{"largest": [{"name": "Rent"}, {"name": "Cash"}], "count": [{"_id": None, "n": 3}]}]
+
+
+def test_collection_aggregate_does_not_share_documents():
+    collection = MemoryCollection("transactions")
+    collection.insert_many([dict(document) for document in DOCUMENTS])
+
+    result = list(collection.aggregate([{"$match": {"name": "Coffee"}}, {"$project": {"_id": 0, "amount": 1}}]))
+    result[0]["amount"] = 0
+
+    assert result == [{"amount": 0}]
+    assert collection.find_one({"name": "Coffee"})["amount"] == 4.5
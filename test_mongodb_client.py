@@ -0,0 +1,88 @@
+import time
+import pytest
+import app as app_module
+import mongodb_client
+from config import Config
+from memory_store import MemoryDatabase
+from mongodb_client import CircuitBreaker, get_database, using_fallback
+
+
+class FakeConnectionManager:
+    """Stands in for MongoConnectionManager: `db` is None while MongoDB is "down"."""
+
+    def __init__(self):
+        self.db = None
+
+    def get_database(self):
+        return self.db
+
+
+@pytest.fixture
+def outage(monkeypatch, memory_db):
+    """MongoDB backend whose connection starts down; set `.db` on the returned manager to reconnect."""
+    manager = FakeConnectionManager()
+    monkeypatch.setattr(Config, "DB_BACKEND", "mongo")
+    monkeypatch.setattr(mongodb_client, "_connection_manager", manager)
+    monkeypatch.setattr(mongodb_client, "_using_fallback", False)
+    monkeypatch.setattr(app_module, "_services", {})
+    return manager
+
+
+def mongo_with_transaction():
+    mongo = MemoryDatabase("mongo")
+    mongo["transactions"].insert_one({"transaction_id": "t1", "name": "Coffee", "amount": 4.5})
+    return mongo
+
+
+def update_name(client, name):
+    return client.put("/transactions/update", json={"transaction_id": "t1", "name": name})
+
+
+def test_writes_fail_during_an_outage_and_succeed_after_reconnect(outage):
+    client = app_module.app.test_client()
+
+    assert update_name(client, "Tea").status_code == 500
+
+    outage.db = mongo = mongo_with_transaction()
+    assert update_name(client, "Tea").status_code == 200
+    assert mongo["transactions"].find_one({"transaction_id": "t1"})["name"] == "Tea"
+
+
+def test_memory_fallback_serves_reads_but_refuses_writes(outage, monkeypatch, memory_db):
+    monkeypatch.setattr(Config, "DB_FALLBACK", "memory")
+    client = app_module.app.test_client()
+
+    assert client.post("/transactions/get-from-db", json={}).status_code == 200
+    assert using_fallback()
+    assert update_name(client, "Tea").status_code == 503
+    assert memory_db["transactions"].count_documents({}) == 0
+
+    outage.db = mongo = mongo_with_transaction()
+    assert get_database() is mongo
+    assert not using_fallback()
+    assert update_name(client, "Tea").status_code == 200
+    assert mongo["transactions"].find_one({"transaction_id": "t1"})["name"] == "Tea"
+
+
+def test_circuit_breaker_backs_off_exponentially_up_to_the_cap():
+    breaker = CircuitBreaker(base_seconds=1, max_seconds=5)
+    assert breaker.state == "closed"
+
+    cooldowns = [breaker.record_failure(RuntimeError("down")) for _ in range(4)]
+    assert cooldowns == [1, 2, 4, 5]
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    assert breaker.to_dict()["last_error"] == "down"
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+
+def test_circuit_breaker_lets_one_attempt_through_after_the_cooldown():
+    breaker = CircuitBreaker(base_seconds=0.01, max_seconds=0.01)
+    breaker.record_failure(RuntimeError("down"))
+    time.sleep(0.02)
+
+    assert breaker.state == "half_open"
+    assert breaker.allow()
@@ -0,0 +1,98 @@
+import json
+import pytest
+from plaid.exceptions import ApiException
+import plaid_request_layer
+from plaid_request_layer import PlaidRequestLayer
+
+
+def api_error(status, error_code=None, retry_after=None):
+    error = ApiException(status=status, reason="error")
+    error.body = json.dumps({"error_code": error_code}) if error_code else None
+    error.headers = {"Retry-After": retry_after} if retry_after is not None else {}
+    return error
+
+
+class FlakyCall:
+    """Raises the given errors in turn, then returns "ok"."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self, *args, **kwargs):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Records backoff delays instead of sleeping."""
+    delays = []
+    monkeypatch.setattr(plaid_request_layer.time, "sleep", delays.append)
+    return delays
+
+
+def make_layer(**kwargs):
+    options = {"rate": 1000, "burst": 1000, "max_retries": 3, "backoff_base": 0.5, "backoff_max": 10}
+    options.update(kwargs)
+    return PlaidRequestLayer(**options)
+
+
+def test_transient_errors_are_retried_with_exponential_backoff(sleeps):
+    layer = make_layer()
+    call = FlakyCall(api_error(500), api_error(400, "INSTITUTION_DOWN"), ConnectionError("reset"))
+
+    assert layer.call(call) == "ok"
+    assert call.calls == 4
+    # Full jitter: each delay is at most base * 2 ** attempt
+    assert all(0 <= delay <= 0.5 * 2 ** attempt for attempt, delay in enumerate(sleeps))
+    assert layer.stats()["retries"] == 3
+
+
+def test_retry_after_header_sets_the_delay_capped_at_backoff_max(sleeps):
+    layer = make_layer()
+    call = FlakyCall(api_error(429, "RATE_LIMIT_EXCEEDED", retry_after="2"), api_error(429, retry_after="60"))
+
+    assert layer.call(call) == "ok"
+    assert sleeps == [2.0, 10]
+    assert layer.stats()["rate_limited"] == 2
+
+
+def test_gives_up_after_max_retries(sleeps):
+    layer = make_layer(max_retries=2)
+    call = FlakyCall(*(api_error(503) for _ in range(5)))
+
+    with pytest.raises(ApiException):
+        layer.call(call)
+    assert call.calls == 3
+    assert layer.stats()["failures"] == 1
+
+
+def test_bad_requests_are_not_retried(sleeps):
+    call = FlakyCall(api_error(400, "INVALID_REQUEST"))
+
+    with pytest.raises(ApiException):
+        make_layer().call(call)
+    assert call.calls == 1
+    assert sleeps == []
+
+
+def test_non_idempotent_calls_are_only_retried_when_rate_limited(sleeps):
+    layer = make_layer()
+
+    with pytest.raises(ApiException):
+        layer.call(FlakyCall(api_error(500)), idempotent=False)
+    assert layer.call(FlakyCall(api_error(429)), idempotent=False) == "ok"
+
+
+def test_timeout_is_passed_to_the_sdk_call(sleeps):
+    received = {}
+
+    def func(**kwargs):
+        received.update(kwargs)
+        return "ok"
+
+    make_layer(timeout=(3, 30)).call(func)
+    assert received == {"_request_timeout": (3, 30)}
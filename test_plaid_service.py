@@ -0,0 +1,49 @@
+import app as app_module
+from plaid_service import PlaidService
+from transaction_loader import TransactionLoader
+
+
+class FakeSyncClient:
+    """Returns one /transactions/sync page per call and records the cursor it was given."""
+
+    def __init__(self):
+        self.cursors = []
+
+    def iter_sync_pages(self, access_token, cursor=None):
+        self.cursors.append(cursor)
+        yield {"added": [], "modified": [], "removed": [], "next_cursor": f"cursor-{len(self.cursors)}"}
+
+    def invalidate_token_validation(self, access_token=None):
+        pass
+
+
+def make_service():
+    service = PlaidService.__new__(PlaidService)
+    service.client = FakeSyncClient()
+    return service
+
+
+def test_sync_cursor_is_kept_on_the_account_document(memory_db):
+    memory_db["accounts"].insert_one({"id": "1", "token_id": "token-a"})
+    service = make_service()
+
+    assert service.sync_transactions("token-a", TransactionLoader())["success"]
+    assert service.sync_transactions("token-a", TransactionLoader())["success"]
+
+    assert service.client.cursors == [None, "cursor-1"]
+    assert memory_db["accounts"].count_documents({}) == 1
+    assert memory_db["accounts"].find_one({"id": "1"})["sync_cursor"] == "cursor-2"
+
+
+def test_new_access_token_starts_a_fresh_sync(memory_db, monkeypatch):
+    service = make_service()
+    monkeypatch.setattr(app_module, "_services", {"plaid": service})
+    monkeypatch.setattr(app_module, "access_token", None)
+    app_module.update_access_token("token-a")
+    service.sync_transactions("token-a", TransactionLoader())
+
+    app_module.update_access_token("token-b")
+    service.sync_transactions("token-b", TransactionLoader())
+
+    assert service.client.cursors == [None, None]
+    assert memory_db["accounts"].find_one({"id": "1"})["token_id"] == "token-b"
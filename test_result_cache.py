@@ -0,0 +1,42 @@
+from result_cache import ResultCache
+
+
+def test_bumping_the_generation_invalidates_cached_results():
+    cache = ResultCache(max_entries=10)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return len(calls)
+
+    assert cache.get_or_compute("spending", (), compute) == 1
+    assert cache.get_or_compute("spending", (), compute) == 1
+    cache.bump_generation()
+    assert cache.get_or_compute("spending", (), compute) == 2
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["invalidations"], stats["entries"]) == (1, 2, 1, 1)
+
+
+def test_result_computed_before_a_write_is_not_stored():
+    cache = ResultCache(max_entries=10)
+    hit, _, generation = cache.lookup("spending", ())
+    assert not hit
+
+    # A write lands while the result is being computed
+    cache.bump_generation()
+    cache.store("spending", (), generation, "stale")
+
+    assert cache.lookup("spending", ())[0] is False
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = ResultCache(max_entries=2)
+    for name in ("a", "b"):
+        cache.get_or_compute(name, (), lambda: name)
+    cache.lookup("a", ())
+    cache.get_or_compute("c", (), lambda: "c")
+
+    assert cache.lookup("a", ())[0] and not cache.lookup("b", ())[0]
+    assert cache.stats()["evictions"] == 1
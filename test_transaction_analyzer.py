@@ -0,0 +1,23 @@
+from datetime import datetime
+
+from transaction_analyzer import TransactionAnalyzer
+
+
+def merchant_row(name, total, count, **extra):
+    return {"_id": name, "total_amount": total, "transaction_count": count,
+            "first_transaction": datetime(2024, 3, 1), "last_transaction": datetime(2024, 3, 9), **extra}
+
+
+def averages(result):
+    summary = TransactionAnalyzer.summarize_merchants(result, None, "2024-03-01", "2024-03-31")
+    return [merchant["average_transaction"] for merchant in summary["top_merchants"]]
+
+
+def test_merchant_average_comes_from_avg_or_rollup_totals():
+    assert averages([merchant_row("Coffee", 10.0, 3, average_transaction=3.3333)]) == [3.33]
+    assert averages([merchant_row("Coffee", 10.0, 4)]) == [2.5]
+
+
+def test_merchant_average_without_counted_transactions_is_none():
+    assert averages([merchant_row("Coffee", 0.0, 0)]) == [None]
+    assert averages([merchant_row("Coffee", 0.0, 2, average_transaction=None)]) == [None]
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+from transaction_batch import MISSING_CODE, TransactionBatch
+
+PLAID_ROWS = [
+    {"transaction_id": "t1", "account_id": "checking", "amount": 4.5, "authorized_date": "2024-03-01",
+     "date": "2024-03-02", "category": ["Food and Drink", "Coffee Shop"], "name": "Coffee", "pending": False},
+    {"transaction_id": "t2", "account_id": "checking", "amount": 1200, "authorized_date": None,
+     "date": "2024-03-05", "category": ["Rent"], "name": "Landlord"},
+    {"transaction_id": "t3", "account_id": "savings", "amount": None, "date": None, "category": [], "name": None},
+]
+
+
+def test_from_plaid_to_documents_round_trip():
+    batch = TransactionBatch.from_plaid(PLAID_ROWS)
+
+    assert batch.to_documents() == [
+        {"transaction_id": "t1", "account_id": "checking", "amount": 4.5, "date": "2024-03-01",
+         "category": "Coffee Shop", "name": "Coffee"},
+        {"transaction_id": "t2", "account_id": "checking", "amount": 1200.0, "date": "2024-03-05",
+         "category": "Rent", "name": "Landlord"},
+        {"transaction_id": "t3", "account_id": "savings", "amount": None, "date": None,
+         "category": None, "name": None},
+    ]
+    assert batch.category_codes[2] == MISSING_CODE
+
+
+def test_documents_round_trip_is_stable():
+    documents = TransactionBatch.from_plaid(PLAID_ROWS).to_documents()
+
+    assert TransactionBatch.from_documents(documents).to_documents() == documents
+
+
+def test_select_and_concat_keep_shared_codes():
+    batch = TransactionBatch.from_plaid(PLAID_ROWS)
+    more = TransactionBatch.from_plaid([{"transaction_id": "t4", "account_id": "checking", "amount": 3.0,
+                                         "date": "2024-04-01", "category": ["Rent"], "name": "Landlord"}],
+                                       batch.dictionaries())
+
+    merged = TransactionBatch.concat([batch.select(np.array([True, False, True])), more])
+
+    assert [doc["transaction_id"] for doc in merged.to_documents()] == ["t1", "t3", "t4"]
+    assert merged.category_codes[2] == batch.category_codes[1]
+    with pytest.raises(ValueError):
+        TransactionBatch.concat([batch, TransactionBatch.from_plaid(PLAID_ROWS)])
+
+
+def test_date_mask_is_inclusive_and_skips_undated_rows():
+    batch = TransactionBatch.from_plaid(PLAID_ROWS)
+
+    assert batch.date_mask().tolist() == [True, True, False]
+    assert batch.date_mask("2024-03-01", "2024-03-01").tolist() == [True, False, False]
+    assert batch.date_mask(start_date="2024-03-02T00:00:00").tolist() == [False, True, False]
+
+
+def test_totals_by_category_ignores_missing_codes_and_amounts():
+    totals, counts = TransactionBatch.from_plaid(PLAID_ROWS).totals_by("category")
+
+    assert totals.tolist() == [4.5, 1200.0]
+    assert counts.tolist() == [1, 1]
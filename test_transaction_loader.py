@@ -0,0 +1,90 @@
+from transaction_loader import TransactionLoader
+
+CSV_HEADER = "Date,Description,Amount\n"
+
+
+def write_csv(path, rows):
+    path.write_text(CSV_HEADER + "".join(f"{row}\n" for row in rows))
+    return str(path)
+
+
+def stored_ids(db):
+    return sorted(doc["transaction_id"] for doc in db["transactions"].find({}))
+
+
+def test_identical_rows_get_distinct_ids(memory_db, tmp_path):
+    # Two adjacent "Coffee" rows and a third one further down the file
+    rows = ["2024-03-01,Coffee,4.50", "2024-03-01,Coffee,4.50", "2024-03-02,Rent,1200", "2024-03-01,Coffee,4.50"]
+    result = TransactionLoader().load_from_excel(write_csv(tmp_path / "export.csv", rows))
+
+    assert result["success"]
+    assert result["inserted"] == 4
+    assert memory_db["transactions"].count_documents({"name": "Coffee"}) == 3
+
+
+def test_reimport_matches_existing_documents(memory_db, tmp_path):
+    rows = ["2024-03-01,Coffee,4.50", "2024-03-02,Rent,1200", "2024-03-01,Coffee,4.50"]
+    loader = TransactionLoader()
+    loader.load_from_excel(write_csv(tmp_path / "first.csv", rows), source_name="export.csv")
+    first_ids = stored_ids(memory_db)
+
+    # Same export saved under another name, read in one-row chunks
+    result = loader.load_from_excel(write_csv(tmp_path / "second.csv", rows), chunk_size=1, source_name="export.csv")
+
+    assert result["inserted"] == 0
+    assert result["unchanged"] == 3
+    assert stored_ids(memory_db) == first_ids
+
+
+def test_changed_row_with_an_explicit_id_is_updated(memory_db, tmp_path):
+    loader = TransactionLoader()
+    path = tmp_path / "ids.csv"
+    path.write_text("Transaction ID,Date,Description,Amount\nabc,2024-03-01,Coffee,4.50\n")
+    loader.load_from_excel(str(path))
+    before = memory_db["transactions"].find_one({"transaction_id": "abc"})
+
+    path.write_text("Transaction ID,Date,Description,Amount\nabc,2024-03-01,Coffee,5.00\n")
+    result = loader.load_from_excel(str(path))
+
+    assert result["updated"] == 1
+    after = memory_db["transactions"].find_one({"transaction_id": "abc"})
+    assert after["amount"] == 5.0
+    assert after["content_hash"] != before["content_hash"]
+
+
+def test_unparseable_amounts_are_skipped(memory_db, tmp_path):
+    result = TransactionLoader().load_from_excel(write_csv(tmp_path / "export.csv", ["2024-03-01,Coffee,N/A", "2024-03-01,Tea,3"]))
+
+    assert result["skipped"] == 1
+    assert result["count"] == 1
+
+
+def test_import_summary_totals_spending_per_category(memory_db, tmp_path):
+    path = tmp_path / "export.csv"
+    path.write_text("Date,Description,Amount,Category\n2024-03-01,Coffee,4.50,Food\n2024-03-02,Rent,1200,Housing\n"
+                    "2024-03-03,Lunch,10.25,Food\n2024-03-04,Refund,-2,\n")
+
+    # One-row chunks, so totals are carried across chunks
+    result = TransactionLoader().load_from_excel(str(path), chunk_size=1)
+
+    assert result["categories"] == [
+        {"category": "Housing", "total_amount": 1200.0, "count": 1},
+        {"category": "Food", "total_amount": 14.75, "count": 2},
+    ]
+
+
+def test_unchanged_plaid_transactions_are_not_rewritten(memory_db):
+    rows = [{"transaction_id": "p1", "account_id": "acc", "name": "Coffee", "amount": 4.5,
+             "authorized_date": "2024-03-01", "pending": False},
+            {"transaction_id": "p2", "account_id": "acc", "name": "Pending", "amount": 1,
+             "authorized_date": "2024-03-01", "pending": True}]
+    loader = TransactionLoader()
+
+    first = loader.save_plaid_transactions(rows)
+    second = loader.save_plaid_transactions(rows)
+    rows[0]["amount"] = 5.0
+    third = loader.save_plaid_transactions(rows)
+
+    assert (first["inserted"], first["pending"]) == (1, 1)
+    assert (second["inserted"], second["updated"], second["unchanged"]) == (0, 0, 1)
+    assert third["updated"] == 1
@@ -1,17 +1,425 @@
 # transaction_analyzer.py
-import pandas as pd
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
+from config import Config
+from daily_rollups import ROLLUP_COLLECTION, DailyRollupStore
 from mongodb_client import get_database
+from result_cache import cached_analysis
+from transaction_model import Transaction
+
+
+# Field names per analytics source. A daily_rollups document already sums many transactions,
+# so its amount and count are summed instead of the raw amount and 1.
+TRANSACTION_SOURCE = {"collection": "transactions", "date": "date", "merchant": "$name", "amount": "$amount", "count": 1}
+ROLLUP_SOURCE = {"collection": ROLLUP_COLLECTION, "date": "day", "merchant": "$merchant", "amount": "$total_amount", "count": "$count"}
+
+MONTH_NAMES = ['January', 'February', 'March', 'April', 'May', 'June',
+               'July', 'August', 'September', 'October', 'November', 'December']
+
+
+def _use_pandas(rows):
+    """
+    Whether to post-process `rows` with pandas. Small results (the common case: a few dozen
+    categories or twelve months) skip the DataFrame, whose construction dominates the request.
+    Amounts that are not plain numbers (e.g. None, Decimal128) always take the pandas path.
+    """
+    if len(rows) > Config.ANALYZER_PANDAS_MIN_ROWS:
+        return True
+    return not all(isinstance(row["total_amount"], (int, float)) and not isinstance(row["total_amount"], bool)
+                   for row in rows)
+
+
+def _numeric_column(values):
+    """Upcasts a column to float when any value is a float, as a pandas column would."""
+    if any(isinstance(value, float) for value in values):
+        return [float(value) for value in values]
+    return values
+
+
+def _upcast_columns(records):
+    """Applies _numeric_column to every all-numeric column of `records`, in place."""
+    for key in records[0]:
+        values = [record.get(key) for record in records]
+        if all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in values):
+            for record, value in zip(records, _numeric_column(values)):
+                record[key] = value
 
 
 class TransactionAnalyzer:
-    """Analyzes transaction data and generates insights using MongoDB."""
+    """
+    Analyzes transaction data and generates insights using MongoDB.
+    Results are cached per arguments until the next write bumps the data generation (see result_cache).
+    With use_snapshot, the pipelines are answered from an in-process analytics_snapshot instead.
+    """
+
+    def __init__(self, use_rollups=None, use_snapshot=None):
+        # Answer from daily_rollups (default) or re-aggregate the transactions collection
+        self.use_rollups = Config.ANALYTICS_SOURCE == "rollups" if use_rollups is None else use_rollups
+        # Answer from the in-process columnar snapshot of the transactions collection
+        self.use_snapshot = Config.ANALYTICS_SNAPSHOT if use_snapshot is None else use_snapshot
+        self._rollups_checked_db = None
+
+    @property
+    def db(self):
+        """The current database (MongoDB or the in-memory fallback), resolved on every access."""
+        db = get_database()
+        if self.use_rollups and db is not None and db is not self._rollups_checked_db:
+            DailyRollupStore(db).ensure_built()
+            self._rollups_checked_db = db
+        return db
+
+    @property
+    def transactions_collection(self):
+        return self.db['transactions']
+
+    @property
+    def snapshot(self):
+        """The process-wide analytics snapshot, imported on first use so NumPy stays out of startup."""
+        from analytics_snapshot import analytics_snapshot
+        return analytics_snapshot
+
+    @property
+    def source(self):
+        return self.source_fields(self.use_rollups)
+
+    @property
+    def source_collection(self):
+        return self.db[self.source["collection"]]
+
+    @staticmethod
+    def source_fields(use_rollups):
+        return ROLLUP_SOURCE if use_rollups else TRANSACTION_SOURCE
+
+    @staticmethod
+    def _date_query(start_date=None, end_date=None, field="date"):
+        """
+        Builds an inclusive range filter on a BSON date field from YYYY-MM-DD strings.
+        Raises ValueError for an unparseable date, which would otherwise silently match nothing.
+        """
+        query = {}
+        if start_date or end_date:
+            date_query = {}
+            for operator, label, value in (("$gte", "start_date", start_date), ("$lte", "end_date", end_date)):
+                if value:
+                    parsed = Transaction.parse_date(value)
+                    if parsed is None:
+                        raise ValueError(f"{label} must be in YYYY-MM-DD format")
+                    date_query[operator] = parsed
+            query[field] = date_query
+        return query
+
+    # Pipeline builders, shared with index_manager so index coverage is checked against the real query shapes
+
+    @staticmethod
+    def category_pipeline(start_date=None, end_date=None, use_rollups=False):
+        """Aggregation pipeline behind spending_by_category."""
+        source = TransactionAnalyzer.source_fields(use_rollups)
+        return [
+            {"$match": TransactionAnalyzer._date_query(start_date, end_date, source["date"])},
+            {"$group": {
+                "_id": "$category",
+                "total_amount": {"$sum": source["amount"]},
+                "count": {"$sum": source["count"]}
+            }},
+            {"$sort": {"total_amount": -1}}
+        ]
+
+    @staticmethod
+    def monthly_pipeline(year=None, use_rollups=False):
+        """Aggregation pipeline behind monthly_spending_trend; a year becomes an index-friendly date range."""
+        source = TransactionAnalyzer.source_fields(use_rollups)
+        query = {"yyyymm": {"$ne": None}}
+        if year:
+            query[source["date"]] = {"$gte": datetime(int(year), 1, 1), "$lt": datetime(int(year) + 1, 1, 1)}
+
+        return [
+            {"$match": query},
+            {"$group": {
+                "_id": "$yyyymm",
+                "total_amount": {"$sum": source["amount"]},
+                "transaction_count": {"$sum": source["count"]}
+            }},
+            {"$sort": {"_id": 1}}
+        ]
+
+    @staticmethod
+    def merchant_pipeline(start_date=None, end_date=None, limit=10, use_rollups=False):
+        """Aggregation pipeline behind top_merchants. Rollups have no per-transaction amounts, so no $avg there."""
+        source = TransactionAnalyzer.source_fields(use_rollups)
+        group = {
+            "_id": source["merchant"],
+            "total_amount": {"$sum": source["amount"]},
+            "transaction_count": {"$sum": source["count"]},
+            "first_transaction": {"$min": f"${source['date']}"},
+            "last_transaction": {"$max": f"${source['date']}"}
+        }
+        if not use_rollups:
+            group["average_transaction"] = {"$avg": "$amount"}
+
+        return [
+            {"$match": TransactionAnalyzer._date_query(start_date, end_date, source["date"])},
+            {"$group": group},
+            {"$sort": {"total_amount": -1}},
+            {"$limit": limit}
+        ]
+
+    @staticmethod
+    def date_range_pipeline(start_date=None, end_date=None, use_rollups=False):
+        """Pipeline returning the earliest and latest transaction date, used when top_merchants has an open range."""
+        source = TransactionAnalyzer.source_fields(use_rollups)
+        return [
+            {"$match": TransactionAnalyzer._date_query(start_date, end_date, source["date"])},
+            {"$group": {
+                "_id": None,
+                "min_date": {"$min": f"${source['date']}"},
+                "max_date": {"$max": f"${source['date']}"}
+            }}
+        ]
+
+    @staticmethod
+    def dashboard_pipeline(start_date=None, end_date=None, year=None, limit=10, use_rollups=False):
+        """
+        Aggregation pipeline behind dashboard: one $match over the union of the requested date range
+        and year, then a $facet running the category, monthly, merchant and date range pipelines.
+        Each facet keeps its own $match, so it only sees the documents it would have seen on its own.
+        """
+        source = TransactionAnalyzer.source_fields(use_rollups)
+        range_query = TransactionAnalyzer._date_query(start_date, end_date, source["date"]).get(source["date"], {})
+        union = {}
+        if year:
+            year_start, next_year = datetime(int(year), 1, 1), datetime(int(year) + 1, 1, 1)
+            # Only bounded when both the range and the year are bounded on that side
+            if "$gte" in range_query:
+                union["$gte"] = min(range_query["$gte"], year_start)
+            if "$lte" in range_query:
+                union["$lt"] = max(range_query["$lte"] + timedelta(days=1), next_year)
+
+        return [
+            {"$match": {source["date"]: union} if union else {}},
+            {"$facet": {
+                "categories": TransactionAnalyzer.category_pipeline(start_date, end_date, use_rollups),
+                "monthly": TransactionAnalyzer.monthly_pipeline(year, use_rollups),
+                "merchants": TransactionAnalyzer.merchant_pipeline(start_date, end_date, limit, use_rollups),
+                "date_range": TransactionAnalyzer.date_range_pipeline(start_date, end_date, use_rollups),
+            }}
+        ]
+
+    # Result builders, shared with the async repository so both paths return identical responses
+
+    @staticmethod
+    def summarize_categories(result):
+        """Turns category_pipeline output into the spending_by_category response."""
+        if not result:
+            return {
+                "categories": [],
+                "summary": {
+                    "total_spending": 0,
+                    "category_count": 0,
+                    "top_category": None,
+                    "top_category_percentage": None
+                }
+            }
+
+        if _use_pandas(result):
+            return TransactionAnalyzer._categories_with_pandas(result)
+        return TransactionAnalyzer._categories_fast(result)
+
+    @staticmethod
+    def _categories_with_pandas(result):
+        """summarize_categories for large results."""
+        # Convert to DataFrame for easier processing
+        import pandas as pd
+        df = pd.DataFrame(result)
+        df.rename(columns={"_id": "category"}, inplace=True)
+
+        # Calculate percentages
+        total_spending = df['total_amount'].sum()
+        df['percentage'] = (df['total_amount'] / total_spending * 100).round(2)
+
+        # Convert to list of dictionaries for JSON response
+        categories = df.to_dict('records')
+
+        # Calculate summary statistics
+        summary = {
+            "total_spending": float(total_spending),
+            "category_count": len(categories),
+            "top_category": categories[0]['category'] if categories else None,
+            "top_category_percentage": float(categories[0]['percentage']) if categories else None
+        }
+
+        return {
+            "categories": categories,
+            "summary": summary
+        }
+
+    @staticmethod
+    def _categories_fast(result):
+        """summarize_categories without pandas; returns exactly what _categories_with_pandas does."""
+        import numpy as np
+        column = np.array(_numeric_column([item["total_amount"] for item in result]))
+        # Same array operations as the DataFrame path, so every float matches to the last bit
+        total_spending = column.sum()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            percentages = np.round(column / total_spending * 100, 2).tolist()
+
+        categories = []
+        for item, percentage in zip(result, percentages):
+            record = {("category" if key == "_id" else key): value for key, value in item.items()}
+            record["percentage"] = percentage
+            categories.append(record)
+        _upcast_columns(categories)
+
+        summary = {
+            "total_spending": float(total_spending),
+            "category_count": len(categories),
+            "top_category": categories[0]['category'],
+            "top_category_percentage": float(categories[0]['percentage'])
+        }
+
+        return {
+            "categories": categories,
+            "summary": summary
+        }
+
+    @staticmethod
+    def summarize_monthly(result):
+        """Turns monthly_pipeline output into the monthly_spending_trend response."""
+        # Convert to more usable format
+        monthly_data = []
+        for item in result:
+            monthly_data.append({
+                "year": str(item["_id"] // 100),
+                "month": item["_id"] % 100,
+                "total_amount": item["total_amount"],
+                "transaction_count": item["transaction_count"]
+            })
 
-    def __init__(self):
-        self.db = get_database()
-        self.transactions_collection = self.db['transactions']
+        if not monthly_data:
+            return {
+                "monthly_data": [],
+                "summary": {
+                    "average_monthly_spending": 0,
+                    "highest_spending_month": None,
+                    "lowest_spending_month": None,
+                    "total_annual_spending": 0
+                }
+            }
+
+        if _use_pandas(monthly_data):
+            return TransactionAnalyzer._monthly_with_pandas(monthly_data)
+        return TransactionAnalyzer._monthly_fast(monthly_data)
+
+    @staticmethod
+    def _monthly_with_pandas(monthly_data):
+        """summarize_monthly for large results; `monthly_data` holds year/month/total_amount/transaction_count rows."""
+        # Convert to DataFrame for easier processing
+        import pandas as pd
+        df = pd.DataFrame(monthly_data)
+
+        # Add month name
+        df['month_name'] = df['month'].apply(lambda x: MONTH_NAMES[int(x)-1])
+
+        # Calculate month-over-month change
+        df = df.sort_values(by=['year', 'month'])
+        df['previous_month'] = df['total_amount'].shift(1)
+        df['mom_change'] = ((df['total_amount'] - df['previous_month']) /
+                            df['previous_month'] * 100).round(2)
+
+        # Convert to list of dictionaries for JSON response
+        monthly_data = df.fillna(0).to_dict('records')
+
+        # Calculate summary statistics
+        summary = {
+            "average_monthly_spending": float(df['total_amount'].mean()),
+            "highest_spending_month": df.loc[df['total_amount'].idxmax()]['month_name'],
+            "lowest_spending_month": df.loc[df['total_amount'].idxmin()]['month_name'],
+            "total_annual_spending": float(df['total_amount'].sum())
+        }
+
+        return {
+            "monthly_data": monthly_data,
+            "summary": summary
+        }
+
+    @staticmethod
+    def _monthly_fast(monthly_data):
+        """summarize_monthly without pandas; returns exactly what _monthly_with_pandas does."""
+        import numpy as np
+        monthly_data = sorted(monthly_data, key=lambda item: (item["year"], item["month"]))
+        column = np.array(_numeric_column([item["total_amount"] for item in monthly_data]))
+        # shift(1): NaN for the first month, then fillna(0) turns it (and 0/0) into 0.0
+        previous = np.concatenate(([np.nan], column[:-1]))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            changes = np.round((column - previous) / previous * 100, 2)
+
+        previous_months = np.nan_to_num(previous, nan=0.0, posinf=np.inf, neginf=-np.inf).tolist()
+        changes = np.nan_to_num(changes, nan=0.0, posinf=np.inf, neginf=-np.inf).tolist()
 
+        records = []
+        for item, previous_month, change in zip(monthly_data, previous_months, changes):
+            records.append(dict(item, month_name=MONTH_NAMES[int(item["month"]) - 1],
+                                previous_month=previous_month, mom_change=change))
+        _upcast_columns(records)
+
+        summary = {
+            "average_monthly_spending": float(column.sum(dtype=np.float64) / len(records)),
+            "highest_spending_month": records[int(np.argmax(column))]['month_name'],
+            "lowest_spending_month": records[int(np.argmin(column))]['month_name'],
+            "total_annual_spending": float(column.sum())
+        }
+
+        return {
+            "monthly_data": records,
+            "summary": summary
+        }
+
+    @staticmethod
+    def summarize_merchants(result, date_result=None, start_date=None, end_date=None):
+        """Turns merchant_pipeline (and date_range_pipeline) output into the top_merchants response."""
+        # Format result
+        merchants = []
+        for item in result:
+            # Rollup results carry no $avg; every rolled-up transaction is counted in the total.
+            # $avg is null when no amount is numeric, and a merchant may have no counted transactions
+            average = item.get("average_transaction")
+            if "average_transaction" not in item and item["transaction_count"]:
+                average = item["total_amount"] / item["transaction_count"]
+            merchants.append({
+                "merchant_name": item["_id"],
+                "total_amount": item["total_amount"],
+                "transaction_count": item["transaction_count"],
+                "average_transaction": round(average, 2) if average is not None else None,
+                "first_transaction": Transaction.format_date(item["first_transaction"]),
+                "last_transaction": Transaction.format_date(item["last_transaction"])
+            })
+
+        # Fill the open ends of the range from the database
+        date_range = {"start": start_date, "end": end_date}
+        if date_result:
+            if not start_date:
+                date_range["start"] = Transaction.format_date(date_result[0]["min_date"])
+            if not end_date:
+                date_range["end"] = Transaction.format_date(date_result[0]["max_date"])
+
+        return {
+            "top_merchants": merchants,
+            "total_count": len(merchants),
+            "date_range": date_range
+        }
+
+    @staticmethod
+    def summarize_dashboard(result, start_date=None, end_date=None):
+        """Turns dashboard_pipeline output into the three report responses."""
+        facets = result[0] if result else {}
+        return {
+            "spending_by_category": TransactionAnalyzer.summarize_categories(facets.get("categories", [])),
+            "monthly_trend": TransactionAnalyzer.summarize_monthly(facets.get("monthly", [])),
+            "top_merchants": TransactionAnalyzer.summarize_merchants(
+                facets.get("merchants", []), facets.get("date_range"), start_date, end_date
+            ),
+        }
+
+    @cached_analysis
     def spending_by_category(self, start_date=None, end_date=None):
         """
         Analyze spending by category.
@@ -24,69 +432,20 @@ class TransactionAnalyzer:
             dict: Category spending data and statistics
         """
         try:
-            # Build the query with optional date filtering
-            query = {}
-
-            if start_date or end_date:
-                date_query = {}
-                if start_date:
-                    date_query["$gte"] = start_date
-                if end_date:
-                    date_query["$lte"] = end_date
-                query["date"] = date_query
+            if self.use_snapshot:
+                return self.summarize_categories(self.snapshot.category_result(self.db, start_date, end_date))
 
-            # MongoDB aggregation pipeline
-            pipeline = [
-                {"$match": query},
-                {"$group": {
-                    "_id": "$category",
-                    "total_amount": {"$sum": "$amount"},
-                    "count": {"$sum": 1}
-                }},
-                {"$sort": {"total_amount": -1}}
-            ]
+            # MongoDB aggregation pipeline with optional date filtering
+            pipeline = self.category_pipeline(start_date, end_date, self.use_rollups)
 
             # Execute the aggregation
-            result = list(self.transactions_collection.aggregate(pipeline))
-
-            # Convert to DataFrame for easier processing
-            if result:
-                df = pd.DataFrame(result)
-                df.rename(columns={"_id": "category"}, inplace=True)
-
-                # Calculate percentages
-                total_spending = df['total_amount'].sum()
-                df['percentage'] = (df['total_amount'] / total_spending * 100).round(2)
-
-                # Convert to list of dictionaries for JSON response
-                categories = df.to_dict('records')
-
-                # Calculate summary statistics
-                summary = {
-                    "total_spending": float(total_spending),
-                    "category_count": len(categories),
-                    "top_category": categories[0]['category'] if categories else None,
-                    "top_category_percentage": float(categories[0]['percentage']) if categories else None
-                }
-
-                return {
-                    "categories": categories,
-                    "summary": summary
-                }
-            else:
-                return {
-                    "categories": [],
-                    "summary": {
-                        "total_spending": 0,
-                        "category_count": 0,
-                        "top_category": None,
-                        "top_category_percentage": None
-                    }
-                }
+            result = list(self.source_collection.aggregate(pipeline))
+            return self.summarize_categories(result)
         except Exception as e:
             logging.error(f"❌ Error analyzing spending by category: {str(e)}")
             raise
 
+    @cached_analysis
     def monthly_spending_trend(self, year=None):
         """
         Analyze monthly spending trends.
@@ -98,89 +457,20 @@ class TransactionAnalyzer:
             dict: Monthly spending data and statistics
         """
         try:
-            # Build the query with optional year filtering
-            query = {}
-            if year:
-                # Add regex filter for year
-                query["date"] = {"$regex": f"^{year}"}
-
-            # MongoDB aggregation pipeline to extract year and month
-            pipeline = [
-                {"$match": query},
-                {"$addFields": {
-                    "year": {"$substr": ["$date", 0, 4]},
-                    "month": {"$substr": ["$date", 5, 2]}
-                }},
-                {"$group": {
-                    "_id": {
-                        "year": "$year",
-                        "month": "$month"
-                    },
-                    "total_amount": {"$sum": "$amount"},
-                    "transaction_count": {"$sum": 1}
-                }},
-                {"$sort": {"_id.year": 1, "_id.month": 1}}
-            ]
+            if self.use_snapshot:
+                return self.summarize_monthly(self.snapshot.monthly_result(self.db, year))
 
-            # Execute the aggregation
-            result = list(self.transactions_collection.aggregate(pipeline))
-
-            # Convert to more usable format
-            monthly_data = []
-            for item in result:
-                monthly_data.append({
-                    "year": item["_id"]["year"],
-                    "month": int(item["_id"]["month"]),
-                    "total_amount": item["total_amount"],
-                    "transaction_count": item["transaction_count"]
-                })
-
-            # Convert to DataFrame for easier processing
-            if monthly_data:
-                df = pd.DataFrame(monthly_data)
-
-                # Create month names
-                month_names = ['January', 'February', 'March', 'April', 'May', 'June',
-                               'July', 'August', 'September', 'October', 'November', 'December']
-
-                # Add month name
-                df['month_name'] = df['month'].apply(lambda x: month_names[int(x)-1])
-
-                # Calculate month-over-month change
-                df = df.sort_values(by=['year', 'month'])
-                df['previous_month'] = df['total_amount'].shift(1)
-                df['mom_change'] = ((df['total_amount'] - df['previous_month']) /
-                                    df['previous_month'] * 100).round(2)
-
-                # Convert to list of dictionaries for JSON response
-                monthly_data = df.fillna(0).to_dict('records')
-
-                # Calculate summary statistics
-                summary = {
-                    "average_monthly_spending": float(df['total_amount'].mean()),
-                    "highest_spending_month": df.loc[df['total_amount'].idxmax()]['month_name'],
-                    "lowest_spending_month": df.loc[df['total_amount'].idxmin()]['month_name'],
-                    "total_annual_spending": float(df['total_amount'].sum())
-                }
+            # MongoDB aggregation pipeline grouping on the stored YYYYMM month key
+            pipeline = self.monthly_pipeline(year, self.use_rollups)
 
-                return {
-                    "monthly_data": monthly_data,
-                    "summary": summary
-                }
-            else:
-                return {
-                    "monthly_data": [],
-                    "summary": {
-                        "average_monthly_spending": 0,
-                        "highest_spending_month": None,
-                        "lowest_spending_month": None,
-                        "total_annual_spending": 0
-                    }
-                }
+            # Execute the aggregation
+            result = list(self.source_collection.aggregate(pipeline))
+            return self.summarize_monthly(result)
         except Exception as e:
             logging.error(f"❌ Error analyzing monthly trends: {str(e)}")
             raise
 
+    @cached_analysis
     def top_merchants(self, limit=10, start_date=None, end_date=None):
         """
         Get top merchants by spending amount.
@@ -194,72 +484,55 @@ class TransactionAnalyzer:
             dict: Top merchants data
         """
         try:
-            # Build the query with optional date filtering
-            query = {}
-
-            if start_date or end_date:
-                date_query = {}
-                if start_date:
-                    date_query["$gte"] = start_date
-                if end_date:
-                    date_query["$lte"] = end_date
-                query["date"] = date_query
+            if self.use_snapshot:
+                db = self.db
+                result = self.snapshot.merchant_result(db, start_date, end_date, limit)
+                date_result = None
+                if not start_date or not end_date:
+                    date_result = self.snapshot.date_range_result(db, start_date, end_date)
+                return self.summarize_merchants(result, date_result, start_date, end_date)
 
             # MongoDB aggregation pipeline
-            pipeline = [
-                {"$match": query},
-                {"$group": {
-                    "_id": "$name",
-                    "total_amount": {"$sum": "$amount"},
-                    "transaction_count": {"$sum": 1},
-                    "average_transaction": {"$avg": "$amount"},
-                    "first_transaction": {"$min": "$date"},
-                    "last_transaction": {"$max": "$date"}
-                }},
-                {"$sort": {"total_amount": -1}},
-                {"$limit": limit}
-            ]
+            pipeline = self.merchant_pipeline(start_date, end_date, limit, self.use_rollups)
 
             # Execute the aggregation
-            result = list(self.transactions_collection.aggregate(pipeline))
-
-            # Format result
-            merchants = []
-            for item in result:
-                merchants.append({
-                    "merchant_name": item["_id"],
-                    "total_amount": item["total_amount"],
-                    "transaction_count": item["transaction_count"],
-                    "average_transaction": round(item["average_transaction"], 2),
-                    "first_transaction": item["first_transaction"],
-                    "last_transaction": item["last_transaction"]
-                })
-
-            # Get overall date range from the database
-            date_range = {"start": start_date, "end": end_date}
+            collection = self.source_collection
+            result = list(collection.aggregate(pipeline))
+
+            # Only query for the missing dates
+            date_result = None
             if not start_date or not end_date:
-                # Only query for the missing dates
-                date_pipeline = [
-                    {"$match": query},
-                    {"$group": {
-                        "_id": None,
-                        "min_date": {"$min": "$date"},
-                        "max_date": {"$max": "$date"}
-                    }}
-                ]
-                date_result = list(self.transactions_collection.aggregate(date_pipeline))
-
-                if date_result:
-                    if not start_date:
-                        date_range["start"] = date_result[0]["min_date"]
-                    if not end_date:
-                        date_range["end"] = date_result[0]["max_date"]
+                date_result = list(collection.aggregate(
+                    self.date_range_pipeline(start_date, end_date, self.use_rollups)
+                ))
 
-            return {
-                "top_merchants": merchants,
-                "total_count": len(merchants),
-                "date_range": date_range
-            }
+            return self.summarize_merchants(result, date_result, start_date, end_date)
         except Exception as e:
             logging.error(f"❌ Error analyzing top merchants: {str(e)}")
             raise
+
+    @cached_analysis
+    def dashboard(self, start_date=None, end_date=None, year=None, limit=10):
+        """
+        Computes spending by category, the monthly trend and top merchants in one aggregation.
+
+        Args:
+            start_date (str, optional): Range start for categories and merchants (YYYY-MM-DD)
+            end_date (str, optional): Range end for categories and merchants (YYYY-MM-DD)
+            year (str, optional): Year of the monthly trend (YYYY)
+            limit (int): Number of merchants to return
+
+        Returns:
+            dict: spending_by_category, monthly_trend and top_merchants, shaped like the individual reports
+        """
+        try:
+            if self.use_snapshot:
+                result = self.snapshot.dashboard_result(self.db, start_date, end_date, year, limit)
+                return self.summarize_dashboard(result, start_date, end_date)
+
+            pipeline = self.dashboard_pipeline(start_date, end_date, year, limit, self.use_rollups)
+            result = list(self.source_collection.aggregate(pipeline))
+            return self.summarize_dashboard(result, start_date, end_date)
+        except Exception as e:
+            logging.error(f"❌ Error building analysis dashboard: {str(e)}")
+            raise
@@ -0,0 +1,256 @@
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional
+import numpy as np
+from transaction_model import Transaction
+
+# Code stored for a missing category or merchant
+MISSING_CODE = -1
+
+
+def _date_key(value):
+    """Returns a value numpy can cast to datetime64[D]: dates as-is, ISO strings trimmed to YYYY-MM-DD."""
+    if isinstance(value, str):
+        return value[:10] or None
+    if isinstance(value, (date, datetime)):
+        return value
+    return None
+
+
+class StringDictionary:
+    """Interns strings to small integer codes so categorical columns can be stored as int32 arrays."""
+
+    def __init__(self, labels: Iterable[str] = ()):
+        self.labels: List[str] = []
+        self._codes: Dict[str, int] = {}
+        for label in labels:
+            self.code(label)
+
+    def code(self, label: Optional[str]) -> int:
+        """Returns the code for `label`, adding it to the dictionary if needed."""
+        if label is None:
+            return MISSING_CODE
+        code = self._codes.get(label)
+        if code is None:
+            code = len(self.labels)
+            self._codes[label] = code
+            self.labels.append(label)
+        return code
+
+    def encode(self, values: Iterable[Optional[str]]) -> np.ndarray:
+        """Returns an int32 array of codes for `values`."""
+        return np.fromiter((self.code(value) for value in values), dtype=np.int32)
+
+    def decode(self, code: int) -> Optional[str]:
+        """Returns the label for `code`, or None for MISSING_CODE."""
+        return None if code == MISSING_CODE else self.labels[code]
+
+    def __len__(self):
+        return len(self.labels)
+
+
+class TransactionBatch:
+    """
+    Columnar representation of many transactions, held as parallel NumPy arrays.
+
+    Only the columns used for analysis are kept. The merchant column holds the transaction
+    `name`, which is what the analyzer groups merchants by. Categories, merchants and account ids
+    are interned through StringDictionary objects, which can be shared between batches so codes stay comparable.
+    """
+
+    def __init__(self, transaction_ids, account_codes, amounts, dates, category_codes, merchant_codes,
+                 accounts: StringDictionary, categories: StringDictionary, merchants: StringDictionary):
+        self.transaction_ids = np.asarray(transaction_ids, dtype=object)
+        self.account_codes = np.asarray(account_codes, dtype=np.int32)
+        self.amounts = np.asarray(amounts, dtype=np.float64)
+        self.dates = np.asarray(dates, dtype="datetime64[D]")
+        self.category_codes = np.asarray(category_codes, dtype=np.int32)
+        self.merchant_codes = np.asarray(merchant_codes, dtype=np.int32)
+        self.accounts = accounts
+        self.categories = categories
+        self.merchants = merchants
+
+    @classmethod
+    def _from_columns(cls, transaction_ids, account_ids, amounts, dates, categories, merchants,
+                      dictionaries=None):
+        accounts_dict, categories_dict, merchants_dict = dictionaries or (
+            StringDictionary(), StringDictionary(), StringDictionary()
+        )
+        return cls(
+            transaction_ids=transaction_ids,
+            account_codes=accounts_dict.encode(account_ids),
+            amounts=np.array([np.nan if amount is None else amount for amount in amounts], dtype=np.float64),
+            dates=np.array([_date_key(value) for value in dates], dtype="datetime64[D]"),
+            category_codes=categories_dict.encode(categories),
+            merchant_codes=merchants_dict.encode(merchants),
+            accounts=accounts_dict,
+            categories=categories_dict,
+            merchants=merchants_dict,
+        )
+
+    @classmethod
+    def empty(cls, dictionaries=None) -> "TransactionBatch":
+        """Returns a batch with no rows."""
+        return cls._from_columns([], [], [], [], [], [], dictionaries)
+
+    @classmethod
+    def from_plaid(cls, rows: List[Dict[str, Any]], dictionaries=None) -> "TransactionBatch":
+        """
+        Builds a batch from Plaid transaction dicts.
+        Uses `authorized_date` like Transaction does, falling back to the posted `date`.
+        Plaid's category list is flattened to its most specific entry.
+        """
+        def category(row):
+            value = row.get("category")
+            if isinstance(value, list):
+                return value[-1] if value else None
+            return value
+
+        return cls._from_columns(
+            [row.get("transaction_id") for row in rows],
+            [row.get("account_id") for row in rows],
+            [row.get("amount") for row in rows],
+            [row.get("authorized_date") or row.get("date") for row in rows],
+            [category(row) for row in rows],
+            [row.get("name") for row in rows],
+            dictionaries,
+        )
+
+    @classmethod
+    def from_documents(cls, documents: List[Dict[str, Any]], dictionaries=None) -> "TransactionBatch":
+        """Builds a batch from documents stored in the `transactions` collection."""
+        return cls._from_columns(
+            [doc.get("transaction_id") for doc in documents],
+            [doc.get("account_id") for doc in documents],
+            [doc.get("amount") for doc in documents],
+            [doc.get("date") for doc in documents],
+            [doc.get("category") for doc in documents],
+            [doc.get("name") for doc in documents],
+            dictionaries,
+        )
+
+    @classmethod
+    def from_transactions(cls, transactions: List[Transaction], dictionaries=None) -> "TransactionBatch":
+        """Builds a batch from Transaction objects."""
+        return cls._from_columns(
+            [txn.transaction_id for txn in transactions],
+            [txn.account_id for txn in transactions],
+            [txn.amount for txn in transactions],
+            [txn.date for txn in transactions],
+            [txn.category for txn in transactions],
+            [txn.name for txn in transactions],
+            dictionaries,
+        )
+
+    def dictionaries(self):
+        """Returns the (accounts, categories, merchants) dictionaries, for building compatible batches."""
+        return self.accounts, self.categories, self.merchants
+
+    def _rows(self):
+        """Yields one decoded tuple per row."""
+        for index in range(len(self)):
+            amount = self.amounts[index]
+            day = self.dates[index]
+            yield (
+                self.transaction_ids[index],
+                self.accounts.decode(int(self.account_codes[index])),
+                None if np.isnan(amount) else float(amount),
+                None if np.isnat(day) else str(day),
+                self.categories.decode(int(self.category_codes[index])),
+                self.merchants.decode(int(self.merchant_codes[index])),
+            )
+
+    def to_plaid(self) -> List[Dict[str, Any]]:
+        """Returns minimal Plaid-shaped transaction dicts for the columns held in the batch."""
+        return [
+            {
+                "transaction_id": transaction_id,
+                "account_id": account_id,
+                "amount": amount,
+                "authorized_date": day,
+                "date": day,
+                "category": [category] if category is not None else None,
+                "name": name,
+            }
+            for transaction_id, account_id, amount, day, category, name in self._rows()
+        ]
+
+    def to_documents(self) -> List[Dict[str, Any]]:
+        """Returns dicts shaped like the analysis fields of `transactions` documents."""
+        return [
+            {
+                "transaction_id": transaction_id,
+                "account_id": account_id,
+                "amount": amount,
+                "date": day,
+                "category": category,
+                "name": name,
+            }
+            for transaction_id, account_id, amount, day, category, name in self._rows()
+        ]
+
+    def to_transactions(self) -> List[Transaction]:
+        """Returns Transaction objects for the rows in the batch."""
+        transactions = []
+        for transaction_id, account_id, amount, day, category, name in self._rows():
+            transaction = Transaction({
+                "transaction_id": transaction_id,
+                "account_id": account_id,
+                "name": name,
+                "amount": amount,
+                "authorized_date": day,
+            })
+            transaction.category = category
+            transactions.append(transaction)
+        return transactions
+
+    def __len__(self):
+        return len(self.transaction_ids)
+
+    def select(self, mask) -> "TransactionBatch":
+        """Returns a new batch with the rows selected by a boolean mask or index array."""
+        return TransactionBatch(
+            self.transaction_ids[mask], self.account_codes[mask], self.amounts[mask], self.dates[mask],
+            self.category_codes[mask], self.merchant_codes[mask], self.accounts, self.categories, self.merchants,
+        )
+
+    def date_mask(self, start_date=None, end_date=None) -> np.ndarray:
+        """Returns a boolean mask of rows dated within [start_date, end_date] (YYYY-MM-DD, inclusive)."""
+        mask = ~np.isnat(self.dates)
+        if start_date:
+            mask &= self.dates >= np.datetime64(_date_key(start_date), "D")
+        if end_date:
+            mask &= self.dates <= np.datetime64(_date_key(end_date), "D")
+        return mask
+
+    def totals_by(self, column: str):
+        """
+        Sums amounts and counts rows per code of a categorical column ("category", "merchant" or "account").
+        Rows with a missing code or amount are ignored.
+
+        Returns:
+            tuple: (totals, counts) float64/int64 arrays indexed by code
+        """
+        codes = getattr(self, f"{column}_codes")
+        dictionary = {"category": self.categories, "merchant": self.merchants, "account": self.accounts}[column]
+        valid = (codes != MISSING_CODE) & ~np.isnan(self.amounts)
+        size = len(dictionary)
+        totals = np.bincount(codes[valid], weights=self.amounts[valid], minlength=size)
+        counts = np.bincount(codes[valid], minlength=size)
+        return totals, counts
+
+    @staticmethod
+    def concat(batches: List["TransactionBatch"]) -> "TransactionBatch":
+        """Concatenates batches that share the same dictionaries."""
+        first = batches[0]
+        for batch in batches[1:]:
+            if batch.dictionaries() != first.dictionaries():
+                raise ValueError("Batches must share dictionaries to be concatenated")
+        return TransactionBatch(
+            np.concatenate([batch.transaction_ids for batch in batches]),
+            np.concatenate([batch.account_codes for batch in batches]),
+            np.concatenate([batch.amounts for batch in batches]),
+            np.concatenate([batch.dates for batch in batches]),
+            np.concatenate([batch.category_codes for batch in batches]),
+            np.concatenate([batch.merchant_codes for batch in batches]),
+            first.accounts, first.categories, first.merchants,
+        )
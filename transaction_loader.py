@@ -1,24 +1,317 @@
 import json
-import pandas as pd
+import hashlib
+import math
+import os
+import time
 import logging
 import uuid
-from datetime import datetime
-from mongodb_client import get_database
+from collections import Counter
+from datetime import datetime, date
+import numpy as np
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from config import Config
+from daily_rollups import ROLLUP_SOURCE_FIELDS, DailyRollupStore, rollup_write_lock
+from index_manager import ensure_indexes
+from mongodb_client import get_database, using_fallback
+from result_cache import bump_generation
+from raw_payload_store import PAYLOAD_COLLECTION, RawPayloadStore
+from transaction_batch import StringDictionary, TransactionBatch
 from transaction_model import Transaction
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
+# Maps lower-cased bank export column headers to the fields used to build a Transaction
+FILE_COLUMN_MAP = {
+    "transaction_id": "transaction_id",
+    "transaction id": "transaction_id",
+    "reference": "transaction_id",
+    "account_id": "account_id",
+    "account id": "account_id",
+    "account": "account_id",
+    "date": "date",
+    "transaction date": "date",
+    "trans. date": "date",
+    "posting date": "date",
+    "posted date": "date",
+    "authorized_date": "date",
+    "name": "name",
+    "description": "name",
+    "payee": "name",
+    "details": "name",
+    "merchant": "merchant_name",
+    "merchant_name": "merchant_name",
+    "amount": "amount",
+    "transaction amount": "amount",
+    "debit": "debit",
+    "withdrawal": "debit",
+    "withdrawals": "debit",
+    "credit": "credit",
+    "deposit": "credit",
+    "deposits": "credit",
+    "category": "category",
+    "currency": "currency",
+    "iso_currency_code": "currency",
+}
+
+# Number of preview rows returned to the upload form
+FILE_PREVIEW_ROWS = 5
+
+
+def _add_totals(running, chunk):
+    """Adds per-code totals of one chunk to the running ones; the shared dictionary only grows, so `chunk` is never shorter."""
+    chunk = chunk.astype(running.dtype)
+    chunk[:len(running)] += running
+    return chunk
+
+
+class UpsertPlan:
+    """
+    The write rules for one batch of transactions, shared by TransactionLoader and the Motor driver
+    of AsyncTransactionRepository, which only differ in how they make the database calls:
+    1. Build the plan from the stored documents of the batch (read with ROLLUP_SOURCE_FIELDS), or from
+       None if that lookup failed. Transactions whose content_hash is unchanged are left out of `changed`
+    2. bulk_write the payload operations of `changed`, then record_payload_write()
+    3. bulk_write transaction_operations(), then record_transaction_write()
+    4. Apply rollup_changes() to daily_rollups
+    Counts and errors accumulate in `counts`.
+    """
+
+    def __init__(self, offset, batch, existing):
+        self.offset = offset
+        self.existing = existing
+        self.changed = [
+            txn for txn in batch
+            if existing is None or existing.get(txn.transaction_id, {}).get("content_hash") != txn.content_hash
+        ]
+        self.documents = []
+        # Positions in `documents` of the upserts that were not applied; their rollups must not change
+        self.failed_positions = set()
+        self.counts = {"inserted": 0, "updated": 0, "unchanged": len(batch) - len(self.changed), "errors": []}
+
+    def _report(self, failed, error):
+        self.counts["errors"].append({
+            "batch_offset": self.offset,
+            "batch_size": len(self.changed),
+            "failed": failed,
+            "error": error
+        })
+
+    def record_payload_write(self, error=None):
+        """
+        Records the outcome of the payload bulk_write, given the exception it raised if any.
+        Payloads go first: transactions whose payload was not stored are dropped from `changed`, so they
+        keep their old content_hash and the next load retries both. No document ends up without its payload.
+        """
+        if error is None:
+            return
+        if isinstance(error, BulkWriteError):
+            write_errors = (error.details or {}).get("writeErrors", [])
+            message = write_errors[0].get("errmsg") if write_errors else str(error)
+            failed_ids = RawPayloadStore.failed_ids(self.changed, write_errors)
+        else:
+            message, failed_ids = str(error), RawPayloadStore.failed_ids(self.changed)
+
+        logging.error(f"❌ Raw payload write for batch at offset {self.offset} failed: {message}")
+        self._report(len(failed_ids), f"Raw payload write failed: {message}")
+        self.changed = [txn for txn in self.changed if txn.transaction_id not in failed_ids]
+
+    def transaction_operations(self):
+        """Returns the transaction upserts of `changed`."""
+        self.documents = [txn.to_dict() for txn in self.changed]
+        return TransactionLoader.upsert_operations(self.documents)
+
+    def record_transaction_write(self, result=None, error=None):
+        """Records the result of the transaction bulk_write, or the exception it raised."""
+        if error is None:
+            self.counts["inserted"] += result.upserted_count
+            self.counts["updated"] += result.modified_count
+        elif isinstance(error, BulkWriteError):
+            # Unordered writes still apply every operation that did not fail
+            details = error.details or {}
+            write_errors = details.get("writeErrors", [])
+            self.counts["inserted"] += details.get("nUpserted", 0)
+            self.counts["updated"] += details.get("nModified", 0)
+            self.failed_positions = {write_error.get("index") for write_error in write_errors}
+            logging.error(f"❌ Bulk write batch at offset {self.offset} had {len(write_errors)} failed operations")
+            self._report(len(write_errors), write_errors[0].get("errmsg") if write_errors else str(error))
+        else:
+            # Part of the batch may still have been written, but which part is unknown
+            self.failed_positions = set(range(len(self.documents)))
+            logging.error(f"❌ Bulk write batch at offset {self.offset} failed: {str(error)}")
+            self._report(len(self.documents), str(error))
+
+    def rollup_changes(self):
+        """
+        Returns (removed, added): the stored and the new rollup source documents of every written
+        transaction, or None when nothing was written or the stored values are unknown.
+        """
+        if len(self.failed_positions) == len(self.documents):
+            return None
+        if self.existing is None:
+            logging.warning(
+                f"⚠️ Daily rollups not updated for batch at offset {self.offset} since the previous values are unknown, "
+                f"run `python migrations.py rebuild-rollups`"
+            )
+            return None
+
+        # A transaction_id repeated within the batch is only stored once
+        written = list({
+            document["transaction_id"]: document
+            for position, document in enumerate(self.documents) if position not in self.failed_positions
+        }.values())
+        return [self.existing[doc["transaction_id"]] for doc in written if doc["transaction_id"] in self.existing], written
+
 
 class TransactionLoader:
     """Loads transactions into MongoDB from Plaid or Excel."""
 
-    def __init__(self):
-        self.db = get_database()
-        self.transactions_collection = self.db['transactions']
+    def __init__(self, batch_size=None):
+        # Number of upserts sent to MongoDB in a single bulk_write call
+        self.batch_size = batch_size or Config.LOADER_BATCH_SIZE
+        self._payloads = None
+        self._indexed_db = None
+
+    @property
+    def db(self):
+        """
+        The current database, resolved on every access so the loader follows a switch between
+        MongoDB and the in-memory fallback. Registry indexes and daily rollups are ensured once per database.
+        """
+        db = get_database()
+        if db is not None and db is not self._indexed_db:
+            # Create the unique transaction_id index and the query-shaped analysis indexes
+            ensure_indexes(db)
+            # Incremental rollup updates are only correct on top of complete rollups
+            DailyRollupStore(db).ensure_built()
+            self._indexed_db = db
+            # Raw source payloads live in their own (compressed) collection, keyed by transaction_id
+            self._payloads = RawPayloadStore(db[PAYLOAD_COLLECTION])
+        return db
+
+    @property
+    def transactions_collection(self):
+        return self.db['transactions']
+
+    @property
+    def payloads(self):
+        return self._payloads if self.db is not None else None
+
+    @property
+    def rollups(self):
+        db = self.db
+        return DailyRollupStore(db) if db is not None else None
+
+    @staticmethod
+    def upsert_operations(documents):
+        """Returns the bulk_write upserts for transaction documents (Transaction.to_dict()), keyed on transaction_id."""
+        return [
+            UpdateOne(
+                {"transaction_id": document["transaction_id"]},
+                {"$set": document},
+                upsert=True
+            )
+            for document in documents
+        ]
+
+    def _existing_documents(self, transaction_ids):
+        """Returns {transaction_id: document} for the given ids already stored, with the hash and rollup fields."""
+        cursor = self.transactions_collection.find(
+            {"transaction_id": {"$in": transaction_ids}},
+            ROLLUP_SOURCE_FIELDS
+        )
+        return {doc["transaction_id"]: doc for doc in cursor}
+
+    def _update_rollups(self, removed, added, context):
+        """Applies daily rollup deltas, logging instead of failing since the transactions are already written."""
+        rollup_result = self.rollups.apply(removed, added)
+        if rollup_result["error"]:
+            logging.error(
+                f"❌ Daily rollup update for {context} failed, run `python migrations.py rebuild-rollups`: "
+                f"{rollup_result['error']}"
+            )
+        return rollup_result
+
+    def upsert_batch(self, offset, batch):
+        """
+        Writes one batch of Transaction objects following its UpsertPlan and returns its counts.
+        The caller must hold rollup_write_lock. Also run on the worker threads of
+        AsyncTransactionRepository's thread driver.
+
+        Args:
+            offset (int): Position of the batch in the whole load, used in error reports
+            batch (list): Transaction objects to write
+
+        Returns:
+            dict: Inserted/updated/unchanged counts and a list of errors
+        """
+        if batch and self.db is not None and using_fallback():
+            # The in-memory fallback is read-only, e.g. for a job still running when MongoDB went down
+            logging.error(f"❌ MongoDB unavailable, batch at offset {offset} not written to the read-only fallback")
+            return {"inserted": 0, "updated": 0, "unchanged": 0, "errors": [{
+                "batch_offset": offset,
+                "batch_size": len(batch),
+                "failed": len(batch),
+                "error": "Database is read-only until MongoDB reconnects"
+            }]}
+
+        try:
+            existing = self._existing_documents([txn.transaction_id for txn in batch])
+        except Exception as e:
+            # Fall back to writing the whole batch if the lookup fails
+            logging.warning(f"⚠️ Could not load content hashes for batch at offset {offset}: {str(e)}")
+            existing = None
+
+        plan = UpsertPlan(offset, batch, existing)
+        if not plan.changed:
+            return plan.counts
+
+        error = None
+        try:
+            self.payloads.collection.bulk_write(self.payloads.operations(plan.changed), ordered=False)
+        except Exception as e:
+            error = e
+        plan.record_payload_write(error)
+        if not plan.changed:
+            return plan.counts
+
+        result, error = None, None
+        try:
+            result = self.transactions_collection.bulk_write(plan.transaction_operations(), ordered=False)
+        except Exception as e:
+            error = e
+        plan.record_transaction_write(result, error)
 
-        # Create an index on transaction_id for better performance
-        self.transactions_collection.create_index("transaction_id", unique=True)
+        changes = plan.rollup_changes()
+        if changes:
+            self._update_rollups(*changes, f"batch at offset {offset}")
+        # Cached analysis results are stale once the transactions and their rollups are written
+        bump_generation()
+        return plan.counts
+
+    def _bulk_upsert(self, transactions):
+        """
+        Upserts Transaction objects in unordered bulk batches keyed on transaction_id.
+        Transactions whose content_hash matches the stored document are skipped.
+        A failing batch is logged and reported, but does not abort the remaining batches.
+
+        Args:
+            transactions (list): Transaction objects to write
+
+        Returns:
+            dict: Inserted/updated/unchanged counts and a list of per-batch errors
+        """
+        totals = {"inserted": 0, "updated": 0, "unchanged": 0, "errors": []}
+
+        for start in range(0, len(transactions), self.batch_size):
+            with rollup_write_lock:
+                counts = self.upsert_batch(start, transactions[start:start + self.batch_size])
+            for key in ("inserted", "updated", "unchanged"):
+                totals[key] += counts[key]
+            totals["errors"].extend(counts["errors"])
+
+        return totals
 
     def save_plaid_transactions(self, plaid_data):
         """
@@ -26,7 +319,8 @@ class TransactionLoader:
         - Uses transaction_id as the unique identifier
         - Filters out pending transactions
         - Saves only finalized transactions to the database
-        - Preserves original transaction JSON data
+        - Skips transactions whose content fingerprint has not changed
+        - Preserves original transaction JSON data in the raw payload collection
 
         Args:
             plaid_data (dict): Plaid API response containing transactions and accounts
@@ -58,41 +352,38 @@ class TransactionLoader:
                     "pending": pending_count,
                     "processed": 0,
                     "inserted": 0,
-                    "updated": 0
+                    "updated": 0,
+                    "unchanged": 0,
+                    "errors": []
                 }
 
             # Prepare transactions for database insertion using our Transaction model
-            transactions_to_save = [Transaction(txn) for txn in non_pending_txns]
-
-            inserted_count = 0
-            updated_count = 0
+            transactions_to_save = Transaction.from_many(non_pending_txns)
 
             # Insert/update transactions in MongoDB using transaction_id as the key
-            for transaction in transactions_to_save:
-                result = self.transactions_collection.update_one(
-                    {"transaction_id": transaction.transaction_id},
-                    {"$set": transaction.to_dict()},
-                    upsert=True
-                )
-
-                if result.upserted_id:
-                    inserted_count += 1
-                elif result.modified_count:
-                    updated_count += 1
+            write_result = self._bulk_upsert(transactions_to_save)
 
             result_summary = {
-                "success": True,
+                "success": not write_result["errors"],
                 "message": f"Successfully processed {len(transactions_to_save)} non-pending transactions",
                 "total": len(transactions),
                 "pending": pending_count,
                 "processed": len(transactions_to_save),
-                "inserted": inserted_count,
-                "updated": updated_count
+                "inserted": write_result["inserted"],
+                "updated": write_result["updated"],
+                "unchanged": write_result["unchanged"],
+                "errors": write_result["errors"]
             }
+            if write_result["errors"]:
+                result_summary["message"] = (
+                    f"Processed {len(transactions_to_save)} non-pending transactions "
+                    f"with {len(write_result['errors'])} failed batches"
+                )
 
             logging.info(
                 f"✅ Processed Plaid transactions: {result_summary['processed']} non-pending, "
                 f"{result_summary['inserted']} new, {result_summary['updated']} updated, "
+                f"{result_summary['unchanged']} unchanged, "
                 f"{result_summary['pending']} pending skipped"
             )
 
@@ -101,3 +392,345 @@ class TransactionLoader:
         except Exception as e:
             logging.error(f"❌ Error saving Plaid transactions: {str(e)}", exc_info=True)
             return {"success": False, "message": f"Error saving Plaid transactions: {str(e)}"}
+
+    def save_plaid_transaction_pages(self, pages, progress=None):
+        """
+        Saves an iterable of Plaid transaction pages, writing each page as soon as it arrives.
+        Pages already written stay saved if the page source fails part way through.
+
+        Args:
+            pages (iterable): Iterable yielding lists of Plaid transaction dicts
+            progress (callable, optional): Called with (rows_parsed, rows_written) after each page
+
+        Returns:
+            dict: Combined result of the operation across all pages
+        """
+        summary = {
+            "success": True,
+            "message": "",
+            "pages": 0,
+            "total": 0,
+            "pending": 0,
+            "processed": 0,
+            "inserted": 0,
+            "updated": 0,
+            "unchanged": 0,
+            "errors": []
+        }
+
+        try:
+            for page in pages:
+                page_result = self.save_plaid_transactions(page)
+                summary["pages"] += 1
+
+                for key in ("total", "pending", "processed", "inserted", "updated", "unchanged"):
+                    summary[key] += page_result.get(key, 0)
+                summary["errors"].extend(page_result.get("errors", []))
+                if progress:
+                    progress(len(page), page_result.get("inserted", 0) + page_result.get("updated", 0))
+
+                if not page_result.get("success") and not page_result.get("errors"):
+                    summary["errors"].append({"page": summary["pages"], "error": page_result.get("message")})
+        except Exception as e:
+            logging.error(f"❌ Transaction page source failed after {summary['pages']} pages: {str(e)}", exc_info=True)
+            summary["success"] = False
+            summary["message"] = f"Stopped after {summary['pages']} pages: {str(e)}"
+            return summary
+
+        summary["success"] = not summary["errors"]
+        summary["message"] = f"Processed {summary['processed']} non-pending transactions from {summary['pages']} pages"
+        logging.info(f"✅ {summary['message']}")
+        return summary
+
+    def apply_sync_deltas(self, added, modified, removed):
+        """
+        Applies one page of Plaid /transactions/sync deltas.
+        Added and modified transactions are upserted like any other Plaid transactions,
+        removed transaction ids are deleted.
+
+        Args:
+            added (list): New transaction dicts
+            modified (list): Changed transaction dicts
+            removed (list): transaction_id strings removed by Plaid
+
+        Returns:
+            dict: Inserted/updated/unchanged/deleted counts and any write errors
+        """
+        result = {"inserted": 0, "updated": 0, "unchanged": 0, "deleted": 0, "errors": []}
+
+        upserts = list(added) + list(modified)
+        if upserts:
+            save_result = self.save_plaid_transactions(upserts)
+            if "errors" not in save_result and not save_result.get("success"):
+                result["errors"].append({"error": save_result.get("message")})
+            for key in ("inserted", "updated", "unchanged"):
+                result[key] = save_result.get(key, 0)
+            result["errors"].extend(save_result.get("errors", []))
+
+        if removed and using_fallback():
+            logging.error(f"❌ MongoDB unavailable, {len(removed)} removed transactions not deleted from the read-only fallback")
+            result["errors"].append({"error": "Database is read-only until MongoDB reconnects"})
+        elif removed:
+            try:
+                with rollup_write_lock:
+                    removed_documents = list(self._existing_documents(list(removed)).values())
+                    delete_result = self.transactions_collection.delete_many({"transaction_id": {"$in": list(removed)}})
+                    result["deleted"] = delete_result.deleted_count
+                    self.payloads.delete_many(removed)
+                    self._update_rollups(removed_documents, [], "removed transactions")
+                bump_generation()
+            except Exception as e:
+                logging.error(f"❌ Error deleting removed transactions: {str(e)}")
+                result["errors"].append({"error": f"Failed to delete removed transactions: {str(e)}"})
+
+        return result
+
+    @staticmethod
+    def _map_columns(headers):
+        """Returns {original_header: field} for the headers we know how to import."""
+        mapping = {}
+        for header in headers:
+            field = FILE_COLUMN_MAP.get(str(header).strip().lower())
+            if field and field not in mapping.values():
+                mapping[header] = field
+        return mapping
+
+    @staticmethod
+    def _to_float(value):
+        """Parses amounts such as 12.5, "1,234.56" or "$(20.00)" into a float, or None."""
+        if value is None or (isinstance(value, float) and math.isnan(value)):
+            return None
+        if isinstance(value, (int, float)):
+            return float(value)
+        text = str(value).strip().replace(",", "").replace("$", "")
+        if not text:
+            return None
+        if text.startswith("(") and text.endswith(")"):
+            text = "-" + text[1:-1]
+        try:
+            return float(text)
+        except ValueError:
+            # e.g. "N/A" or "pending": the row is skipped rather than aborting the import
+            return None
+
+    @staticmethod
+    def _to_iso_date(value):
+        """Normalizes a spreadsheet date cell to a YYYY-MM-DD string, or None."""
+        if value is None or (isinstance(value, float) and math.isnan(value)):
+            return None
+        if isinstance(value, datetime):
+            return value.date().isoformat()
+        if isinstance(value, date):
+            return value.isoformat()
+        text = str(value).strip()
+        try:
+            # Already ISO, the common case for CSV exports
+            return datetime.strptime(text, "%Y-%m-%d").date().isoformat()
+        except ValueError:
+            pass
+
+        # Other layouts (e.g. 03/14/2024) go through pandas' date parser
+        import pandas as pd
+        parsed = pd.to_datetime(text, errors="coerce")
+        return None if pd.isna(parsed) else parsed.date().isoformat()
+
+    def _iter_csv_chunks(self, filepath, chunk_size):
+        """Yields lists of row dicts read from a CSV file in fixed-size pandas chunks."""
+        import pandas as pd
+
+        for chunk in pd.read_csv(filepath, chunksize=chunk_size, dtype=str, keep_default_na=False):
+            yield chunk.to_dict("records")
+
+    def _iter_xlsx_chunks(self, filepath, chunk_size):
+        """Yields lists of row dicts from the first sheet of an XLSX file using openpyxl's read-only mode."""
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(filepath, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            headers = next(rows, None)
+            if headers is None:
+                return
+
+            chunk = []
+            for values in rows:
+                if not any(value is not None for value in values):
+                    continue
+                chunk.append(dict(zip(headers, values)))
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+        finally:
+            workbook.close()
+
+    def _iter_xls_chunks(self, filepath, chunk_size):
+        """Yields lists of row dicts from a legacy .xls file, which has no streaming reader."""
+        import pandas as pd
+
+        frame = pd.read_excel(filepath, dtype=object)
+        for start in range(0, len(frame), chunk_size):
+            yield frame.iloc[start:start + chunk_size].to_dict("records")
+
+    def _row_to_transaction(self, row, mapping, source_name, occurrences):
+        """
+        Builds a Transaction from a spreadsheet row.
+        Rows without an id get a deterministic one from their contents, so re-importing
+        the same export updates the existing documents instead of duplicating them.
+        Identical rows are told apart by how many of them came earlier in the file,
+        counted in `occurrences` (a Counter of row keys shared by every row of the file).
+        """
+        fields = {mapping[header]: value for header, value in row.items() if header in mapping}
+
+        txn_date = self._to_iso_date(fields.get("date"))
+        amount = self._to_float(fields.get("amount"))
+        if amount is None and ("debit" in fields or "credit" in fields):
+            debit, credit = self._to_float(fields.get("debit")), self._to_float(fields.get("credit"))
+            if debit is not None or credit is not None:
+                # Plaid convention: positive amounts are money leaving the account
+                amount = (debit or 0.0) - (credit or 0.0)
+        if txn_date is None or amount is None:
+            return None
+
+        name = str(fields.get("name") or "").strip() or None
+        account_id = str(fields.get("account_id") or "").strip() or source_name
+
+        transaction_id = str(fields.get("transaction_id") or "").strip()
+        if not transaction_id:
+            row_key = f"{account_id}|{txn_date}|{name}|{amount}"
+            occurrence = occurrences[row_key]
+            occurrences[row_key] += 1
+            digest = hashlib.sha1(f"{row_key}|{occurrence}".encode("utf-8")).hexdigest()
+            transaction_id = f"file-{digest}"
+
+        category = str(fields.get("category") or "").strip() or None
+        transaction = Transaction({
+            "transaction_id": transaction_id,
+            "account_id": account_id,
+            "name": name,
+            "merchant_name": str(fields.get("merchant_name") or "").strip() or None,
+            "amount": amount,
+            "authorized_date": txn_date,
+            "iso_currency_code": str(fields.get("currency") or "").strip() or "USD",
+            "category": category,
+            "pending": False,
+        })
+        transaction.category = category
+        return transaction
+
+    def load_from_excel(self, filepath, chunk_size=None, progress=None, source_name=None):
+        """
+        Imports transactions from an Excel (.xlsx, .xls) or CSV bank export.
+        - CSV files are read in fixed-size pandas chunks
+        - XLSX files are read with openpyxl's read-only row iterator
+        - Each chunk is mapped to Transaction objects and bulk-written before the next is read,
+          so memory use does not grow with file size
+
+        Args:
+            filepath (str): Path to the uploaded file
+            chunk_size (int, optional): Number of rows mapped and written per chunk
+            progress (callable, optional): Called with (rows_parsed, rows_written) after each chunk
+            source_name (str, optional): Name of the original file, used as the account id of rows
+                without one (and so in their generated transaction ids). Defaults to the file's basename,
+                so pass it when the file was saved under a generated name, or re-imports will not match.
+
+        Returns:
+            dict: Result of the import with row counts, per-category spending and throughput
+        """
+        chunk_size = chunk_size or Config.UPLOAD_CHUNK_SIZE
+        extension = os.path.splitext(filepath)[1].lower()
+        readers = {
+            ".csv": self._iter_csv_chunks,
+            ".xlsx": self._iter_xlsx_chunks,
+            ".xls": self._iter_xls_chunks,
+        }
+        if extension not in readers:
+            return {"success": False, "message": f"Unsupported file type: {extension}"}
+
+        source_name = source_name or os.path.basename(filepath)
+        started = time.perf_counter()
+        summary = {
+            "rows": 0,
+            "skipped": 0,
+            "count": 0,
+            "inserted": 0,
+            "updated": 0,
+            "unchanged": 0,
+            "errors": [],
+            "preview": [],
+            "categories": []
+        }
+
+        try:
+            mapping = None
+            # Rows without an id seen so far, per row key, across all chunks
+            occurrences = Counter()
+            # Shared by every chunk's batch, so category codes index the same running totals
+            dictionaries = (StringDictionary(), StringDictionary(), StringDictionary())
+            category_totals = np.zeros(0, dtype=np.float64)
+            category_counts = np.zeros(0, dtype=np.int64)
+
+            for rows in readers[extension](filepath, chunk_size):
+                if mapping is None:
+                    mapping = self._map_columns(rows[0].keys()) if rows else {}
+                    if "date" not in mapping.values() or not {"amount", "debit", "credit"} & set(mapping.values()):
+                        return {
+                            "success": False,
+                            "message": "File must contain a date column and an amount (or debit/credit) column"
+                        }
+
+                transactions = []
+                for row in rows:
+                    transaction = self._row_to_transaction(row, mapping, source_name, occurrences)
+                    if transaction is None:
+                        summary["skipped"] += 1
+                    else:
+                        transactions.append(transaction)
+
+                summary["rows"] += len(rows)
+                write_result = self._bulk_upsert(transactions)
+                summary["count"] += len(transactions)
+                for key in ("inserted", "updated", "unchanged"):
+                    summary[key] += write_result[key]
+                summary["errors"].extend(write_result["errors"])
+                if progress:
+                    progress(len(rows), write_result["inserted"] + write_result["updated"])
+
+                totals, counts = TransactionBatch.from_transactions(transactions, dictionaries).totals_by("category")
+                category_totals = _add_totals(category_totals, totals)
+                category_counts = _add_totals(category_counts, counts)
+
+                if len(summary["preview"]) < FILE_PREVIEW_ROWS:
+                    for transaction in transactions[:FILE_PREVIEW_ROWS - len(summary["preview"])]:
+                        summary["preview"].append({
+                            "date": transaction.date,
+                            "name": transaction.name,
+                            "amount": transaction.amount,
+                            "category": transaction.category
+                        })
+
+                logging.info(f"Imported chunk of {len(rows)} rows from {source_name}, {summary['rows']} so far")
+
+        except Exception as e:
+            logging.error(f"❌ Error importing {source_name}: {str(e)}", exc_info=True)
+            return {"success": False, "message": f"Error importing file: {str(e)}", **summary}
+
+        categories = dictionaries[1]
+        summary["categories"] = [
+            {"category": categories.decode(int(code)), "total_amount": round(float(category_totals[code]), 2),
+             "count": int(category_counts[code])}
+            for code in np.argsort(-category_totals, kind="stable") if category_counts[code]
+        ]
+        elapsed = time.perf_counter() - started
+        summary["elapsed_seconds"] = round(elapsed, 3)
+        summary["rows_per_second"] = round(summary["rows"] / elapsed, 1) if elapsed > 0 else None
+        summary["success"] = not summary["errors"]
+        summary["message"] = f"Imported {summary['count']} transactions from {summary['rows']} rows"
+
+        logging.info(
+            f"✅ {summary['message']} ({summary['inserted']} new, {summary['updated']} updated, "
+            f"{summary['unchanged']} unchanged, {summary['skipped']} skipped) "
+            f"at {summary['rows_per_second']} rows/sec"
+        )
+        return summary
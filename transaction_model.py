@@ -1,7 +1,11 @@
 from datetime import datetime, date
-from typing import Dict, Any
+from typing import Any, Dict, Iterable, List, Optional
+import hashlib
 import json
 
+# Types that never need date normalization, checked by exact type to keep the walk cheap
+_SCALAR_TYPES = frozenset((str, int, float, bool, type(None)))
+
 
 class Transaction:
     """
@@ -9,6 +13,20 @@ class Transaction:
     and provides a consistent interface for the application.
     """
 
+    # Fixed attribute layout: no per-instance __dict__, which matters when converting large batches
+    __slots__ = (
+        "transaction_id",
+        "account_id",
+        "name",
+        "merchant_name",
+        "amount",
+        "date",
+        "category",
+        "currency",
+        "original_data",
+        "content_hash",
+    )
+
     def __init__(self, data: Dict[str, Any] = None):
         """
         Initialize a transaction from a dictionary of attributes.
@@ -27,8 +45,11 @@ class Transaction:
         self.date = data.get('authorized_date')
         self.category = None
         self.currency = data.get('iso_currency_code', 'USD')
-        # Store a serializable version of the original data (handles nested date/datetime objects)
-        self.original_data = Transaction.make_serializable(data)
+        # Store a serializable version of the original data (handles nested date/datetime objects).
+        # Containers without dates are shared with the input rather than copied.
+        self.original_data = Transaction.normalize_dates(data)
+        # Stable fingerprint of the source payload, used to skip re-writing unchanged transactions
+        self.content_hash = Transaction.fingerprint(self.original_data)
 
     @staticmethod
     def default_serializer(obj):
@@ -40,16 +61,111 @@ class Transaction:
             return obj.isoformat()
         raise TypeError(f"Type {type(obj)} not serializable")
 
+    @classmethod
+    def from_many(cls, rows: Iterable[Dict[str, Any]]) -> List["Transaction"]:
+        """
+        Build Transactions for a batch of source dicts, e.g. a page of Plaid transactions.
+
+        Args:
+            rows (Iterable[Dict[str, Any]]): Transaction dictionaries
+
+        Returns:
+            List[Transaction]: One Transaction per row, in order
+        """
+        return [cls(row) for row in rows]
+
+    @staticmethod
+    def normalize_dates(value: Any) -> Any:
+        """
+        Recursively convert date and datetime values to ISO formatted strings.
+        Only dicts and lists that actually contain a date are copied; everything else is
+        returned as-is, so already-serializable payloads (e.g. raw Plaid JSON) cost a single walk.
+        """
+        value_type = value.__class__
+        if value_type in _SCALAR_TYPES:
+            return value
+
+        if value_type is dict:
+            copied = None
+            for key, item in value.items():
+                if item.__class__ in _SCALAR_TYPES:
+                    continue
+                normalized = Transaction.normalize_dates(item)
+                if normalized is not item:
+                    if copied is None:
+                        copied = dict(value)
+                    copied[key] = normalized
+            return value if copied is None else copied
+
+        if value_type is list or value_type is tuple:
+            copied = None
+            for index, item in enumerate(value):
+                if item.__class__ in _SCALAR_TYPES:
+                    continue
+                normalized = Transaction.normalize_dates(item)
+                if normalized is not item:
+                    if copied is None:
+                        copied = list(value)
+                    copied[index] = normalized
+            return value if copied is None else copied
+
+        if isinstance(value, (date, datetime)):
+            return value.isoformat()
+        if isinstance(value, dict):
+            return Transaction.normalize_dates(dict(value))
+        return value
+
     @staticmethod
     def make_serializable(data: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Convert a dictionary to a serializable format using the custom default_serializer.
+        Convert a dictionary to a serializable format.
         This ensures any date or datetime objects, even nested ones, are converted to strings.
         """
         if data is None:
             return {}
-        json_str = json.dumps(data, default=Transaction.default_serializer)
-        return json.loads(json_str)
+        return Transaction.normalize_dates(data)
+
+    @staticmethod
+    def parse_date(value: Any) -> Optional[datetime]:
+        """
+        Convert a date, datetime or ISO string (YYYY-MM-DD, optionally with a time) to the
+        midnight datetime stored as a BSON date. Returns None for missing or unparseable values.
+        """
+        if value is None or value == "":
+            return None
+        if isinstance(value, date):  # includes datetime
+            return datetime(value.year, value.month, value.day)
+        try:
+            return datetime.strptime(str(value)[:10], "%Y-%m-%d")
+        except ValueError:
+            return None
+
+    @staticmethod
+    def month_key(value: Any) -> Optional[int]:
+        """Return the integer YYYYMM month key for a date value, e.g. 202403, or None."""
+        parsed = Transaction.parse_date(value)
+        return parsed.year * 100 + parsed.month if parsed else None
+
+    @staticmethod
+    def last_updated_now() -> str:
+        """Return the `last_updated` stamp for a write, an ISO timestamp at second resolution."""
+        return datetime.now().isoformat(timespec="seconds")
+
+    @staticmethod
+    def format_date(value: Any) -> Any:
+        """Render a stored date as a YYYY-MM-DD string for API responses; other values pass through."""
+        if isinstance(value, (date, datetime)):
+            return value.strftime("%Y-%m-%d")
+        return value
+
+    @staticmethod
+    def fingerprint(data: Dict[str, Any]) -> str:
+        """
+        Compute a stable content hash of a serializable payload.
+        Keys are sorted so the hash does not depend on the order Plaid returns fields in.
+        """
+        canonical = json.dumps(data, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
 
     def to_obj(self):
         """
@@ -93,7 +209,7 @@ class Transaction:
             "date": self.date.isoformat() if isinstance(self.date, (date, datetime)) else self.date,
             "category": None,
             "currency": self.currency,
-            "original_data": Transaction.make_serializable(selfdata)
+            "original_data": self.original_data
         }
 
         cleaned_txn["last_updated"] = datetime.now().strftime("%Y-%m-%d")
@@ -103,11 +219,11 @@ class Transaction:
     def to_dict(self) -> Dict[str, Any]:
         """
         Convert Transaction to a dictionary for database storage.
-        Ensures that any date/datetime in the 'date' field is converted to a string.
+        The date is stored as a BSON date, with an integer `yyyymm` month key for grouping.
+        The raw source payload is not included; it is stored separately in the raw payload collection.
         """
-        date_value = (
-            self.date.isoformat() if isinstance(self.date, (date, datetime)) else self.date
-        )
+        date_value = Transaction.parse_date(self.date)
+        month_key = date_value.year * 100 + date_value.month if date_value else None
         return {
             "transaction_id": self.transaction_id,
             "account_id": self.account_id,
@@ -115,10 +231,11 @@ class Transaction:
             "merchant": self.merchant_name,
             "amount": self.amount,
             "date": date_value,
+            "yyyymm": month_key,
             "category": self.category,
             "iso_currency_code": self.currency,
-            "original_data": self.original_data,
-            "last_updated": datetime.now().strftime("%Y-%m-%d")
+            "content_hash": self.content_hash,
+            "last_updated": Transaction.last_updated_now()
         }
 
     def to_json(self) -> str: